@@ -0,0 +1,207 @@
+import time
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy import case, func
+
+from models import db, User, Zadanie, ZadanieUser, Lesson, LessonStudent, StudentDzialStats
+
+CACHE_TTL = 600          # sekundy
+CACHE_MAX_ENTRIES = 64
+STATUS_TODO, STATUS_DONE, STATUS_WRONG = 0, 1, 2
+
+MIN_ATTEMPTS = 3         # minimalna liczba prób, żeby zadanie trafiło do "najtrudniejszych"
+HARDEST_LIMIT = 10
+
+_cache = OrderedDict()
+
+
+# =======================
+# GRUPA UCZNIÓW
+# =======================
+def get_teacher_group(teacher_id, lesson_id=None):
+    query = (
+        db.session.query(LessonStudent.student_id)
+        .join(Lesson, Lesson.id == LessonStudent.lesson_id)
+        .filter(Lesson.teacher_id == teacher_id)
+    )
+    if lesson_id:
+        query = query.filter(Lesson.id == lesson_id)
+
+    ids = sorted({sid for (sid,) in query.distinct()})
+
+    # nauczyciel bez lekcji widzi wszystkich uczniów
+    if not ids and not lesson_id:
+        ids = [uid for (uid,) in db.session.query(User.id).filter(User.role == "student")]
+
+    return ids
+
+
+# =======================
+# MACIERZ STATUSÓW (jedno zapytanie)
+# =======================
+def load_status_matrix(student_ids):
+    rows = db.session.execute(
+        db.select(
+            ZadanieUser.user_id,
+            ZadanieUser.zadanie_id,
+            case(
+                (ZadanieUser.status == "zrobione", STATUS_DONE),
+                (ZadanieUser.status == "błędne", STATUS_WRONG),
+                else_=STATUS_TODO
+            ),
+            Zadanie.dzial,
+            Zadanie.rok_arkusza
+        )
+        .join(Zadanie, Zadanie.id == ZadanieUser.zadanie_id)
+        .where(ZadanieUser.user_id.in_(student_ids))
+    ).all()
+
+    if not rows:
+        return None
+
+    user_ids, task_ids, statuses, dzialy, lata = zip(*rows)
+    return build_matrix(user_ids, task_ids, statuses, dzialy, lata)
+
+
+def build_matrix(user_ids, task_ids, statuses, dzialy, lata):
+    statuses = np.asarray(statuses, dtype=np.int8)
+
+    users, user_idx = np.unique(np.asarray(user_ids, dtype=np.int64), return_inverse=True)
+    tasks, first, task_idx = np.unique(
+        np.asarray(task_ids, dtype=np.int64), return_index=True, return_inverse=True
+    )
+
+    # dział i rok zależą tylko od zadania – kodujemy je raz na zadanie,
+    # a nie na każdy wiersz (sortowanie milionów napisów jest drogie)
+    first = first.tolist()
+    dzial_names, task_dzial = np.unique(
+        np.array([dzialy[i] for i in first], dtype=object), return_inverse=True
+    )
+    years, task_year = np.unique(
+        np.asarray([lata[i] for i in first], dtype=np.int64), return_inverse=True
+    )
+
+    return {
+        "done": statuses == STATUS_DONE,
+        "wrong": statuses == STATUS_WRONG,
+        "users": users,
+        "user_idx": user_idx,
+        "tasks": tasks,
+        "task_idx": task_idx,
+        "task_dzial": task_dzial,
+        "task_year": task_year,
+        "dzial_names": dzial_names,
+        "dzial_idx": task_dzial[task_idx],
+        "years": years,
+        "year_idx": task_year[task_idx],
+    }
+
+
+# =======================
+# AGREGATY (NumPy)
+# =======================
+def _group_rates(idx, size, done, attempted):
+    assigned = np.bincount(idx, minlength=size)
+    done_count = np.bincount(idx, weights=done, minlength=size)
+    attempted_count = np.bincount(idx, weights=attempted, minlength=size)
+
+    rate = np.full(size, np.nan)
+    np.divide(done_count, attempted_count, out=rate, where=attempted_count > 0)
+
+    return assigned, done_count.astype(np.int64), attempted_count.astype(np.int64), rate
+
+
+def _rows(keys, assigned, done, attempted, rate):
+    # najsłabsze na górze, grupy bez prób na końcu
+    order = np.argsort(np.nan_to_num(rate, nan=2.0), kind="stable")
+    return [
+        {
+            "key": keys[i].item() if isinstance(keys[i], np.generic) else keys[i],
+            "assigned": int(assigned[i]),
+            "done": int(done[i]),
+            "attempted": int(attempted[i]),
+            "success": None if np.isnan(rate[i]) else float(rate[i]),
+        }
+        for i in order
+    ]
+
+
+def compute_aggregates(m):
+    done = m["done"].astype(np.float64)
+    attempted = (m["done"] | m["wrong"]).astype(np.float64)
+
+    per_dzial = _group_rates(m["dzial_idx"], len(m["dzial_names"]), done, attempted)
+    per_year = _group_rates(m["year_idx"], len(m["years"]), done, attempted)
+    per_student = _group_rates(m["user_idx"], len(m["users"]), done, attempted)
+    per_task = _group_rates(m["task_idx"], len(m["tasks"]), done, attempted)
+
+    _, _, task_attempted, task_rate = per_task
+    candidates = np.flatnonzero(task_attempted >= MIN_ATTEMPTS)
+    hardest = candidates[np.argsort(task_rate[candidates], kind="stable")][:HARDEST_LIMIT]
+
+    return {
+        "dzialy": _rows(m["dzial_names"], *per_dzial),
+        "lata": _rows(m["years"], *per_year),
+        "uczniowie": _rows(m["users"], *per_student),
+        "najtrudniejsze": [
+            {
+                "zadanie_id": int(m["tasks"][i]),
+                "dzial": m["dzial_names"][m["task_dzial"][i]],
+                "rok": int(m["years"][m["task_year"][i]]),
+                "attempted": int(task_attempted[i]),
+                "success": float(task_rate[i]),
+            }
+            for i in hardest
+        ],
+    }
+
+
+# =======================
+# CACHE
+# =======================
+def _fingerprint(student_ids):
+    # statystyki uczniów zmieniają się przy każdym oddaniu zadania,
+    # więc to tani (indeksowany) wyznacznik unieważnienia – działa między workerami
+    return db.session.query(
+        func.max(StudentDzialStats.last_activity),
+        func.sum(StudentDzialStats.assigned),
+        func.sum(StudentDzialStats.done),
+        func.sum(StudentDzialStats.wrong)
+    ).filter(StudentDzialStats.user_id.in_(student_ids)).one()
+
+
+def invalidate():
+    _cache.clear()
+
+
+def get_class_analytics(student_ids):
+    if not student_ids:
+        return None
+
+    key = tuple(sorted(student_ids))
+    fingerprint = tuple(_fingerprint(key))
+
+    cached = _cache.get(key)
+    if cached and cached[0] == fingerprint and time.monotonic() - cached[1] < CACHE_TTL:
+        _cache.move_to_end(key)
+        return cached[2]
+
+    matrix = load_status_matrix(key)
+    result = compute_aggregates(matrix) if matrix is not None else None
+
+    if result is not None:
+        names = {
+            uid: f"{imie} {nazwisko}"
+            for uid, imie, nazwisko in
+            db.session.query(User.id, User.imie, User.nazwisko).filter(User.id.in_(key))
+        }
+        for row in result["uczniowie"]:
+            row["name"] = names.get(row["key"], f"#{row['key']}")
+
+    _cache[key] = (fingerprint, time.monotonic(), result)
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+    return result
@@ -0,0 +1,124 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_analytics.db")
+os.environ["DATABASE_URL"] = "sqlite:///" + _db_file
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from subjects import DZIALY_PRZEDMIOTOW  # noqa: E402
+from models import db, User, Zadanie, ZadanieUser  # noqa: E402
+import analytics  # noqa: E402
+
+STUDENTS = int(os.environ.get("BENCH_STUDENTS", 1000))
+TASKS = int(os.environ.get("BENCH_TASKS", 10000))
+# część zadań przypisana każdemu uczniowi (1.0 = pełna macierz 1k × 10k)
+DENSITY = float(os.environ.get("BENCH_DENSITY", 1.0))
+# pełna macierz w SQLite to 10M wierszy – ładowanie z bazy mierzymy na mniejszej próbce
+DB_STUDENTS = int(os.environ.get("BENCH_DB_STUDENTS", 100))
+DB_TASKS = int(os.environ.get("BENCH_DB_TASKS", 1000))
+ROUNDS = int(os.environ.get("BENCH_ROUNDS", 5))
+
+STATUSES = np.array(["do zrobienia", "zrobione", "błędne", "oddane"], dtype=object)
+STATUS_CODES = np.array([
+    analytics.STATUS_TODO, analytics.STATUS_DONE, analytics.STATUS_WRONG, analytics.STATUS_TODO
+], dtype=np.int8)
+STATUS_P = [0.4, 0.35, 0.2, 0.05]
+
+app = create_app()
+
+
+def synthetic_columns(students, tasks, density, rng):
+    cells = int(students * tasks * density)
+    flat = rng.choice(students * tasks, size=cells, replace=False) if density < 1 else np.arange(cells)
+
+    user_ids = flat // tasks + 1
+    task_ids = flat % tasks + 1
+
+    dzialy = np.array(DZIALY_PRZEDMIOTOW["matematyka"], dtype=object)
+    task_dzial = dzialy[rng.integers(0, len(dzialy), size=tasks)]
+    task_rok = rng.integers(2010, 2025, size=tasks)
+
+    statuses = STATUS_CODES[rng.choice(len(STATUS_CODES), size=cells, p=STATUS_P)]
+    return user_ids, task_ids, statuses, task_dzial[task_ids - 1], task_rok[task_ids - 1]
+
+
+def bench_compute(rng):
+    columns = synthetic_columns(STUDENTS, TASKS, DENSITY, rng)
+    cells = len(columns[0])
+
+    start = time.perf_counter()
+    matrix = analytics.build_matrix(*columns)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        analytics.compute_aggregates(matrix)
+    compute_ms = (time.perf_counter() - start) * 1000 / ROUNDS
+
+    print(f"NumPy: {STUDENTS} uczniów × {TASKS} zadań = {cells} komórek")
+    print(f"  budowa macierzy     {build_ms:10.1f} ms")
+    print(f"  agregaty            {compute_ms:10.1f} ms")
+
+
+def bench_database(rng):
+    teacher = User(imie="Anna", nazwisko="Nowak", login="bench_teacher", role="teacher", password_hash="-")
+    db.session.add(teacher)
+    db.session.flush()
+
+    db.session.execute(User.__table__.insert(), [
+        {"imie": f"U{i}", "nazwisko": "Test", "login": f"bench_s{i}", "role": "student", "password_hash": "-"}
+        for i in range(DB_STUDENTS)
+    ])
+    dzialy = DZIALY_PRZEDMIOTOW["matematyka"]
+    db.session.execute(Zadanie.__table__.insert(), [
+        {
+            "przedmiot": "matematyka", "zakres": "podstawa", "rok_arkusza": 2010 + i % 15,
+            "rodzaj_arkusza": "matura", "numer_zadania": i % 35 + 1, "typ_zadania": "zamkniete",
+            "dzial": dzialy[i % len(dzialy)], "tresc": "-", "created_by": teacher.id
+        }
+        for i in range(DB_TASKS)
+    ])
+    student_ids = [uid for (uid,) in db.session.query(User.id).filter(User.role == "student")]
+    task_ids = [tid for (tid,) in db.session.query(Zadanie.id)]
+
+    statuses = STATUSES[rng.choice(len(STATUSES), size=len(student_ids) * len(task_ids), p=STATUS_P)]
+    db.session.execute(ZadanieUser.__table__.insert(), [
+        {"user_id": uid, "zadanie_id": tid, "status": statuses[i * len(task_ids) + j]}
+        for i, uid in enumerate(student_ids)
+        for j, tid in enumerate(task_ids)
+    ])
+    db.session.commit()
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        analytics.invalidate()
+        analytics.get_class_analytics(student_ids)
+    cold_ms = (time.perf_counter() - start) * 1000 / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        analytics.get_class_analytics(student_ids)
+    warm_ms = (time.perf_counter() - start) * 1000 / ROUNDS
+
+    print(f"SQLite: {DB_STUDENTS} uczniów × {DB_TASKS} zadań = {len(statuses)} wierszy")
+    print(f"  zapytanie + agregaty {cold_ms:9.1f} ms")
+    print(f"  z cache              {warm_ms:9.1f} ms")
+
+
+def main():
+    rng = np.random.default_rng(0)
+    bench_compute(rng)
+    print()
+    with app.app_context():
+        db.create_all()
+        bench_database(rng)
+
+
+if __name__ == "__main__":
+    main()
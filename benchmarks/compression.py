@@ -0,0 +1,124 @@
+import os
+import sys
+import tempfile
+import time
+
+# uruchamiamy na osobnej bazie
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_compression.db")
+os.environ["DATABASE_URL"] = "sqlite:///" + _db_file
+os.environ["COMPRESS_ENABLED"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from subjects import DZIALY_PRZEDMIOTOW  # noqa: E402
+from models import db, User, Zadanie, ZadanieUser  # noqa: E402
+from response_compression import available_encodings, make_compressor  # noqa: E402
+
+STUDENTS = int(os.environ.get("BENCH_STUDENTS", 200))
+TASKS = int(os.environ.get("BENCH_TASKS", 1500))
+ROUNDS = int(os.environ.get("BENCH_ROUNDS", 20))
+
+LEVELS = {
+    "gzip": (1, 6, 9),
+    "br": (1, 4, 6, 11),
+    "zstd": (1, 3, 9, 19),
+}
+
+TRESC = (
+    "Dana jest funkcja $f(x) = x^2 - 4x + 3$. Wyznacz zbiór wartości funkcji "
+    "oraz przedziały monotoniczności. Zapisz obliczenia i uzasadnij odpowiedź. "
+)
+
+app = create_app()
+
+
+def seed():
+    teacher = User(imie="Anna", nazwisko="Nowak", login="bench_teacher", role="teacher")
+    teacher.set_password("bench")
+    db.session.add(teacher)
+
+    students = []
+    for i in range(STUDENTS):
+        s = User(imie=f"Uczeń{i}", nazwisko=f"Testowy{i}", login=f"bench_s{i}", role="student")
+        s.password_hash = teacher.password_hash
+        students.append(s)
+    db.session.add_all(students)
+    db.session.flush()
+
+    dzialy = DZIALY_PRZEDMIOTOW["matematyka"]
+    zadania = []
+    for i in range(TASKS):
+        zadania.append(Zadanie(
+            przedmiot="matematyka",
+            zakres="podstawa",
+            rok_arkusza=2015 + i % 10,
+            rodzaj_arkusza="matura",
+            numer_zadania=i % 35 + 1,
+            typ_zadania="zamkniete",
+            dzial=dzialy[i % len(dzialy)],
+            tresc=TRESC * 3,
+            odp_a="1", odp_b="2", odp_c="3", odp_d="4",
+            poprawna_odp="A",
+            created_by=teacher.id
+        ))
+    db.session.add_all(zadania)
+    db.session.flush()
+
+    db.session.bulk_save_objects([
+        ZadanieUser(user_id=students[0].id, zadanie_id=z.id, status="do zrobienia")
+        for z in zadania
+    ])
+    db.session.commit()
+
+    return teacher.id, students[0].id
+
+
+def fetch_pages(teacher_id, student_id):
+    pages = {}
+    client = app.test_client()
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = teacher_id
+        sess["user_role"] = "teacher"
+    for url in ("/zadania", "/panel/teacher/assign"):
+        pages[url] = client.get(url).get_data()
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = student_id
+        sess["user_role"] = "student"
+    pages["/student/zadania"] = client.get("/student/zadania").get_data()
+
+    return pages
+
+
+def measure(body, encoding, level):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        compressor = make_compressor(encoding, level)
+        out = compressor.compress(body) + compressor.finish()
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    return len(out), elapsed * 1000
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        teacher_id, student_id = seed()
+    pages = fetch_pages(teacher_id, student_id)
+
+    print(f"dane: {STUDENTS} uczniów, {TASKS} zadań, {ROUNDS} powtórzeń\n")
+    print(f"{'strona':<24}{'kodek':<7}{'poziom':>7}{'bajty':>11}{'oszcz.':>9}{'ms':>9}")
+
+    for url, body in pages.items():
+        print(f"{url:<24}{'-':<7}{'-':>7}{len(body):>11}{'':>9}{'':>9}")
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                size, ms = measure(body, encoding, level)
+                saved = 100 * (1 - size / len(body))
+                print(f"{'':<24}{encoding:<7}{level:>7}{size:>11}{saved:>8.1f}%{ms:>9.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# liczbę zapytań podaje profiler SQL w nagłówku Server-Timing
+os.environ["COMPRESS_ENABLED"] = "0"
+os.environ["SQL_PROFILING"] = "1"
+os.environ["SLOW_REQUEST_MS"] = "1e9"
+
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from models import db, User, Lesson, LessonStudent, LessonTask, Material, Zadanie, ZadanieUser  # noqa: E402
+import seed_data  # noqa: E402
+
+SEED = int(os.environ.get("BENCH_SEED", 1))
+PASSWORD = "budget"
+
+# dwa zbiory danych: liczba zapytań nie może rosnąć razem z danymi
+DATASETS = {
+    "small": dict(seed_data.SCALES["small"]),
+    "large": dict(
+        teachers=3, students=300, tasks=3000, tasks_per_student=300,
+        lessons_per_teacher=120, materials_per_teacher=40, notifications_per_student=20
+    ),
+}
+
+SERVER_TIMING_SQL = re.compile(r'desc="(\d+) SQL"')
+
+BOOT_ROUNDS = int(os.environ.get("BENCH_ROUNDS", 5))
+# to samo, co robi worker gunicorna przy starcie (bez dotykania bazy)
+BOOT = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    "print((time.perf_counter() - start) * 1000)\n"
+    "print(','.join(m for m in {lazy!r} if m in sys.modules))\n"
+)
+
+
+# =======================
+# DANE
+# =======================
+def seed(params):
+    result = seed_data.generate(seed=SEED, password=PASSWORD, progress=lambda line: None, **params)
+
+    teacher_id = result["teacher_ids"][0]
+
+    # zadania otwarte i nierozwiązane – najdłuższa ścieżka (doczytanie szkicu),
+    # żeby w obu zbiorach mierzyć to samo
+    lesson_id, lesson_task = (
+        db.session.query(LessonTask.lesson_id, LessonTask.zadanie_id)
+        .join(Lesson, Lesson.id == LessonTask.lesson_id)
+        .join(Zadanie, Zadanie.id == LessonTask.zadanie_id)
+        .filter(Lesson.teacher_id == teacher_id, Zadanie.typ_zadania == "otwarte")
+        .order_by(LessonTask.lesson_id, LessonTask.zadanie_id)
+        .first()
+    )
+    student_id = (
+        db.session.query(LessonStudent.student_id)
+        .filter(LessonStudent.lesson_id == lesson_id)
+        .order_by(LessonStudent.student_id)
+        .limit(1)
+        .scalar()
+    )
+    task = (
+        db.session.query(ZadanieUser.zadanie_id)
+        .join(Zadanie, Zadanie.id == ZadanieUser.zadanie_id)
+        .filter(
+            ZadanieUser.user_id == student_id,
+            ZadanieUser.status == "do zrobienia",
+            Zadanie.typ_zadania == "otwarte"
+        )
+        .order_by(ZadanieUser.zadanie_id)
+        .limit(1)
+        .scalar()
+    )
+    # materiał ze słówkami – więcej relacji do doczytania
+    material = (
+        db.session.query(Material.id)
+        .filter(Material.material_type == "VOCABULARY")
+        .order_by(Material.id)
+        .limit(1)
+        .scalar()
+    )
+
+    return {
+        "teacher": db.session.get(User, teacher_id).login,
+        "student": db.session.get(User, student_id).login,
+        "ids": {"lesson": lesson_id, "lesson_task": lesson_task, "task": task, "material": material},
+    }
+
+
+def build_dataset(name):
+    # aplikacja na osobnej bazie + zalogowani nauczyciel i uczeń
+    class DatasetConfig(Config):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tempfile.mkdtemp(), f"budget_{name}.db")
+
+    app = create_app(DatasetConfig)
+    with app.app_context():
+        db.create_all()
+        data = seed(DATASETS[name])
+
+    clients = {}
+    for role in ("teacher", "student"):
+        clients[role] = app.test_client()
+        clients[role].post("/login", data={"login": data[role], "password": PASSWORD})
+
+    return clients, data["ids"]
+
+
+def count_queries(client, path):
+    # pierwsze żądanie rozgrzewa cache workera (rekomendacje, uprawnienia, analityka)
+    client.get(path)
+    response = client.get(path)
+    match = SERVER_TIMING_SQL.search(response.headers.get("Server-Timing", ""))
+    return response.status_code, int(match.group(1)) if match else None
+
+
+def boot_once(lazy_modules=(), importtime=False):
+    # osobny proces – w tym sys.modules aplikacja jest już zaimportowana
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", BOOT.format(lazy=tuple(lazy_modules))]
+
+    env = dict(os.environ, DATABASE_URL=os.environ.get("DATABASE_URL", "sqlite:///:memory:"))
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+    ms, loaded = proc.stdout.split("\n")[-3:-1]
+    return float(ms), [m for m in loaded.split(",") if m], proc.stderr
+
+
+# =======================
+# PLUGIN PYTEST
+# =======================
+# @pytest.mark.query_budget(n) + fixture query_budget(role, path):
+# żądanie na każdym zbiorze danych, najwyżej n zapytań i bez wzrostu z danymi
+# @pytest.mark.import_budget(ms, lazy=(...)) + fixture import_budget():
+# najlepszy z BENCH_ROUNDS startów aplikacji w ms i bez ładowania modułów z lazy
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(max_queries): limit zapytań SQL na żądanie (fixture query_budget)"
+    )
+    config.addinivalue_line(
+        "markers", "import_budget(max_ms, lazy=()): limit czasu startu aplikacji (fixture import_budget)"
+    )
+
+
+@pytest.fixture(scope="session")
+def budget_datasets():
+    # zbiory budujemy raz na sesję – seed dużego trwa najdłużej
+    return {name: build_dataset(name) for name in DATASETS}
+
+
+@pytest.fixture
+def query_budget(request, budget_datasets):
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is None:
+        pytest.fail("fixture query_budget wymaga @pytest.mark.query_budget(n)")
+    budget = marker.args[0]
+
+    def check(role, path):
+        counts = {}
+        for name, (clients, ids) in budget_datasets.items():
+            status, queries = count_queries(clients[role], path.format(**ids))
+            assert status == 200, f"{role} {path} ({name}): status {status}"
+            assert queries is not None, f"{role} {path} ({name}): brak Server-Timing"
+            counts[name] = queries
+
+        summary = ", ".join(f"{name} {queries}" for name, queries in counts.items())
+        assert max(counts.values()) <= budget, f"{role} {path}: {summary} zapytań > budżet {budget}"
+        assert counts["large"] <= counts["small"], f"{role} {path}: liczba zapytań rośnie z danymi ({summary})"
+        return counts
+
+    return check
+
+
+@pytest.fixture
+def import_budget(request):
+    marker = request.node.get_closest_marker("import_budget")
+    if marker is None:
+        pytest.fail("fixture import_budget wymaga @pytest.mark.import_budget(ms)")
+    budget = marker.args[0]
+    lazy_modules = marker.kwargs.get("lazy", ())
+
+    def check():
+        timings = []
+        loaded = []
+        for _ in range(BOOT_ROUNDS):
+            ms, loaded, _ = boot_once(lazy_modules)
+            timings.append(ms)
+
+        best = min(timings)
+        assert best <= budget, f"start aplikacji: najlepszy {best:.1f} ms > budżet {budget:.0f} ms"
+        assert not loaded, f"przy starcie załadowano: {', '.join(loaded)}"
+        return timings
+
+    return check
@@ -0,0 +1,149 @@
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ENGINE_PROFILES  # noqa: E402
+from db_engine import listen_sqlite_pragmas  # noqa: E402
+from models import db  # noqa: E402
+
+# UWAGA: przy Postgresie podaj pustą, testową bazę – tabele są tworzone i usuwane
+DATABASE_URL = os.environ.get("BENCH_DATABASE_URL")
+WORKERS = int(os.environ.get("BENCH_WORKERS", 4))        # procesy (jak workery gunicorna)
+THREADS = int(os.environ.get("BENCH_THREADS", 4))        # wątki na proces
+DURATION = float(os.environ.get("BENCH_DURATION", 5))    # sekundy na profil
+WRITE_RATIO = float(os.environ.get("BENCH_WRITE_RATIO", 0.1))
+USERS = 200
+TASKS = 500
+
+
+def make_engine(url, profile):
+    options = dict(ENGINE_PROFILES[profile]["engine_options"])
+    if url.startswith("sqlite"):
+        options.pop("pool_recycle", None)
+    engine = create_engine(url, **options)
+    listen_sqlite_pragmas(engine, ENGINE_PROFILES[profile]["sqlite_pragmas"])
+    return engine
+
+
+def seed(url):
+    engine = create_engine(url)
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, imie, nazwisko, login, password_hash, role) "
+            "VALUES (:id, 'U', 'T', :login, '-', 'student')"
+        ), [{"id": i, "login": f"u{i}"} for i in range(1, USERS + 1)])
+        conn.execute(text(
+            "INSERT INTO zadania (id, przedmiot, zakres, rok_arkusza, rodzaj_arkusza, numer_zadania, "
+            "typ_zadania, dzial, tresc, created_by, created_at) "
+            "VALUES (:id, 'matematyka', 'podstawa', 2020, 'matura', 1, 'zamkniete', 'Funkcje', "
+            "'treść', 1, CURRENT_TIMESTAMP)"
+        ), [{"id": i} for i in range(1, TASKS + 1)])
+        conn.execute(text(
+            "INSERT INTO zadania_user (user_id, zadanie_id, status) VALUES (:u, :z, 'do zrobienia')"
+        ), [{"u": u, "z": z} for u in range(1, USERS + 1) for z in range(1, 21)])
+
+    engine.dispose()
+
+
+def _thread_loop(engine, deadline, results, seed_value):
+    rnd = random.Random(seed_value)
+    while time.perf_counter() < deadline:
+        user_id = rnd.randint(1, USERS)
+        write = rnd.random() < WRITE_RATIO
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                if write:
+                    conn.execute(text(
+                        "UPDATE zadania_user SET status = :s WHERE user_id = :u AND zadanie_id = :z"
+                    ), {"s": rnd.choice(["zrobione", "błędne"]), "u": user_id, "z": rnd.randint(1, 20)})
+                    conn.commit()
+                else:
+                    conn.execute(text(
+                        "SELECT z.id, z.dzial, zu.status FROM zadania_user zu "
+                        "JOIN zadania z ON z.id = zu.zadanie_id WHERE zu.user_id = :u"
+                    ), {"u": user_id}).fetchall()
+            results.append(("w" if write else "r", time.perf_counter() - start, None))
+        except Exception as e:
+            results.append(("w" if write else "r", time.perf_counter() - start, type(e).__name__))
+
+
+def _worker(url, profile, deadline, queue, index):
+    import threading
+
+    engine = make_engine(url, profile)
+    results = []
+    threads = [
+        threading.Thread(target=_thread_loop, args=(engine, deadline, results, index * 100 + t))
+        for t in range(THREADS)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    queue.put(results)
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run_profile(url, profile):
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    deadline = time.perf_counter() + DURATION
+    procs = [ctx.Process(target=_worker, args=(url, profile, deadline, queue, i)) for i in range(WORKERS)]
+    for p in procs:
+        p.start()
+    results = [r for _ in procs for r in queue.get()]
+    for p in procs:
+        p.join()
+
+    reads = [d for kind, d, err in results if kind == "r" and err is None]
+    writes = [d for kind, d, err in results if kind == "w" and err is None]
+    errors = [err for _, _, err in results if err]
+
+    print(
+        f"{profile:<16}{len(results) / DURATION:>9.0f}/s"
+        f"{percentile(reads, 0.5) * 1000:>9.2f}{percentile(reads, 0.95) * 1000:>9.2f}"
+        f"{percentile(writes, 0.5) * 1000:>9.2f}{percentile(writes, 0.95) * 1000:>9.2f}"
+        f"{len(errors):>8}"
+    )
+
+
+def main():
+    url = DATABASE_URL or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_profiles.db")
+    dialect = url.split(":", 1)[0].split("+", 1)[0]
+    profiles = [
+        name for name in ENGINE_PROFILES
+        if name == "default" or dialect.startswith(name.split("-")[0])
+    ]
+
+    print(f"{url.split('@')[-1]} – {WORKERS} procesów × {THREADS} wątków, "
+          f"{DURATION:.0f} s, zapisy {WRITE_RATIO:.0%}\n")
+    print(f"{'profil':<16}{'ops':>11}{'r p50':>9}{'r p95':>9}{'w p50':>9}{'w p95':>9}{'błędy':>8}")
+
+    for profile in profiles:
+        # SQLite pamięta journal_mode w pliku – każdy profil dostaje nowy plik
+        if dialect == "sqlite" and not DATABASE_URL:
+            url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), f"bench_{profile}.db")
+        seed(url)
+        run_profile(url, profile)
+
+
+if __name__ == "__main__":
+    main()
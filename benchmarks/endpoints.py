@@ -0,0 +1,352 @@
+import http.cookiejar
+import json
+import os
+import platform
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.error
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# osobna baza, bez logu wolnych żądań i bez kompresji (mierzymy samą aplikację)
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_endpoints.db")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", "sqlite:///" + _db_file)
+os.environ["COMPRESS_ENABLED"] = "0"
+os.environ["SQL_PROFILING"] = "1"
+os.environ["SLOW_REQUEST_MS"] = "1e9"
+
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from models import db, User, ZadanieUser, LessonStudent  # noqa: E402
+import seed_data  # noqa: E402
+
+SCALE = os.environ.get("BENCH_SCALE", "small")
+# skala z seed_data.SCALES, pojedyncze wartości można nadpisać (BENCH_STUDENTS, BENCH_TASKS, …)
+PARAMS = {
+    name: int(os.environ.get(f"BENCH_{name.upper()}", default))
+    for name, default in seed_data.SCALES[SCALE].items()
+}
+
+SEED = int(os.environ.get("BENCH_SEED", 42))
+REQUESTS = int(os.environ.get("BENCH_REQUESTS", 50))   # pomiarów na endpoint
+WARMUP = int(os.environ.get("BENCH_WARMUP", 5))
+MODE = os.environ.get("BENCH_MODE", "client")          # client | gunicorn
+WORKERS = int(os.environ.get("BENCH_WORKERS", 2))
+
+OUTPUT = os.environ.get("BENCH_OUTPUT", os.path.join(ROOT, "benchmarks", "results", "endpoints.json"))
+BASELINE = os.environ.get("BENCH_BASELINE")
+# progi regresji względem bazowego wyniku
+P95_TOLERANCE = float(os.environ.get("BENCH_P95_TOLERANCE", 0.25))        # +25 %
+P95_MIN_DELTA_MS = float(os.environ.get("BENCH_P95_MIN_DELTA_MS", 5))     # szum poniżej 5 ms
+MEMORY_TOLERANCE = float(os.environ.get("BENCH_MEMORY_TOLERANCE", 0.25))
+QUERY_TOLERANCE = int(os.environ.get("BENCH_QUERY_TOLERANCE", 0))         # dodatkowe zapytania
+
+PASSWORD = "bench"
+
+SERVER_TIMING_SQL = re.compile(r'desc="(\d+) SQL"')
+
+
+# =======================
+# DANE (deterministyczne z BENCH_SEED)
+# =======================
+def seed():
+    result = seed_data.generate(seed=SEED, password=PASSWORD, progress=lambda line: None, **PARAMS)
+
+    # nauczyciel z pierwszą lekcją i uczeń, który na nią chodzi
+    teacher_id = result["teacher_ids"][0]
+    lesson_id = result["lesson_ids"][0]
+    student_id = (
+        db.session.query(LessonStudent.student_id)
+        .filter(LessonStudent.lesson_id == lesson_id)
+        .order_by(LessonStudent.student_id)
+        .limit(1)
+        .scalar()
+    )
+
+    student_tasks = [
+        tid for (tid,) in db.session.query(ZadanieUser.zadanie_id)
+        .filter(ZadanieUser.user_id == student_id)
+        .order_by(ZadanieUser.zadanie_id)
+    ]
+
+    return {
+        "teacher_login": db.session.get(User, teacher_id).login,
+        "student_login": db.session.get(User, student_id).login,
+        "lesson_id": lesson_id,
+        "student_tasks": student_tasks,
+    }
+
+
+# =======================
+# SCENARIUSZE
+# =======================
+def scenarios(data):
+    tasks = data["student_tasks"]
+    login_form = {"login": data["teacher_login"], "password": PASSWORD}
+
+    # (nazwa, rola, metoda, url(i), dane(i), json?)
+    return [
+        ("POST /login", None, "POST", lambda i: "/login", lambda i: login_form, False),
+        ("GET /lekcje (teacher)", "teacher", "GET", lambda i: "/lekcje", None, False),
+        ("GET /lekcje (student)", "student", "GET", lambda i: "/lekcje", None, False),
+        ("GET /lekcje/<id>", "teacher", "GET", lambda i: f"/lekcje/{data['lesson_id']}", None, False),
+        ("GET /student/zadania", "student", "GET", lambda i: "/student/zadania", None, False),
+        ("GET /materials", "student", "GET", lambda i: "/materials", None, False),
+        ("GET /vocabulary", "student", "GET", lambda i: "/vocabulary", None, False),
+        ("GET /panel/teacher/assign", "teacher", "GET", lambda i: "/panel/teacher/assign", None, False),
+        ("POST /task/<id>/submit", "student", "POST",
+         lambda i: f"/task/{tasks[i % len(tasks)]}/submit", lambda i: {"answer": "ABCD"[i % 4]}, True),
+    ]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+# =======================
+# KLIENCI: test client / lokalny gunicorn
+# =======================
+class TestClientDriver:
+    def __init__(self, app):
+        self.app = app
+        self.clients = {}
+
+    def login(self, role, login):
+        client = self.app.test_client()
+        client.post("/login", data={"login": login, "password": PASSWORD})
+        self.clients[role] = client
+
+    def request(self, role, method, url, data, as_json):
+        client = self.clients.get(role) or self.app.test_client()
+        kwargs = {"json": data} if as_json else {"data": data}
+        response = client.open(url, method=method, **kwargs)
+        return response.status_code, response.headers.get("Server-Timing", "")
+
+
+class GunicornDriver:
+    def __init__(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        self.openers = {}
+
+        env = dict(
+            os.environ,
+            GUNICORN_BIND=f"127.0.0.1:{port}",
+            GUNICORN_WORKERS=str(WORKERS),
+            GUNICORN_ACCESS_LOG="/dev/null",
+            GUNICORN_LOG_LEVEL="warning",
+            GUNICORN_MAX_REQUESTS="0",
+        )
+        self.proc = subprocess.Popen([sys.executable, "-m", "gunicorn"], cwd=ROOT, env=env)
+
+        deadline = time.time() + 30
+        while True:
+            try:
+                urllib.request.urlopen(self.url + "/login", timeout=1)
+                break
+            except OSError:
+                if time.time() > deadline or self.proc.poll() is not None:
+                    raise RuntimeError("gunicorn nie wystartował")
+                time.sleep(0.2)
+
+    def _opener(self):
+        # bez śledzenia przekierowań – mierzymy jedno żądanie
+        class NoRedirect(urllib.request.HTTPRedirectHandler):
+            def redirect_request(self, *args, **kwargs):
+                return None
+
+        return urllib.request.build_opener(
+            NoRedirect, urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def login(self, role, login):
+        opener = self._opener()
+        self._send(opener, "POST", "/login", {"login": login, "password": PASSWORD}, False)
+        self.openers[role] = opener
+
+    def _send(self, opener, method, url, data, as_json):
+        body, headers = None, {}
+        if data is not None:
+            if as_json:
+                body, headers = json.dumps(data).encode(), {"Content-Type": "application/json"}
+            else:
+                body = urllib.parse.urlencode(data).encode()
+        req = urllib.request.Request(self.url + url, data=body, method=method, headers=headers)
+        try:
+            with opener.open(req) as response:
+                response.read()
+                return response.status, response.headers.get("Server-Timing", "")
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get("Server-Timing", "")
+
+    def request(self, role, method, url, data, as_json):
+        opener = self.openers.get(role) or self._opener()
+        return self._send(opener, method, url, data, as_json)
+
+    def peak_rss_kb(self):
+        with open(f"/proc/{self.proc.pid}/task/{self.proc.pid}/children") as f:
+            pids = f.read().split()
+        peaks = []
+        for pid in pids:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        peaks.append(int(line.split()[1]))
+        return max(peaks) if peaks else None
+
+    def close(self):
+        self.proc.send_signal(signal.SIGTERM)
+        self.proc.wait()
+
+
+# =======================
+# POMIAR
+# =======================
+def run_scenario(driver, scenario):
+    name, role, method, url, data, as_json = scenario
+
+    for i in range(WARMUP):
+        driver.request(role, method, url(i), data(i) if data else None, as_json)
+
+    timings, queries, statuses = [], [], set()
+    for i in range(REQUESTS):
+        start = time.perf_counter()
+        status, server_timing = driver.request(role, method, url(i), data(i) if data else None, as_json)
+        timings.append((time.perf_counter() - start) * 1000)
+        statuses.add(status)
+        match = SERVER_TIMING_SQL.search(server_timing)
+        if match:
+            queries.append(int(match.group(1)))
+
+    result = {
+        "p50_ms": round(percentile(timings, 0.5), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "queries": max(queries) if queries else None,
+        "statuses": sorted(statuses),
+        "peak_kb": None,
+    }
+
+    # szczyt alokacji Pythona osobnym żądaniem (tracemalloc spowalnia pomiar czasu)
+    if isinstance(driver, TestClientDriver):
+        tracemalloc.start()
+        driver.request(role, method, url(REQUESTS), data(REQUESTS) if data else None, as_json)
+        result["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+
+    return result
+
+
+def compare(results, baseline):
+    failures = []
+    print(f"\nporównanie z {BASELINE}")
+    print(f"{'endpoint':<30}{'p95 bazowe':>12}{'p95':>10}{'Δ%':>8}{'SQL':>9}{'pamięć Δ%':>11}")
+
+    for name, base in baseline["endpoints"].items():
+        current = results["endpoints"].get(name)
+        if current is None:
+            failures.append(f"{name}: brak w bieżącym pomiarze")
+            continue
+
+        delta = current["p95_ms"] - base["p95_ms"]
+        delta_pct = 100 * delta / base["p95_ms"] if base["p95_ms"] else 0
+        if delta > P95_MIN_DELTA_MS and current["p95_ms"] > base["p95_ms"] * (1 + P95_TOLERANCE):
+            failures.append(f"{name}: p95 {base['p95_ms']:.1f} → {current['p95_ms']:.1f} ms")
+
+        if base["queries"] is not None and current["queries"] is not None:
+            if current["queries"] > base["queries"] + QUERY_TOLERANCE:
+                failures.append(f"{name}: zapytań SQL {base['queries']} → {current['queries']}")
+
+        memory_pct = ""
+        if base.get("peak_kb") and current.get("peak_kb"):
+            memory_delta = current["peak_kb"] / base["peak_kb"] - 1
+            memory_pct = f"{100 * memory_delta:+.0f}%"
+            if memory_delta > MEMORY_TOLERANCE:
+                failures.append(f"{name}: pamięć {base['peak_kb']:.0f} → {current['peak_kb']:.0f} kB")
+
+        print(
+            f"{name:<30}{base['p95_ms']:>12.2f}{current['p95_ms']:>10.2f}{delta_pct:>+7.0f}%"
+            f"{str(base['queries']) + '→' + str(current['queries']):>9}{memory_pct:>11}"
+        )
+
+    return failures
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        data = seed()
+
+    driver = GunicornDriver() if MODE == "gunicorn" else TestClientDriver(app)
+    try:
+        driver.login("teacher", data["teacher_login"])
+        driver.login("student", data["student_login"])
+
+        print(
+            f"skala {SCALE}: {PARAMS['students']} uczniów, {PARAMS['tasks']} zadań, "
+            f"{PARAMS['students'] * PARAMS['tasks_per_student']} przypisań; "
+            f"{MODE}, {REQUESTS} żądań na endpoint\n"
+        )
+        print(f"{'endpoint':<30}{'p50':>9}{'p95':>9}{'SQL':>6}{'pamięć kB':>11}  statusy")
+
+        endpoints = {}
+        for scenario in scenarios(data):
+            result = run_scenario(driver, scenario)
+            endpoints[scenario[0]] = result
+            print(
+                f"{scenario[0]:<30}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                f"{str(result['queries']):>6}{str(result['peak_kb']):>11}  {result['statuses']}"
+            )
+
+        peak_rss = driver.peak_rss_kb() if MODE == "gunicorn" else None
+    finally:
+        if MODE == "gunicorn":
+            driver.close()
+
+    results = {
+        "meta": {
+            "scale": SCALE,
+            "params": PARAMS,
+            "seed": SEED,
+            "mode": MODE,
+            "requests": REQUESTS,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "python": platform.python_version(),
+            "worker_peak_rss_kb": peak_rss,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "endpoints": endpoints,
+    }
+
+    os.makedirs(os.path.dirname(OUTPUT), exist_ok=True)
+    with open(OUTPUT, "w") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nwyniki: {OUTPUT}")
+
+    if BASELINE:
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline)
+        if failures:
+            print("\n❌ regresje:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print("\n✅ bez regresji")
+
+
+if __name__ == "__main__":
+    main()
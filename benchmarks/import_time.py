@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+# pomiar startu i fixture import_budget – benchmarks/conftest.py;
+# uruchomienie: python benchmarks/import_time.py (albo pytest benchmarks/import_time.py)
+
+BUDGET_MS = float(os.environ.get("BENCH_IMPORT_BUDGET_MS", 1000))
+TOP = int(os.environ.get("BENCH_TOP", 15))
+# ciężkie moduły, które mają się ładować dopiero przy pierwszym użyciu
+LAZY_MODULES = ("numpy",)
+
+
+@pytest.mark.import_budget(BUDGET_MS, lazy=LAZY_MODULES)
+def test_import_budget(import_budget):
+    import_budget()
+
+
+def slowest_imports(stderr):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        # app i moduły importowane bezpośrednio przez niego (wcięcie ≤ 2 w drzewie importów)
+        name = name[1:]
+        if len(name) - len(name.lstrip()) <= 2:
+            rows.append((int(cumulative_us) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:TOP]
+
+
+def report():
+    # tylko podpowiedź, gdzie szukać – budżet sprawdza test_import_budget
+    from conftest import boot_once
+
+    _, _, stderr = boot_once(LAZY_MODULES, importtime=True)
+
+    print(f"start aplikacji (import + create_app), budżet {BUDGET_MS:.0f} ms\n")
+    print(f"{'moduł':<40}{'ms':>9}")
+    for ms, name in slowest_imports(stderr):
+        print(f"{name:<40}{ms:>9.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    report()
+    code = pytest.main([os.path.abspath(__file__), "-q", "-p", "no:cacheprovider", *sys.argv[1:]])
+    print("\n✅ OK" if code == 0 else "\n❌ przekroczony budżet czasu startu")
+    sys.exit(code)
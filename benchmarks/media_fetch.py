@@ -0,0 +1,270 @@
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ["COMPRESS_ENABLED"] = "0"
+
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from models import db, User, Material, MediaAsset  # noqa: E402
+import media_cache  # noqa: E402
+import seed_data  # noqa: E402
+
+PASSWORD = "media"
+CONCURRENCY = 2
+ATTEMPTS = 3
+TIMEOUT = 0.5
+MAX_BYTES = 100_000
+
+
+# =======================
+# LOKALNY SERWER ZASTĘPCZY
+# =======================
+def _png(width, height):
+    # minimalny poprawny PNG (szary, 8 bit) – bez Pillow
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    raw = b"".join(b"\x00" + b"\x80" * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+PNG = _png(1600, 40)
+MP3 = b"ID3" + bytes(range(256)) * 8
+
+
+class StandInServer:
+    def __init__(self):
+        self.hits = Counter()
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.hits[self.path] += 1
+                    hits = server.hits[self.path]
+                # chwila "sieci" – żeby równoległe pobrania na siebie zachodziły
+                time.sleep(0.1)
+                self.respond(hits)
+
+            def respond(self, hits):
+                if self.path in ("/img/a.png", "/img/a-copy.png"):
+                    return self.send(200, "image/png", PNG)
+                if self.path == "/audio/a.mp3":
+                    return self.send(200, "audio/mpeg", MP3)
+                if self.path == "/redirect.png":
+                    self.send_response(302)
+                    self.send_header("Location", "/img/a.png")
+                    self.end_headers()
+                    return
+                if self.path == "/flaky.png":
+                    # dwa razy 503, za trzecim działa
+                    if hits <= 2:
+                        return self.send(503, "text/plain", b"try later")
+                    return self.send(200, "image/png", _png(10, 10))
+                if self.path == "/page.png":
+                    return self.send(200, "text/html", b"<html>not an image</html>")
+                if self.path == "/huge.mp3":
+                    return self.send(200, "audio/mpeg", b"\x00" * (MAX_BYTES + 1))
+                if self.path == "/slow.png":
+                    time.sleep(TIMEOUT * 2)
+                    return self.send(200, "image/png", PNG)
+                return self.send(404, "text/plain", b"not found")
+
+            def send(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return self.base + path
+
+
+class InFlight:
+    # liczone po stronie pobierającego – serwer po przekroczeniu czasu dalej "śpi"
+    def __init__(self, download):
+        self.download = download
+        self.current = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            self.current += 1
+            self.max = max(self.max, self.current)
+        try:
+            return self.download(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.current -= 1
+
+
+# =======================
+# SCENARIUSZ
+# =======================
+# ścieżka → (oczekiwany status, liczba prób)
+EXPECTED = {
+    "/img/a.png": ("ready", 1),
+    "/img/a-copy.png": ("ready", 1),
+    "/redirect.png": ("ready", 1),
+    "/audio/a.mp3": ("ready", 1),
+    "/flaky.png": ("ready", 3),
+    "/missing.png": ("failed", 1),
+    "/page.png": ("failed", 1),
+    "/huge.mp3": ("failed", 1),
+    "/slow.png": ("failed", ATTEMPTS),
+}
+
+
+def main():
+    server = StandInServer()
+    media_folder = tempfile.mkdtemp()
+
+    class MediaConfig(Config):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "media.db")
+        MEDIA_CACHE_FOLDER = media_folder
+        # wątek wyłączony – kolejkę przetwarzamy tu synchronicznie
+        MEDIA_FETCH_ENABLED = False
+        MEDIA_ALLOW_PRIVATE_HOSTS = True
+        MEDIA_FETCH_CONCURRENCY = CONCURRENCY
+        MEDIA_FETCH_ATTEMPTS = ATTEMPTS
+        MEDIA_FETCH_TIMEOUT = TIMEOUT
+        MEDIA_RETRY_SECONDS = 0
+        MEDIA_MAX_BYTES = MAX_BYTES
+
+    app = create_app(MediaConfig)
+    with app.app_context():
+        db.create_all()
+        result = seed_data.generate(
+            seed=1, password=PASSWORD, progress=lambda line: None,
+            teachers=1, students=1, tasks=10, tasks_per_student=1,
+            lessons_per_teacher=1, materials_per_teacher=1, notifications_per_student=1
+        )
+        teacher = db.session.get(User, result["teacher_ids"][0]).login
+        student = db.session.get(User, result["student_ids"][0]).login
+
+    failures = []
+
+    def check(ok, message):
+        print(f"{'✅' if ok else '❌'} {message}")
+        if not ok:
+            failures.append(message)
+
+    # nauczyciel dodaje słówka – adresy trafiają do kolejki razem z materiałem
+    images = ["/img/a.png", "/img/a-copy.png", "/redirect.png", "/flaky.png",
+              "/missing.png", "/page.png", "/slow.png", "/img/a.png"]
+    audios = ["/audio/a.mp3", "/huge.mp3", "", "", "", "", "", "/audio/a.mp3"]
+
+    client = app.test_client()
+    client.post("/login", data={"login": teacher, "password": PASSWORD})
+    response = client.post("/materials/add", data={
+        "title": "Media", "subject": "angielski", "zakres": "podstawa", "dzial": "Słownictwo",
+        "material_type": "VOCABULARY", "vocab_category": "test",
+        "word_en[]": [f"word{i}" for i in range(len(images))],
+        "word_pl[]": [f"słowo{i}" for i in range(len(images))],
+        "image_url[]": [server.url(p) for p in images],
+        "audio_url[]": [server.url(p) if p else "" for p in audios],
+    })
+    check(response.status_code == 302, f"dodanie materiału ({response.status_code})")
+
+    with app.app_context():
+        cache = media_cache.get_media_cache()
+        check(MediaAsset.query.count() == len(EXPECTED), "każdy adres w kolejce raz")
+
+        in_flight = media_cache._download = InFlight(media_cache._download)
+        started = time.perf_counter()
+        rounds = 0
+        while cache.process_pending():
+            rounds += 1
+        print(f"   kolejka przetworzona w {rounds} rundach, {time.perf_counter() - started:.2f} s")
+
+        assets = {a.source_url[len(server.base):]: a for a in MediaAsset.query}
+        for path, (status, attempts) in EXPECTED.items():
+            asset = assets[path]
+            check(
+                (asset.status, asset.attempts) == (status, attempts),
+                f"{path}: {asset.status} po {asset.attempts} próbach ({asset.last_error or 'ok'})"
+            )
+
+        same = {assets[p].filename for p in ("/img/a.png", "/img/a-copy.png", "/redirect.png")}
+        check(len(same) == 1, "ta sama treść spod trzech adresów – jeden plik")
+        check(
+            sorted(os.listdir(media_folder)) == sorted({a.filename for a in assets.values() if a.filename}),
+            "w katalogu tylko gotowe pliki (bez .part)"
+        )
+
+        check(in_flight.max <= CONCURRENCY, f"równoległe pobrania: {in_flight.max} ≤ {CONCURRENCY}")
+        check(server.hits["/audio/a.mp3"] == 1, "adres użyty dwa razy pobrany raz")
+
+        hits = sum(server.hits.values())
+        cache.process_pending()
+        check(sum(server.hits.values()) == hits, "drugie przejście nie pobiera niczego ponownie")
+
+        material_id = db.session.query(Material.id).filter_by(title="Media").scalar()
+
+        # bez zgody na sieć lokalną serwer zastępczy jest niedostępny
+        try:
+            in_flight.download(server.url("/img/a.png"), TIMEOUT, MAX_BYTES, allow_private=False)
+            check(False, "adres loopback odrzucony")
+        except media_cache.FetchError as e:
+            check(e.permanent, f"adres loopback odrzucony ({e})")
+
+    # uczeń widzi lokalne kopie zamiast adresów zewnętrznych
+    client = app.test_client()
+    client.post("/login", data={"login": student, "password": PASSWORD})
+
+    page = client.get(f"/materials/{material_id}").get_data(as_text=True)
+    check(server.url("/img/a.png") not in page and "/media/" in page, "strona materiału wskazuje lokalne kopie")
+    check(server.url("/missing.png") in page, "nieudane pobranie – zostaje adres źródłowy")
+
+    cards = client.get("/vocabulary/review/next").get_json()
+    local = [c["image_url"] for c in cards if c["image_url"] and c["image_url"].startswith("/media/")]
+    check(bool(local), f"fiszki wskazują lokalne kopie ({len(local)} z {len(cards)})")
+
+    media = client.get(local[0]) if local else None
+    check(
+        media is not None and media.status_code == 200
+        and "immutable" in media.headers.get("Cache-Control", "")
+        and media.headers.get("X-Content-Type-Options") == "nosniff",
+        "plik serwowany z cache'em immutable"
+    )
+
+    server.httpd.shutdown()
+
+    if failures:
+        print(f"\n❌ niezgodności: {len(failures)}")
+        sys.exit(1)
+    print("\n✅ pobieranie mediów zgodne z oczekiwaniami")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+# zbiory danych, klienci i fixture query_budget – benchmarks/conftest.py;
+# uruchomienie: python benchmarks/query_budget.py (albo pytest benchmarks/query_budget.py)
+
+# (rola, ścieżka, maksymalna liczba zapytań SQL)
+# {lesson}, {lesson_task}, {task}, {material} – wypełniane z danych dla danej roli
+BUDGETS = [
+    ("teacher", "/lekcje", 3),
+    ("teacher", "/lekcje/{lesson}", 5),
+    ("teacher", "/lekcje/{lesson}/zadania", 4),
+    ("teacher", "/zadania", 2),
+    ("teacher", "/teacher/task/{task}", 4),
+    ("teacher", "/panel/teacher", 2),
+    ("teacher", "/panel/teacher/assign", 4),
+    ("teacher", "/api/zadania?q=funkcja", 2),
+    ("teacher", "/panel/teacher/analityka", 8),
+    ("teacher", "/users", 2),
+    ("teacher", "/materials", 3),
+    ("teacher", "/materials/{material}", 4),
+    ("teacher", "/vocabulary", 2),
+    ("teacher", "/notifications", 1),
+    ("student", "/lekcje", 3),
+    ("student", "/lekcje/{lesson}", 5),
+    ("student", "/lekcje/{lesson}/zadania/{lesson_task}", 8),
+    ("student", "/task/{task}", 6),
+    ("student", "/student/zadania", 2),
+    ("student", "/student/zadania/galaz?przedmiot=matematyka&zakres=podstawa&dzial=Funkcje", 2),
+    ("student", "/panel/student", 4),
+    ("student", "/student/statystyki", 2),
+    ("student", "/student/rekomendacje", 4),
+    ("student", "/egzamin", 3),
+    ("student", "/materials", 3),
+    ("student", "/vocabulary", 2),
+    ("student", "/vocabulary/review/next", 3),
+    ("student", "/notifications", 1),
+]
+
+
+@pytest.mark.parametrize("role, path", [
+    pytest.param(role, path, marks=pytest.mark.query_budget(budget), id=f"{role} {path}")
+    for role, path, budget in BUDGETS
+])
+def test_query_budget(query_budget, role, path):
+    query_budget(role, path)
+
+
+if __name__ == "__main__":
+    code = pytest.main([os.path.abspath(__file__), "-q", "-p", "no:cacheprovider", *sys.argv[1:]])
+    print("\n✅ wszystkie endpointy w budżecie" if code == 0 else "\n❌ przekroczone budżety")
+    sys.exit(code)
@@ -0,0 +1,136 @@
+import http.cookiejar
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKERS = int(os.environ.get("BENCH_WORKERS", 4))
+REQUESTS = int(os.environ.get("BENCH_REQUESTS", 3000))   # żądań na wariant przed pomiarem
+WORKER_CLASS = os.environ.get("BENCH_WORKER_CLASS", "gthread")
+
+VARIANTS = [
+    ("bez preload", {"GUNICORN_PRELOAD": "0", "GUNICORN_GC_FREEZE": "0"}),
+    ("preload", {"GUNICORN_PRELOAD": "1", "GUNICORN_GC_FREEZE": "0"}),
+    ("preload + gc.freeze", {"GUNICORN_PRELOAD": "1", "GUNICORN_GC_FREEZE": "1"}),
+]
+
+PAGES = ["/panel/teacher", "/zadania", "/lekcje", "/panel/teacher/analityka", "/materials"]
+
+
+def seed(env):
+    # osobna baza z nauczycielem, żeby odwiedzać strony po zalogowaniu
+    code = (
+        "from app import create_app\n"
+        "from models import db, User\n"
+        "app = create_app()\n"
+        "with app.app_context():\n"
+        "    db.create_all()\n"
+        "    u = User(imie='B', nazwisko='B', login='bench', role='teacher')\n"
+        "    u.set_password('bench')\n"
+        "    db.session.add(u)\n"
+        "    db.session.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url, proc, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("gunicorn zakończył się przy starcie")
+        try:
+            urllib.request.urlopen(url + "/login", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn nie wystartował")
+
+
+def traffic(url):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    opener.open(url + "/login", urllib.parse.urlencode({"login": "bench", "password": "bench"}).encode())
+    for i in range(REQUESTS):
+        opener.open(url + PAGES[i % len(PAGES)]).read()
+
+
+def worker_pids(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def memory_kb(pid):
+    # smaps_rollup: PSS dzieli strony współdzielone między procesy, które z nich korzystają
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "shared": values["Shared_Clean"] + values["Shared_Dirty"],
+        "private": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def run_variant(env):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = dict(
+        env,
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKERS=str(WORKERS),
+        GUNICORN_WORKER_CLASS=WORKER_CLASS,
+        GUNICORN_ACCESS_LOG="/dev/null",
+        GUNICORN_LOG_LEVEL="warning",
+        # bez restartów w trakcie pomiaru
+        GUNICORN_MAX_REQUESTS="0",
+    )
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn"], cwd=ROOT, env=env)
+    try:
+        wait_ready(url, proc)
+        traffic(url)
+        time.sleep(0.5)
+        workers = [memory_kb(pid) for pid in worker_pids(proc.pid)]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait()
+
+    return workers
+
+
+def main():
+    if not sys.platform.startswith("linux"):
+        sys.exit("Pomiar korzysta z /proc/<pid>/smaps_rollup (tylko Linux)")
+
+    env = dict(os.environ, DATABASE_URL="sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_memory.db"))
+    seed(env)
+
+    print(f"{WORKERS} workerów {WORKER_CLASS}, {REQUESTS} żądań, średnio na workera (MB)\n")
+    print(f"{'wariant':<22}{'RSS':>9}{'PSS':>9}{'wspólne':>9}{'prywatne':>10}")
+
+    for name, variant_env in VARIANTS:
+        workers = run_variant(dict(env, **variant_env))
+        avg = {key: sum(w[key] for w in workers) / len(workers) / 1024 for key in workers[0]}
+        print(
+            f"{name:<22}{avg['rss']:>9.1f}{avg['pss']:>9.1f}"
+            f"{avg['shared']:>9.1f}{avg['private']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
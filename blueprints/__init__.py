@@ -0,0 +1,20 @@
+from blueprints import auth, lessons, tasks, panels, exams, vocabulary, materials, notifications, admin_db, media, jobs
+
+BLUEPRINTS = (
+    auth.bp,
+    lessons.bp,
+    tasks.bp,
+    panels.bp,
+    exams.bp,
+    vocabulary.bp,
+    materials.bp,
+    notifications.bp,
+    admin_db.bp,
+    media.bp,
+    jobs.bp,
+)
+
+
+def register_blueprints(app):
+    for bp in BLUEPRINTS:
+        app.register_blueprint(bp)
@@ -0,0 +1,93 @@
+from flask import Blueprint, request, render_template, abort
+from sqlalchemy import text, inspect
+
+from models import db
+from blueprints.common import login_required, role_required
+
+bp = Blueprint('admin_db', __name__)
+
+
+# =====================================================
+# ======================= BAZA ADMIN ==================
+# =====================================================
+
+@bp.route('/baza', methods=['GET', 'POST'])
+@login_required
+@role_required('admin')
+def baza():
+    query = ""
+    result = None
+    columns = []
+    error = None
+    message = None
+
+    if request.method == 'POST':
+        query = request.form.get('query', '').strip()
+
+        if not query:
+            error = "Zapytanie SQL nie może być puste"
+        else:
+            try:
+                # surowe połączenie (bez ORM)
+                with db.engine.connect() as conn:
+                    # SELECT
+                    if query.lower().startswith("select"):
+                        res = conn.execute(text(query))
+                        result = res.fetchall()
+                        columns = res.keys()
+                    # INSERT / UPDATE / DELETE
+                    else:
+                        conn.execute(text(query))
+                        conn.commit()
+                        message = "Zapytanie wykonane poprawnie"
+
+            except Exception as e:
+                error = str(e)
+
+    return render_template(
+        'baza.html',
+        query=query,
+        result=result,
+        columns=columns,
+        error=error,
+        message=message
+    )
+
+
+@bp.route('/baza/tabele')
+@login_required
+@role_required('admin')
+def baza_tabele():
+    inspector = inspect(db.engine)
+    tables = inspector.get_table_names()
+
+    return render_template(
+        'baza_tabele.html',
+        tables=tables
+    )
+
+
+@bp.route('/baza/tabele/<table_name>')
+@login_required
+@role_required('admin')
+def baza_tabela_podglad(table_name):
+    inspector = inspect(db.engine)
+
+    if table_name not in inspector.get_table_names():
+        abort(404, "Tabela nie istnieje")
+
+    # kolumny
+    columns = [c['name'] for c in inspector.get_columns(table_name)]
+
+    # dane (limit bezpieczeństwa)
+    with db.engine.connect() as conn:
+        result = conn.execute(
+            text(f"SELECT * FROM {table_name} LIMIT 100")
+        ).fetchall()
+
+    return render_template(
+        'baza_tabela_podglad.html',
+        table_name=table_name,
+        columns=columns,
+        rows=result
+    )
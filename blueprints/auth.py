@@ -0,0 +1,165 @@
+import os
+
+from flask import Blueprint, request, render_template, redirect, url_for, session, abort
+
+from models import db, User
+from blueprints.common import login_required, role_required, get_user_avatar
+
+bp = Blueprint('auth', __name__)
+
+
+@bp.app_context_processor
+def inject_current_user():
+    if 'user_id' in session:
+        user = db.session.get(User, session['user_id'])
+        avatar = get_user_avatar(user.id)
+        return dict(current_user=user, current_user_avatar=avatar)
+    return dict(current_user=None, current_user_avatar="avatars/default.png")
+
+
+# =====================================================
+# ======================= AUTH ========================
+# =====================================================
+
+@bp.route('/')
+def index():
+    return redirect(url_for('auth.login'))
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        login = request.form['login']
+        password = request.form['password']
+
+        user = User.query.filter_by(login=login).first()
+
+        if not user or not user.check_password(password):
+            return render_template('login.html', error="Błędny login lub hasło")
+
+        session.clear()
+        session['user_id'] = user.id
+        session['user_role'] = user.role
+        session['user_name'] = f"{user.imie} {user.nazwisko}"
+
+        return redirect(url_for('auth.dashboard'))
+
+    return render_template('login.html')
+
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    return redirect(url_for('auth.login'))
+
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    role = session.get('user_role')
+
+    if role == 'admin':
+        return redirect(url_for('panels.panel_admina'))
+
+    if role == 'teacher':
+        return redirect(url_for('panels.panel_nauczyciela'))
+
+    if role == 'student':
+        return redirect(url_for('panels.panel_ucznia'))
+
+    abort(403)
+
+
+@bp.route('/profile', methods=['GET', 'POST'])
+@login_required
+def profile():
+    user = db.session.get(User, session['user_id'])
+    error = None
+    success = None
+
+    if request.method == 'POST':
+        user.imie = request.form.get('imie')
+        user.nazwisko = request.form.get('nazwisko')
+        avatar = request.files.get('avatar')
+
+        old_password = request.form.get('old_password')
+        new_password = request.form.get('password')
+        confirm_password = request.form.get('password_confirm')
+
+        if avatar and avatar.filename:
+            # 🔒 sprawdź, czy plik faktycznie ma zawartość
+            avatar.stream.seek(0, os.SEEK_END)
+            size = avatar.stream.tell()
+            avatar.stream.seek(0)
+
+            if size > 0:
+                filename = f"user_{user.id}.png"
+                save_path = os.path.join("static", "avatars", filename)
+
+                # usuń stare wersje avatara
+                for ext in ("png", "jpg", "jpeg"):
+                    old = os.path.join("static", "avatars", f"user_{user.id}.{ext}")
+                    if os.path.exists(old):
+                        os.remove(old)
+
+                avatar.save(save_path)
+
+        if new_password:
+            if not old_password:
+                error = "Aby zmienić hasło, podaj stare hasło"
+            elif not user.check_password(old_password):
+                error = "Stare hasło jest nieprawidłowe"
+            elif new_password != confirm_password:
+                error = "Nowe hasła nie są takie same"
+            elif len(new_password) < 6:
+                error = "Hasło musi mieć minimum 6 znaków"
+            else:
+                user.set_password(new_password)
+                db.session.commit()
+                session.clear()
+                return redirect(url_for('auth.login'))
+
+        if not error:
+            db.session.commit()
+            success = "Dane zapisane poprawnie"
+
+    return render_template(
+        'profile.html',
+        user=user,
+        error=error,
+        success=success
+    )
+
+
+@bp.route('/users')
+@login_required
+@role_required('teacher')
+def users():
+    return render_template(
+        'users.html',
+        users=User.query.all()
+    )
+
+
+@bp.route('/users/dodaj', methods=['GET', 'POST'])
+@login_required
+@role_required('teacher')
+def dodaj_usera():
+    if request.method == 'POST':
+        if User.query.filter_by(login=request.form['login']).first():
+            return "Użytkownik z takim loginem już istnieje", 400
+
+        user = User(
+            imie=request.form['imie'],
+            nazwisko=request.form['nazwisko'],
+            login=request.form['login'],
+            role=request.form['role']
+        )
+        user.set_password(request.form['password'])
+
+        db.session.add(user)
+        db.session.commit()
+
+        return redirect(url_for('auth.users'))
+
+    return render_template('dodaj_usera.html')
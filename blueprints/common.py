@@ -0,0 +1,39 @@
+import os
+from functools import wraps
+
+from flask import redirect, url_for, session
+
+
+# =====================================================
+# ======================= HELPERS =====================
+# =====================================================
+
+def login_required(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if 'user_id' not in session:
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+
+    return wrapper
+
+
+def role_required(role):
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if session.get('user_role') != role:
+                return redirect(url_for('auth.dashboard'))
+            return f(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_user_avatar(user_id):
+    for ext in ("png", "jpg", "jpeg"):
+        path = f"avatars/user_{user_id}.{ext}"
+        if os.path.exists(os.path.join("static", path)):
+            return path
+    return "avatars/default.png"
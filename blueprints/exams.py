@@ -0,0 +1,128 @@
+from flask import Blueprint, current_app, request, render_template, redirect, url_for, session, abort
+
+from models import db, Zadanie, ExamSession, ExamAnswer
+from blueprints.common import login_required, role_required
+import exam as exam_service
+
+bp = Blueprint('exams', __name__)
+
+
+# =====================================================
+# ======================= EGZAMIN =====================
+# =====================================================
+
+@bp.route('/egzamin')
+@login_required
+@role_required('student')
+def exam_list():
+    exams = (
+        ExamSession.query
+        .filter_by(student_id=session['user_id'])
+        .order_by(ExamSession.started_at.desc())
+        .limit(20)
+        .all()
+    )
+
+    return render_template(
+        'exam_list.html',
+        sheets=exam_service.available_sheets(),
+        exams=exams,
+        minutes=current_app.config['EXAM_MINUTES']
+    )
+
+
+@bp.route('/egzamin', methods=['POST'])
+@login_required
+@role_required('student')
+def exam_start():
+    przedmiot = request.form.get('przedmiot')
+    rodzaj_arkusza = request.form.get('rodzaj_arkusza')
+    rok_arkusza = request.form.get('rok_arkusza', type=int)
+
+    if not przedmiot or not rodzaj_arkusza or rok_arkusza is None:
+        abort(400, "Nie wybrano arkusza")
+
+    if not exam_service.sheet_exists(przedmiot, rok_arkusza, rodzaj_arkusza):
+        abort(404)
+
+    exam = exam_service.start_exam(
+        session['user_id'],
+        przedmiot,
+        rok_arkusza,
+        rodzaj_arkusza,
+        current_app.config['EXAM_MINUTES']
+    )
+
+    return redirect(url_for('exams.exam_view', exam_id=exam.id))
+
+
+@bp.route('/egzamin/<int:exam_id>')
+@login_required
+@role_required('student')
+def exam_view(exam_id):
+    exam = db.session.get(ExamSession, exam_id)
+
+    if not exam:
+        abort(404)
+
+    if exam.student_id != session['user_id']:
+        abort(403)
+
+    if exam.submitted_at:
+        rows = (
+            db.session.query(ExamAnswer, Zadanie)
+            .join(Zadanie, Zadanie.id == ExamAnswer.zadanie_id)
+            .filter(ExamAnswer.exam_id == exam.id)
+            .order_by(Zadanie.numer_zadania, Zadanie.id)
+            .all()
+        )
+        return render_template('exam_result.html', exam=exam, rows=rows)
+
+    # czas minął, a arkusz nie został oddany – GET niczego nie zapisuje,
+    # strona od razu wysyła pusty formularz i zamknięcie robi exam_submit
+    if exam_service.is_expired(exam):
+        return render_template('exam.html', exam=exam, zadania=[], attachments={}, expired=True)
+
+    zadania, attachments = exam_service.load_sheet(
+        exam.przedmiot, exam.rok_arkusza, exam.rodzaj_arkusza
+    )
+
+    return render_template(
+        'exam.html',
+        exam=exam,
+        zadania=zadania,
+        attachments=attachments,
+        expired=False
+    )
+
+
+@bp.route('/egzamin/<int:exam_id>', methods=['POST'])
+@login_required
+@role_required('student')
+def exam_submit(exam_id):
+    exam = db.session.get(ExamSession, exam_id)
+
+    if not exam:
+        abort(404)
+
+    if exam.student_id != session['user_id']:
+        abort(403)
+
+    if exam.submitted_at:
+        return redirect(url_for('exams.exam_view', exam_id=exam.id))
+
+    if exam_service.is_expired(exam):
+        exam_service.grade_exam(exam, {})
+        return redirect(url_for('exams.exam_view', exam_id=exam.id))
+
+    answers = {}
+    for key, value in request.form.items():
+        if key.startswith('answer_'):
+            try:
+                answers[int(key[len('answer_'):])] = value
+            except ValueError:
+                continue
+
+    exam_service.grade_exam(exam, answers)
+
+    return redirect(url_for('exams.exam_view', exam_id=exam.id))
@@ -0,0 +1,78 @@
+import json
+
+from flask import Blueprint, request, jsonify, render_template, redirect, url_for, session, abort
+
+from models import db, Job, User
+from jobs import get_job_runner
+from blueprints.common import login_required, role_required
+
+bp = Blueprint('jobs', __name__)
+
+STATUSES = ('queued', 'running', 'done', 'failed')
+ADMIN_PAGE = 50
+
+
+# =====================================================
+# ======================= ZADANIA W TLE ===============
+# =====================================================
+
+@bp.route('/jobs/<int:job_id>')
+@login_required
+def job_status(job_id):
+    job = db.session.get(Job, job_id)
+
+    # cudze zadania widzi tylko admin; dla reszty "nie istnieje"
+    if job is None or (job.created_by != session['user_id'] and session.get('user_role') != 'admin'):
+        abort(404)
+
+    return jsonify({
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "created_at": job.created_at.isoformat(),
+        "run_at": job.run_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.last_error,
+    })
+
+
+@bp.route('/admin/jobs')
+@login_required
+@role_required('admin')
+def admin_jobs():
+    status = request.args.get('status')
+
+    counts = dict(
+        db.session.query(Job.status, db.func.count())
+        .group_by(Job.status)
+    )
+
+    jobs = (
+        db.session.query(Job, User.login)
+        .outerjoin(User, User.id == Job.created_by)
+        .order_by(Job.id.desc())
+    )
+    if status in STATUSES:
+        jobs = jobs.filter(Job.status == status)
+
+    return render_template(
+        'admin_jobs.html',
+        statuses=STATUSES,
+        status=status,
+        counts=counts,
+        jobs=jobs.limit(ADMIN_PAGE).all()
+    )
+
+
+@bp.route('/admin/jobs/<int:job_id>/retry', methods=['POST'])
+@login_required
+@role_required('admin')
+def admin_job_retry(job_id):
+    runner = get_job_runner()
+    if runner.retry(job_id):
+        db.session.commit()
+        runner.wake()
+    return redirect(url_for('jobs.admin_jobs', status=request.args.get('status')))
@@ -0,0 +1,615 @@
+from datetime import datetime, date, timedelta
+
+from flask import Blueprint, Response, request, jsonify, render_template, redirect, url_for, session, abort
+from sqlalchemy import insert
+
+from models import db, User, Zadanie, ZadanieUser, ZadanieZalacznik, Lesson, LessonStudent, LessonNote, LessonTask
+from db_routing import read_only
+from lesson_series import INTERVALS, occurrence_dates, parse_skip_dates, create_series, update_following
+from calendar_feed import feed_token, feed_version, user_from_token, rotate_feed, feed_rows, feed_etag, render_feed
+from drafts import get_draft_buffer
+from lesson_assignments import propagate_lesson_tasks
+from lesson_access import get_lesson_membership, lesson_member_required
+from blueprints.common import login_required, role_required
+from blueprints.tasks import save_final_answer
+
+bp = Blueprint('lessons', __name__)
+
+
+# =====================================================
+# ======================= LEKCJE ======================
+# =====================================================
+
+@bp.route("/lekcje")
+@login_required
+@read_only
+def lekcje():
+    user = db.session.get(User, session['user_id'])
+
+    # widoczny tydzień: ?od=RRRR-MM-DD, domyślnie od dziś
+    try:
+        start = datetime.strptime(request.args["od"], "%Y-%m-%d").date()
+    except (KeyError, ValueError):
+        start = date.today()
+
+    days = [start + timedelta(days=i) for i in range(7)]
+
+    # tylko lekcje z widocznego zakresu (indeks teacher_id, date)
+    if user.role == "teacher":
+        lessons = get_teacher_lessons(user, days[0], days[-1])
+    else:
+        lessons = get_student_lessons(user, days[0], days[-1])
+
+    return render_template(
+        "lekcje.html",
+        lessons=lessons,
+        days=days,
+        prev_week=days[0] - timedelta(days=7),
+        next_week=days[0] + timedelta(days=7),
+        role=user.role,
+        feed_url=url_for(
+            "lessons.lesson_feed",
+            token=feed_token(user.id, feed_version(user.id)),
+            _external=True
+        )
+    )
+
+
+@bp.route("/lekcje/kalendarz/nowy-link", methods=["POST"])
+@login_required
+def lesson_feed_rotate():
+    # nowy link do kalendarza – poprzedni (np. udostępniony przez pomyłkę) przestaje działać
+    rotate_feed(session["user_id"])
+    db.session.commit()
+    return redirect(url_for("lessons.lekcje"))
+
+
+@bp.route("/lekcje/uczniowie")
+@login_required
+@role_required("teacher")
+@read_only
+def lesson_students_picker():
+    # lista do formularza nowej lekcji – pobierana dopiero przy otwarciu okna
+    students = (
+        db.session.query(User.id, User.imie, User.nazwisko)
+        .filter(User.role == "student")
+        .order_by(User.nazwisko, User.imie)
+        .all()
+    )
+    return jsonify([
+        {"id": sid, "name": f"{imie} {nazwisko}"}
+        for sid, imie, nazwisko in students
+    ])
+
+
+@bp.route("/lekcje/kalendarz/<token>.ics")
+@read_only
+def lesson_feed(token):
+    # kanał iCalendar dla aplikacji kalendarza – bez sesji, użytkownik z podpisanego tokenu
+    user = user_from_token(token)
+    if not user:
+        abort(404)
+
+    rows = feed_rows(user)
+
+    response = Response(
+        render_feed(rows, request.host),
+        mimetype="text/calendar"
+    )
+    response.set_etag(feed_etag(rows))
+    response.cache_control.private = True
+    response.cache_control.max_age = 300
+
+    # If-None-Match → 304 bez renderowania treści
+    return response.make_conditional(request)
+
+
+@bp.route("/lekcje/<int:lesson_id>")
+@login_required
+@lesson_member_required
+def lesson_detail(lesson_id):
+    user = db.session.get(User, session["user_id"])
+    lesson = db.session.get(Lesson, lesson_id)
+
+    if not lesson:
+        abort(404)
+
+    tasks = get_lesson_tasks(lesson.id, user)
+
+    if user.role == "student":
+        note = (
+            db.session.query(LessonNote)
+            .filter(
+                LessonNote.lesson_id == lesson_id,
+                LessonNote.student_id == user.id
+            )
+            .first()
+        )
+
+        return render_template(
+            "lesson_student.html",
+            lesson=lesson,
+            note=note,
+            tasks=tasks
+        )
+
+    # teacher
+    return render_template(
+        "lesson_teacher.html",
+        lesson=lesson,
+        tasks=tasks
+    )
+
+
+@bp.route("/lekcje/<int:lesson_id>/zadania", methods=["GET"])
+@login_required
+@role_required("teacher")
+def assign_tasks_view(lesson_id):
+    user = db.session.get(User, session["user_id"])
+    lesson = db.session.get(Lesson, lesson_id)
+
+    if not lesson:
+        abort(404)
+
+    if lesson.teacher_id != user.id:
+        abort(403)
+
+    # zadania ładuje picker (/api/zadania)
+    return render_template(
+        "assign_lesson_tasks.html",
+        lesson=lesson
+    )
+
+
+@bp.route("/lekcje/<int:lesson_id>/zadania/<int:zadanie_id>")
+@login_required
+@role_required("student")
+@lesson_member_required
+def student_task_view(lesson_id, zadanie_id):
+    user = db.session.get(User, session["user_id"])
+
+    zadanie = db.session.get(Zadanie, zadanie_id)
+    attachments = ZadanieZalacznik.query.filter_by(
+        zadanie_id=zadanie_id
+    ).all()
+
+    zu = (
+        db.session.query(ZadanieUser)
+        .filter(
+            ZadanieUser.user_id == user.id,
+            ZadanieUser.zadanie_id == zadanie_id
+        )
+        .first()
+    )
+
+    draft = None
+    if zadanie.typ_zadania != 'zamkniete':
+        draft = get_draft_buffer().get(user.id, zadanie_id)
+
+    return render_template(
+        "student_task.html",
+        lesson_id=lesson_id,
+        zadanie=zadanie,
+        zu=zu,
+        draft=draft,
+        attachments=attachments
+    )
+
+
+@bp.route("/lekcje/<int:lesson_id>/zadania/<int:zadanie_id>", methods=["POST"])
+@login_required
+@role_required("student")
+@lesson_member_required
+def student_task_submit(lesson_id, zadanie_id):
+    user = db.session.get(User, session["user_id"])
+
+    answer = request.form.get("answer")
+    zadanie = db.session.get(Zadanie, zadanie_id)
+
+    if not zadanie:
+        abort(404)
+
+    save_final_answer(user.id, zadanie, answer)
+
+    return redirect(url_for(
+        "lessons.student_task_view",
+        lesson_id=lesson_id,
+        zadanie_id=zadanie_id
+    ))
+
+
+@bp.route("/lekcje", methods=["POST"])
+@login_required
+@role_required("teacher")
+def create_lesson():
+    user = db.session.get(User, session["user_id"])
+
+    # --- dane podstawowe ---
+    topic = request.form.get("topic")
+    lesson_date = request.form.get("date")
+    time_from = request.form.get("time_from")
+    time_to = request.form.get("time_to")
+    teacher_comment = request.form.get("teacher_comment")
+
+    # --- powtarzanie (opcjonalne): weekly / biweekly do daty, z pominiętymi terminami ---
+    repeat = request.form.get("repeat")
+    repeat_until = request.form.get("repeat_until")
+
+    if not topic or not lesson_date:
+        abort(400, "Brak tematu lub daty lekcji")
+
+    if repeat and (repeat not in INTERVALS or not repeat_until):
+        abort(400, "Niepoprawne ustawienia powtarzania")
+
+    try:
+        fields = dict(
+            topic=topic,
+            time_from=datetime.strptime(time_from, "%H:%M").time()
+            if time_from else None,
+            time_to=datetime.strptime(time_to, "%H:%M").time()
+            if time_to else None,
+            teacher_comment=teacher_comment
+        )
+        first_date = datetime.strptime(lesson_date, "%Y-%m-%d").date()
+        if repeat:
+            until = datetime.strptime(repeat_until, "%Y-%m-%d").date()
+            skip = parse_skip_dates(request.form.get("repeat_skip"))
+    except ValueError:
+        abort(400, "Niepoprawny format daty lub godziny")
+
+    if repeat:
+        try:
+            dates = occurrence_dates(first_date, until, INTERVALS[repeat], skip)
+        except ValueError as e:
+            abort(400, str(e))
+        if not dates:
+            abort(400, "Wszystkie terminy serii zostały pominięte")
+
+    # --- przypisanie uczniów (opcjonalne) ---
+    student_ids = request.form.getlist("student_ids")
+
+    student_ids = [
+        sid for sid, in
+        db.session.query(User.id)
+        .filter(
+            User.id.in_(student_ids),
+            User.role == "student"
+        )
+    ]
+
+    if repeat:
+        # cała seria: kilka wielowierszowych INSERT-ów w jednej transakcji
+        create_series(user.id, INTERVALS[repeat], dates, student_ids, **fields)
+    else:
+        lesson = Lesson(date=first_date, teacher_id=user.id, **fields)
+
+        db.session.add(lesson)
+        db.session.flush()  # 👈 mamy lesson.id bez commit
+
+        for sid in student_ids:
+            db.session.add(
+                LessonStudent(
+                    lesson_id=lesson.id,
+                    student_id=sid
+                )
+            )
+
+    db.session.commit()
+    get_lesson_membership().invalidate_users(user.id, *student_ids)
+
+    return redirect(url_for("lessons.lekcje"))
+
+
+@bp.route("/lekcje/<int:lesson_id>/edit", methods=["POST"])
+@login_required
+@role_required("teacher")
+def update_lesson(lesson_id):
+    user = db.session.get(User, session["user_id"])
+    lesson = db.session.get(Lesson, lesson_id)
+
+    if not lesson:
+        abort(404, "Lekcja nie istnieje")
+
+    # tylko autor lekcji może edytować
+    if lesson.teacher_id != user.id:
+        abort(403, "Brak dostępu do tej lekcji")
+
+    # --- dane z formularza ---
+    topic = request.form.get("topic")
+    lesson_date = request.form.get("date")
+    time_from = request.form.get("time_from")
+    time_to = request.form.get("time_to")
+    teacher_comment = request.form.get("teacher_comment")
+
+    # "this" – tylko ta lekcja; "following" – ta i następne z serii
+    scope = request.form.get("scope", "this")
+
+    if not topic or not lesson_date:
+        abort(400, "Temat i data są wymagane")
+
+    try:
+        new_date = datetime.strptime(lesson_date, "%Y-%m-%d").date()
+        fields = dict(
+            topic=topic,
+            time_from=datetime.strptime(time_from, "%H:%M").time()
+            if time_from else None,
+            time_to=datetime.strptime(time_to, "%H:%M").time()
+            if time_to else None,
+            teacher_comment=teacher_comment
+        )
+    except ValueError:
+        abort(400, "Niepoprawny format daty lub godziny")
+
+    if scope == "following" and lesson.series_link:
+        # jeden UPDATE dla wszystkich kolejnych terminów; zmiana daty przesuwa je o tyle samo dni
+        update_following(lesson, new_date, **fields)
+    else:
+        lesson.date = new_date
+        for name, value in fields.items():
+            setattr(lesson, name, value)
+
+    db.session.commit()
+
+    return redirect(url_for("lessons.lekcje"))
+
+
+@bp.route("/lekcje/<int:lesson_id>/notatka", methods=["POST"])
+@login_required
+@role_required("student")
+@lesson_member_required
+def upsert_lesson_note(lesson_id):
+    user = db.session.get(User, session["user_id"])
+
+    note_text = request.form.get("note") or (
+        request.json.get("note") if request.is_json else None
+    )
+
+    if note_text is None:
+        abort(400, "Brak treści notatki")
+
+    # UPSERT (dzięki UniqueConstraint)
+    note = (
+        db.session.query(LessonNote)
+        .filter(
+            LessonNote.lesson_id == lesson_id,
+            LessonNote.student_id == user.id
+        )
+        .first()
+    )
+
+    if note:
+        note.note = note_text
+    else:
+        note = LessonNote(
+            lesson_id=lesson_id,
+            student_id=user.id,
+            note=note_text
+        )
+        db.session.add(note)
+
+    db.session.commit()
+
+    # HTML → redirect, JS → JSON
+    if request.is_json:
+        return jsonify({"status": "ok", "note": note.note})
+
+    return redirect(url_for("lessons.lekcje"))
+
+
+@bp.route("/lekcje/<int:lesson_id>/zadania", methods=["POST"])
+@login_required
+@role_required("teacher")
+def assign_tasks_to_lesson(lesson_id):
+    user = db.session.get(User, session["user_id"])
+    lesson = db.session.get(Lesson, lesson_id)
+
+    if not lesson:
+        abort(404, "Lekcja nie istnieje")
+
+    # bezpieczeństwo: tylko autor lekcji
+    if lesson.teacher_id != user.id:
+        abort(403, "Brak dostępu do tej lekcji")
+
+    # lista ID zadań (checkboxy / multi-select)
+    task_ids = request.form.getlist("zadanie_ids", type=int)
+
+    if not task_ids:
+        abort(400, "Nie wybrano zadań")
+
+    existing_task_ids = {
+        lt.zadanie_id for lt in lesson.lesson_tasks
+    }
+
+    new_task_ids = [
+        tid for tid, in
+        db.session.query(Zadanie.id).filter(Zadanie.id.in_(task_ids))
+        if tid not in existing_task_ids
+    ]
+
+    if new_task_ids:
+        db.session.execute(insert(LessonTask), [
+            {"lesson_id": lesson.id, "zadanie_id": tid}
+            for tid in new_task_ids
+        ])
+        # uczniowie lekcji dostają nowe zadania jako "do zrobienia"
+        propagate_lesson_tasks([lesson.id], zadanie_ids=new_task_ids)
+
+    db.session.commit()
+    get_lesson_membership().invalidate_lesson(lesson.id)
+
+    return redirect(url_for("lessons.lekcje"))
+
+
+@bp.route("/lekcje/<int:lesson_id>/uczniowie", methods=["POST"])
+@login_required
+@role_required("teacher")
+def add_lesson_students(lesson_id):
+    user = db.session.get(User, session["user_id"])
+    lesson = db.session.get(Lesson, lesson_id)
+
+    if not lesson:
+        abort(404, "Lekcja nie istnieje")
+
+    if lesson.teacher_id != user.id:
+        abort(403, "Brak dostępu do tej lekcji")
+
+    student_ids = request.form.getlist("student_ids", type=int)
+
+    if not student_ids:
+        abort(400, "Nie wybrano uczniów")
+
+    existing_ids = {
+        sid for sid, in
+        db.session.query(LessonStudent.student_id).filter(LessonStudent.lesson_id == lesson.id)
+    }
+
+    new_ids = [
+        sid for sid, in
+        db.session.query(User.id).filter(User.id.in_(student_ids), User.role == "student")
+        if sid not in existing_ids
+    ]
+
+    if new_ids:
+        db.session.execute(insert(LessonStudent), [
+            {"lesson_id": lesson.id, "student_id": sid}
+            for sid in new_ids
+        ])
+        # nowi uczniowie dostają zadania, które lekcja już ma
+        propagate_lesson_tasks([lesson.id], student_ids=new_ids)
+
+    db.session.commit()
+    get_lesson_membership().invalidate_users(*new_ids)
+
+    return redirect(url_for("lessons.lesson_detail", lesson_id=lesson.id))
+
+
+def get_lesson_tasks(lesson_id, user):
+    # UCZEŃ – status dołączony jednym zapytaniem (outer join), nie osobno dla każdego zadania
+    if user.role == "student":
+        rows = (
+            db.session.query(Zadanie, ZadanieUser.status)
+            .join(LessonTask, LessonTask.zadanie_id == Zadanie.id)
+            .outerjoin(
+                ZadanieUser,
+                (ZadanieUser.zadanie_id == Zadanie.id) & (ZadanieUser.user_id == user.id)
+            )
+            .filter(LessonTask.lesson_id == lesson_id)
+            .all()
+        )
+        return [{
+            "id": z.id,
+            "title": f"{z.przedmiot} – {z.dzial}",
+            "numer": z.numer_zadania,
+            "status": status or "nieoddane"
+        } for z, status in rows]
+
+    tasks = (
+        db.session.query(Zadanie)
+        .join(LessonTask, LessonTask.zadanie_id == Zadanie.id)
+        .filter(LessonTask.lesson_id == lesson_id)
+        .all()
+    )
+
+    # NAUCZYCIEL
+    return [{
+        "id": z.id,
+        "title": f"{z.przedmiot} – {z.dzial}",
+        "numer": z.numer_zadania
+    } for z in tasks]
+
+
+def _in_date_range(query, date_from, date_to):
+    if date_from is not None:
+        query = query.filter(Lesson.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Lesson.date <= date_to)
+    return query
+
+
+def _tasks_count():
+    # skorelowane podzapytanie – liczone tylko dla lekcji z wyniku (indeks klucza głównego)
+    return (
+        db.session.query(db.func.count())
+        .filter(LessonTask.lesson_id == Lesson.id)
+        .correlate(Lesson)
+        .scalar_subquery()
+    )
+
+
+def get_teacher_lessons(user: User, date_from=None, date_to=None):
+    # liczniki uczniów i zadań w tym samym zapytaniu – stała liczba zapytań niezależnie od liczby lekcji
+    students_count = (
+        db.session.query(db.func.count())
+        .filter(LessonStudent.lesson_id == Lesson.id)
+        .correlate(Lesson)
+        .scalar_subquery()
+    )
+
+    query = (
+        db.session.query(Lesson, students_count, _tasks_count())
+        .filter(Lesson.teacher_id == user.id)
+    )
+    rows = (
+        _in_date_range(query, date_from, date_to)
+        .order_by(Lesson.date.desc(), Lesson.time_from)
+        .all()
+    )
+
+    result = []
+
+    for lesson, n_students, n_tasks in rows:
+        result.append({
+            "type": "teacher",
+            "lesson_id": lesson.id,
+            "date": lesson.date,
+            "time_from": lesson.time_from,
+            "time_to": lesson.time_to,
+            "topic": lesson.topic,
+            "teacher_comment": lesson.teacher_comment,
+
+            "students_count": n_students,
+            "tasks_count": n_tasks,
+
+            "can_assign_tasks": True,
+            "can_comment": True
+        })
+
+    return result
+
+
+def get_student_lessons(user: User, date_from=None, date_to=None):
+    query = (
+        db.session.query(Lesson, LessonNote.note, _tasks_count())
+        .join(LessonStudent)
+        .outerjoin(
+            LessonNote,
+            (LessonNote.lesson_id == Lesson.id) & (LessonNote.student_id == user.id)
+        )
+        .filter(LessonStudent.student_id == user.id)
+    )
+    rows = (
+        _in_date_range(query, date_from, date_to)
+        .order_by(Lesson.date.desc(), Lesson.time_from)
+        .all()
+    )
+
+    result = []
+
+    for lesson, note, n_tasks in rows:
+        result.append({
+            "type": "student",
+            "lesson_id": lesson.id,
+            "date": lesson.date,
+            "time_from": lesson.time_from,
+            "time_to": lesson.time_to,
+            "topic": lesson.topic,
+            "teacher_comment": lesson.teacher_comment,
+
+            "note": note or "",
+
+            "tasks_count": n_tasks,
+
+            "can_add_notes": True
+        })
+
+    return result
@@ -0,0 +1,143 @@
+from collections import defaultdict
+
+from flask import Blueprint, request, render_template, redirect, url_for, session, abort
+
+from models import db, Material, MaterialNote, VocabularyItem
+from db_routing import read_only
+from media_cache import get_media_cache
+from subjects import DZIALY_PRZEDMIOTOW, PRZEDMIOTY, ZAKRESY
+from blueprints.common import login_required, role_required
+
+bp = Blueprint('materials', __name__)
+
+
+# =====================================================
+# ======================= MATERIAŁY ===================
+# =====================================================
+
+@bp.route("/materials")
+@login_required
+@read_only
+def materials():
+    materials = Material.query.all()
+
+    tree = defaultdict(
+        lambda: defaultdict(
+            lambda: defaultdict(
+                lambda: defaultdict(list)
+            )
+        )
+    )
+
+    # kategorie słówek wszystkich materiałów jednym zapytaniem, nie osobno dla każdego
+    categories = defaultdict(set)
+    for material_id, category in (
+        db.session.query(VocabularyItem.material_id, VocabularyItem.category).distinct()
+    ):
+        categories[material_id].add(category or "Inne")
+
+    for m in materials:
+        if m.material_type == "VOCABULARY":
+            for cat in categories[m.id]:
+                tree[m.subject][m.zakres][m.dzial][cat].append(m)
+        else:
+            tree[m.subject][m.zakres][m.dzial]["_"].append(m)
+
+    return render_template("materials.html", tree=tree)
+
+
+@bp.route("/materials/add", methods=["GET", "POST"])
+@login_required
+@role_required("teacher")
+def add_material():
+    if request.method == "POST":
+        title = request.form.get("title")
+        subject = request.form.get("subject")
+        zakres = request.form.get("zakres")
+        dzial = request.form.get("dzial")
+        material_type = request.form.get("material_type")
+
+        if not all([title, subject, zakres, dzial, material_type]):
+            abort(400, "Brak wymaganych danych")
+
+        material = Material(
+            title=title,
+            subject=subject,
+            zakres=zakres,
+            dzial=dzial,
+            material_type=material_type,
+            created_by=session["user_id"]
+        )
+
+        db.session.add(material)
+        db.session.flush()  # TERAZ przejdzie
+
+        media_added = 0
+
+        # ===== NOTATKA =====
+        if material_type == "NOTE":
+            content = request.form.get("content")
+            if not content:
+                abort(400, "Notatka nie może być pusta")
+
+            note = MaterialNote(
+                material_id=material.id,
+                content=content
+            )
+            db.session.add(note)
+
+        # ===== SŁÓWKA =====
+        elif material_type == "VOCABULARY":
+            words_en = request.form.getlist("word_en[]")
+            words_pl = request.form.getlist("word_pl[]")
+            images = request.form.getlist("image_url[]")
+            audios = request.form.getlist("audio_url[]")
+
+            vocab_category = request.form.get("vocab_category")
+
+            media = []
+            for i in range(len(words_en)):
+                if not words_en[i] or not words_pl[i]:
+                    continue
+
+                vocab = VocabularyItem(
+                    material_id=material.id,
+                    word_en=words_en[i],
+                    word_pl=words_pl[i],
+                    image_url=images[i] or None,
+                    audio_url=audios[i] or None,
+                    category=vocab_category
+                )
+                db.session.add(vocab)
+                media += [(vocab.image_url, "image"), (vocab.audio_url, "audio")]
+
+            # kopie obrazków i audio pobiera w tle wątek workera
+            media_added = get_media_cache().enqueue(media)
+
+        else:
+            abort(400, "Nieznany typ materiału")
+
+        db.session.commit()
+        if media_added:
+            get_media_cache().wake()
+        return redirect(url_for("materials.materials"))
+
+    return render_template(
+        "material_add.html",
+        PRZEDMIOTY=PRZEDMIOTY,
+        ZAKRESY=ZAKRESY,
+        DZIALY_PRZEDMIOTOW=DZIALY_PRZEDMIOTOW
+    )
+
+
+@bp.route("/materials/<int:material_id>")
+@login_required
+@read_only
+def material_view(material_id):
+    material = Material.query.get_or_404(material_id)
+
+    media = get_media_cache().local_urls(
+        url for v in material.vocabulary_items for url in (v.image_url, v.audio_url)
+    ) if material.material_type == "VOCABULARY" else {}
+
+    return render_template("material_view.html", material=material, media=media)
@@ -0,0 +1,23 @@
+from flask import Blueprint, send_from_directory
+
+from media_cache import get_media_cache
+from blueprints.common import login_required
+
+bp = Blueprint('media', __name__)
+
+# nazwa pliku to skrót treści – ten sam adres zawsze oznacza te same bajty
+MEDIA_MAX_AGE = 365 * 24 * 3600
+
+
+# =====================================================
+# ======================= MEDIA SŁÓWEK ================
+# =====================================================
+
+@bp.route("/media/<filename>")
+@login_required
+def media_file(filename):
+    response = send_from_directory(get_media_cache().folder, filename, max_age=MEDIA_MAX_AGE)
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    return response
@@ -0,0 +1,46 @@
+from flask import Blueprint, jsonify, session
+
+from models import db, Notification
+from db_routing import read_only
+from blueprints.common import login_required
+
+bp = Blueprint('notifications', __name__)
+
+
+# =====================================================
+# ======================= POWIADOMIENIA ===============
+# =====================================================
+
+@bp.route("/notifications")
+@login_required
+@read_only
+def get_notifications():
+    notifs = (
+        Notification.query
+        .filter_by(user_id=session["user_id"])
+        .order_by(Notification.created_at.desc())
+        .limit(10)
+        .all()
+    )
+
+    return jsonify([
+        {
+            "id": n.id,
+            "content": n.content,
+            "created_at": n.created_at.strftime("%d.%m.%Y %H:%M"),
+            "is_read": n.is_read
+        }
+        for n in notifs
+    ])
+
+
+@bp.route("/notifications/read", methods=["POST"])
+@login_required
+def mark_notifications_read():
+    Notification.query.filter_by(
+        user_id=session["user_id"],
+        is_read=False
+    ).update({Notification.is_read: True})
+
+    db.session.commit()
+    return jsonify({"status": "ok"})
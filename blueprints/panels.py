@@ -0,0 +1,320 @@
+import json
+from collections import defaultdict
+from datetime import date
+
+from flask import Blueprint, request, jsonify, render_template, redirect, url_for, session
+from sqlalchemy import func
+
+from models import db, User, Zadanie, ZadanieUser, Lesson, LessonStudent, ExamSession, Job
+from stats import get_student_stats, count_status
+from jobs import enqueue, get_job_runner
+from lesson_assignments import assign_tasks_to_students
+from db_routing import read_only
+from subjects import PRZEDMIOTY
+from blueprints.common import login_required, role_required
+import recommender
+
+bp = Blueprint('panels', __name__)
+
+TREE_STATUSES = ('do zrobienia', 'oddane', 'zrobione', 'błędne')
+BRANCH_PAGE = 100
+DASHBOARD_ROWS = 5
+RECENT_JOBS = 5
+
+
+# =====================================================
+# ======================= PANELS ======================
+# =====================================================
+
+@bp.route('/panel/admin')
+@login_required
+@role_required('admin')
+def panel_admina():
+    return render_template('panel_admina.html')
+
+
+@bp.route('/panel/student')
+@login_required
+@role_required('student')
+@read_only
+def panel_ucznia():
+    user = db.session.get(User, session['user_id'])
+
+    # liczniki z tabeli podsumowań (student_dzial_stats) – bez listy zadań;
+    # pełna lista: /student/zadania (gałęzie ładowane na żądanie)
+    dzialy = [row for rows in get_student_stats(user.id).values() for row in rows]
+
+    statusy = {
+        'do zrobienia': sum(r.assigned - r.done - r.wrong - r.pending for r in dzialy),
+        'oddane': sum(r.pending for r in dzialy),
+        'zrobione': sum(r.done for r in dzialy),
+        'błędne': sum(r.wrong for r in dzialy),
+    }
+
+    # działy z największą liczbą zadań do zrobienia
+    do_zrobienia = sorted(
+        (r for r in dzialy if r.assigned - r.done - r.wrong - r.pending > 0),
+        key=lambda r: r.assigned - r.done - r.wrong - r.pending,
+        reverse=True
+    )[:DASHBOARD_ROWS]
+
+    ostatnie_dzialy = sorted(
+        (r for r in dzialy if r.last_activity),
+        key=lambda r: r.last_activity,
+        reverse=True
+    )[:DASHBOARD_ROWS]
+
+    lekcje = (
+        db.session.query(Lesson.id, Lesson.date, Lesson.time_from, Lesson.topic)
+        .join(LessonStudent, LessonStudent.lesson_id == Lesson.id)
+        .filter(LessonStudent.student_id == user.id, Lesson.date >= date.today())
+        .order_by(Lesson.date, Lesson.time_from)
+        .limit(DASHBOARD_ROWS)
+        .all()
+    )
+
+    egzaminy = (
+        db.session.query(
+            ExamSession.id,
+            ExamSession.przedmiot,
+            ExamSession.rok_arkusza,
+            ExamSession.submitted_at,
+            ExamSession.score,
+            ExamSession.max_score
+        )
+        .filter(ExamSession.student_id == user.id, ExamSession.submitted_at.isnot(None))
+        .order_by(ExamSession.submitted_at.desc())
+        .limit(DASHBOARD_ROWS)
+        .all()
+    )
+
+    return render_template(
+        'panel_ucznia.html',
+        user=user,
+        statusy=statusy,
+        do_zrobienia=do_zrobienia,
+        ostatnie_dzialy=ostatnie_dzialy,
+        lekcje=lekcje,
+        egzaminy=egzaminy
+    )
+
+
+@bp.route('/panel/teacher')
+@login_required
+@role_required('teacher')
+def panel_nauczyciela():
+    # ostatnie przydziały w tle – status odświeża /jobs/<id>
+    jobs = [
+        dict(row._mapping, result=json.loads(row.result) if row.result else None)
+        for row in db.session.query(Job.id, Job.status, Job.created_at, Job.result, Job.last_error)
+        .filter(Job.created_by == session['user_id'])
+        .order_by(Job.created_at.desc())
+        .limit(RECENT_JOBS)
+    ]
+    return render_template('panel_nauczyciela.html', jobs=jobs)
+
+
+@bp.route('/panel/teacher/assign', methods=['GET'])
+@login_required
+@role_required('teacher')
+def assign_view():
+    dzialy = (
+        db.session.query(Zadanie.dzial)
+        .distinct()
+        .order_by(Zadanie.dzial)
+        .all()
+    )
+
+    dzialy = [d[0] for d in dzialy]
+
+    # zadania ładuje picker (/api/zadania) – tu tylko uczniowie, bez haseł i ról
+    users = (
+        db.session.query(User.id, User.imie, User.nazwisko)
+        .filter(User.role == 'student')
+        .order_by(User.nazwisko, User.imie)
+        .all()
+    )
+
+    return render_template(
+        'assign_tasks.html',
+        users=users,
+        dzialy=dzialy
+    )
+
+
+@bp.route('/panel/teacher/assign', methods=['POST'])
+@login_required
+@role_required('teacher')
+def assign_tasks():
+    user_ids = request.form.getlist('user_ids')
+    mode = request.form['mode']
+
+    if not user_ids:
+        return "Nie wybrano uczniów", 400
+
+    # wybór zadań; wielu uczniów × cały bank zadań trwa – przydział robi zadanie w tle
+    selection = {}
+    if mode == 'single':
+        selection['zadanie_id'] = request.form.get('zadanie_id', type=int)
+        if selection['zadanie_id'] is None:
+            return "Nie wybrano zadania", 400
+    elif mode == 'section':
+        selection['dzial'] = request.form['dzial']
+
+    student_ids = [int(uid) for uid in user_ids]
+    runner = get_job_runner()
+
+    # JOBS_ENABLED=0 – w tym procesie nikt kolejki nie obsłuży, przydzielamy od razu
+    if not runner.enabled:
+        assign_tasks_to_students(student_ids, **selection)
+        db.session.commit()
+        return redirect(url_for('panels.panel_nauczyciela'))
+
+    enqueue('assign_tasks', created_by=session['user_id'], student_ids=student_ids, **selection)
+    db.session.commit()
+    runner.wake()
+
+    return redirect(url_for('panels.panel_nauczyciela'))
+
+
+@bp.route('/panel/teacher/analityka')
+@login_required
+@role_required('teacher')
+def teacher_analytics():
+    # numpy ładujemy dopiero przy pierwszym wejściu, nie przy starcie workera
+    import analytics
+
+    lesson_id = request.args.get('lesson_id', type=int)
+
+    lessons = (
+        db.session.query(Lesson.id, Lesson.date, Lesson.topic)
+        .filter(Lesson.teacher_id == session['user_id'])
+        .order_by(Lesson.date.desc())
+        .all()
+    )
+
+    student_ids = analytics.get_teacher_group(session['user_id'], lesson_id)
+
+    return render_template(
+        'teacher_analytics.html',
+        lessons=lessons,
+        lesson_id=lesson_id,
+        students_count=len(student_ids),
+        result=analytics.get_class_analytics(student_ids)
+    )
+
+
+@bp.route('/student/zadania')
+@login_required
+@role_required('student')
+@read_only
+def zadania_ucznia():
+    user = db.session.get(User, session['user_id'])
+
+    # drzewo przedmiot → zakres → dział z samych liczników (GROUP BY);
+    # zadania gałęzi pobiera przeglądarka dopiero po rozwinięciu
+    rows = (
+        db.session.query(
+            Zadanie.przedmiot,
+            Zadanie.zakres,
+            Zadanie.dzial,
+            func.count(),
+            *(count_status(status) for status in TREE_STATUSES)
+        )
+        .join(ZadanieUser, Zadanie.id == ZadanieUser.zadanie_id)
+        .filter(ZadanieUser.user_id == user.id)
+        .group_by(Zadanie.przedmiot, Zadanie.zakres, Zadanie.dzial)
+        .order_by(Zadanie.przedmiot, Zadanie.zakres, Zadanie.dzial)
+        .all()
+    )
+
+    struktura = defaultdict(lambda: defaultdict(dict))
+
+    for przedmiot, zakres, dzial, total, *counts in rows:
+        struktura[przedmiot][zakres][dzial] = {
+            'total': total,
+            'statusy': dict(zip(TREE_STATUSES, counts))
+        }
+
+    return render_template(
+        'zadania_ucznia.html',
+        user=user,
+        struktura=struktura,
+        PRZEDMIOTY=PRZEDMIOTY
+    )
+
+
+@bp.route('/student/zadania/galaz')
+@login_required
+@role_required('student')
+@read_only
+def zadania_ucznia_galaz():
+    # zadania jednego działu – same kolumny listy, stronicowanie po id (?po=<ostatnie id>)
+    after = request.args.get('po', type=int)
+
+    query = (
+        db.session.query(
+            Zadanie.id,
+            Zadanie.rodzaj_arkusza,
+            Zadanie.rok_arkusza,
+            Zadanie.numer_zadania,
+            ZadanieUser.status
+        )
+        .join(ZadanieUser, Zadanie.id == ZadanieUser.zadanie_id)
+        .filter(
+            ZadanieUser.user_id == session['user_id'],
+            Zadanie.przedmiot == request.args.get('przedmiot'),
+            Zadanie.zakres == request.args.get('zakres'),
+            Zadanie.dzial == request.args.get('dzial')
+        )
+    )
+    if after is not None:
+        query = query.filter(Zadanie.id > after)
+
+    rows = query.order_by(Zadanie.id).limit(BRANCH_PAGE + 1).all()
+    page = rows[:BRANCH_PAGE]
+
+    return jsonify({
+        'items': [
+            {
+                'id': zid,
+                'rodzaj': rodzaj,
+                'rok': rok,
+                'numer': numer,
+                'status': status,
+                'url': url_for('tasks.resolve_task', zadanie_id=zid)
+            }
+            for zid, rodzaj, rok, numer, status in page
+        ],
+        'next': page[-1][0] if len(rows) > BRANCH_PAGE else None
+    })
+
+
+@bp.route('/student/rekomendacje')
+@login_required
+@role_required('student')
+def student_recommendations():
+    limit = max(1, min(request.args.get('limit', 5, type=int), 50))
+    return jsonify(recommender.recommend(session['user_id'], limit))
+
+
+@bp.route('/student/nastepne-zadanie')
+@login_required
+@role_required('student')
+def next_task():
+    best = recommender.recommend(session['user_id'], limit=1)
+
+    if not best:
+        return redirect(url_for('panels.zadania_ucznia'))
+
+    return redirect(url_for('tasks.resolve_task', zadanie_id=best[0]['zadanie_id']))
+
+
+@bp.route('/student/statystyki')
+@login_required
+@role_required('student')
+def student_stats():
+    return render_template(
+        'student_stats.html',
+        stats=get_student_stats(session['user_id'])
+    )
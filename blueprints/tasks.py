@@ -0,0 +1,374 @@
+import os
+
+from flask import Blueprint, current_app, request, jsonify, render_template, redirect, url_for, session
+from sqlalchemy import or_
+from werkzeug.utils import secure_filename
+
+from models import db, Zadanie, ZadanieUser, ZadanieZalacznik
+from stats import record_status_change
+from drafts import get_draft_buffer, MAX_DRAFT_LENGTH
+from subjects import DZIALY_PRZEDMIOTOW, PRZEDMIOTY, ZAKRESY
+from db_routing import read_only
+from blueprints.common import login_required, role_required, get_user_avatar
+
+bp = Blueprint('tasks', __name__)
+
+PICKER_PAGE = 50
+PICKER_MAX_PAGE = 200
+
+
+# =====================================================
+# ======================= ZADANIA =====================
+# =====================================================
+
+@bp.route('/zadania')
+@login_required
+@role_required('teacher')
+def zadania():
+    return render_template(
+        'zadania.html',
+        zadania=Zadanie.query.all()
+    )
+
+
+@bp.route('/api/zadania')
+@login_required
+@role_required('teacher')
+@read_only
+def task_picker():
+    # lista do wyboru zadań: same kolumny potrzebne w pickerze (bez treści),
+    # filtr "w trakcie pisania" i stronicowanie po id (?po=<ostatnie id>)
+    # 0 / ujemny limit: SQLite traktuje LIMIT -1 jak "bez limitu"
+    limit = max(1, min(request.args.get('limit', PICKER_PAGE, type=int), PICKER_MAX_PAGE))
+    after = request.args.get('po', type=int)
+
+    query = db.session.query(
+        Zadanie.id,
+        Zadanie.przedmiot,
+        Zadanie.dzial,
+        Zadanie.rok_arkusza,
+        Zadanie.numer_zadania
+    )
+
+    if request.args.get('przedmiot'):
+        query = query.filter(Zadanie.przedmiot == request.args['przedmiot'])
+
+    # "funkcja 2021 5" → dział zawiera "funkcja", rok 2021, numer (albo id) 5
+    for word in request.args.get('q', '').split():
+        if word.isdigit() and len(word) == 4:
+            query = query.filter(Zadanie.rok_arkusza == int(word))
+        elif word.isdigit():
+            query = query.filter(or_(Zadanie.numer_zadania == int(word), Zadanie.id == int(word)))
+        else:
+            query = query.filter(or_(
+                Zadanie.dzial.ilike(f'%{word}%'),
+                Zadanie.przedmiot.ilike(f'%{word}%')
+            ))
+
+    # keyset zamiast OFFSET – kolejna strona kosztuje tyle samo co pierwsza
+    if after is not None:
+        query = query.filter(Zadanie.id < after)
+
+    rows = query.order_by(Zadanie.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+
+    return jsonify({
+        'items': [
+            {'id': zid, 'przedmiot': przedmiot, 'dzial': dzial, 'rok': rok, 'numer': numer}
+            for zid, przedmiot, dzial, rok, numer in page
+        ],
+        'next': page[-1][0] if page and len(rows) > limit else None
+    })
+
+
+@bp.route('/zadania/dodaj', methods=['GET', 'POST'])
+@login_required
+@role_required('teacher')
+def dodaj_zadanie_ui():
+    if request.method == 'POST':
+        przedmiot = request.form.get('przedmiot')
+        if przedmiot not in PRZEDMIOTY:
+            return "Niepoprawny przedmiot", 400
+
+        zakres = request.form.get('zakres')
+        if zakres not in ZAKRESY:
+            return "Niepoprawny zakres", 400
+
+        dzial = request.form.get('dzial')
+        if dzial not in DZIALY_PRZEDMIOTOW.get(przedmiot, []):
+            return "Niepoprawny dział", 400
+
+        rodzaj_arkusza = request.form['rodzaj_arkusza']
+
+        rok_arkusza = request.form.get('rok_arkusza')
+        numer_zadania = request.form.get('numer_zadania')
+
+        if rodzaj_arkusza != 'out':
+            if not rok_arkusza or not numer_zadania:
+                return "Rok i numer zadania są wymagane dla arkuszy maturalnych", 400
+        else:
+            rok_arkusza = 0
+            numer_zadania = 0
+
+        try:
+            zadanie = Zadanie(
+                przedmiot=przedmiot,
+                zakres=zakres,
+                dzial=dzial,
+                rodzaj_arkusza=request.form['rodzaj_arkusza'],
+                rok_arkusza=int(rok_arkusza),
+                numer_zadania=int(numer_zadania),
+                typ_zadania=request.form['typ_zadania'],
+                tresc=request.form['tresc'],
+                odp_a=request.form.get('odp_a') or None,
+                odp_b=request.form.get('odp_b') or None,
+                odp_c=request.form.get('odp_c') or None,
+                odp_d=request.form.get('odp_d') or None,
+                poprawna_odp=request.form.get('poprawna_odp') or None,
+                created_by=session['user_id']
+            )
+            zadanie.validate()
+        except ValueError as e:
+            return f"Błąd walidacji: {e}", 400
+
+        db.session.add(zadanie)
+        db.session.commit()
+
+        # ===== ZAŁĄCZNIK =====
+        file = request.files.get('zalacznik')
+        if file and file.filename:
+            filename = secure_filename(file.filename)
+
+            zadanie_folder = os.path.join(
+                current_app.config['UPLOAD_FOLDER'],
+                str(zadanie.id)
+            )
+            os.makedirs(zadanie_folder, exist_ok=True)
+
+            file.save(os.path.join(zadanie_folder, filename))
+
+            db.session.add(
+                ZadanieZalacznik(
+                    zadanie_id=zadanie.id,
+                    nazwa_pliku=f"{zadanie.id}/{filename}"
+                )
+            )
+            db.session.commit()
+
+        return redirect(url_for('tasks.zadania'))
+
+    # ===== GET =====
+    return render_template(
+        'dodaj_zadanie.html',
+        przedmioty=PRZEDMIOTY,
+        dzialy_przedmiotow=DZIALY_PRZEDMIOTOW,
+        zakresy=ZAKRESY
+    )
+
+
+@bp.route('/teacher/task/<int:zadanie_id>')
+@login_required
+@role_required('teacher')
+def teacher_task_preview(zadanie_id):
+    zadanie = Zadanie.query.get_or_404(zadanie_id)
+    zalacznik = ZadanieZalacznik.query.filter_by(
+        zadanie_id=zadanie_id
+    ).first()
+
+    return render_template(
+        'teacher_task_preview.html',
+        zadanie=zadanie,
+        zalacznik=zalacznik
+    )
+
+
+@bp.route('/teacher/task/<int:zadanie_id>/edit', methods=['GET', 'POST'])
+@login_required
+@role_required('teacher')
+def edit_task(zadanie_id):
+    zadanie = Zadanie.query.get_or_404(zadanie_id)
+
+    if request.method == 'POST':
+        # --- METADANE ---
+        zadanie.przedmiot = request.form['przedmiot']
+        zadanie.zakres = request.form['zakres']
+        zadanie.dzial = request.form['dzial']
+        zadanie.rodzaj_arkusza = request.form['rodzaj_arkusza']
+
+        zadanie.rok_arkusza = int(
+            request.form.get('rok_arkusza') or 0
+        )
+        zadanie.numer_zadania = int(
+            request.form.get('numer_zadania') or 0
+        )
+
+        # --- TREŚĆ ---
+        zadanie.tresc = request.form['tresc']
+        zadanie.odp_a = request.form.get('odp_a')
+        zadanie.odp_b = request.form.get('odp_b')
+        zadanie.odp_c = request.form.get('odp_c')
+        zadanie.odp_d = request.form.get('odp_d')
+        zadanie.poprawna_odp = request.form.get('poprawna_odp')
+
+        # WALIDACJA (ta sama co przy dodawaniu)
+        zadanie.validate()
+
+        db.session.commit()
+
+        return redirect(url_for(
+            'tasks.teacher_task_preview',
+            zadanie_id=zadanie.id
+        ))
+
+    return render_template(
+        'edit_task.html',
+        zadanie=zadanie,
+        PRZEDMIOTY=PRZEDMIOTY,
+        DZIALY_PRZEDMIOTOW=DZIALY_PRZEDMIOTOW,
+        ZAKRESY=ZAKRESY
+    )
+
+
+@bp.route('/task/<int:zadanie_id>', methods=['GET'])
+@login_required
+@role_required('student')
+def resolve_task(zadanie_id):
+    user_id = session['user_id']
+
+    assignment = ZadanieUser.query.filter_by(
+        user_id=user_id,
+        zadanie_id=zadanie_id
+    ).first_or_404()
+
+    zadanie = Zadanie.query.get_or_404(zadanie_id)
+    is_closed = assignment.status in ("zrobione", "błędne")
+    zalacznik = ZadanieZalacznik.query.filter_by(
+        zadanie_id=zadanie_id
+    ).first()
+
+    autor_avatar = get_user_avatar(zadanie.autor.id)
+
+    draft = None
+    if zadanie.typ_zadania != 'zamkniete' and not is_closed:
+        draft = get_draft_buffer().get(user_id, zadanie_id)
+
+    return render_template(
+        'resolve_task.html',
+        zadanie=zadanie,
+        assignment=assignment,
+        zalacznik=zalacznik,
+        is_closed=is_closed,
+        draft=draft,
+        autor_avatar=autor_avatar
+    )
+
+
+@bp.route('/task/<int:zadanie_id>/submit', methods=['POST'])
+@login_required
+@role_required('student')
+def submit_task(zadanie_id):
+    data = request.json
+    user_answer = data.get('answer')
+
+    if not user_answer:
+        return jsonify({'error': 'Brak odpowiedzi'}), 400
+
+    assignment = ZadanieUser.query.filter_by(
+        user_id=session['user_id'],
+        zadanie_id=zadanie_id
+    ).first_or_404()
+
+    zadanie = Zadanie.query.get_or_404(zadanie_id)
+
+    assignment.odpowiedz_usera = user_answer
+
+    is_correct = user_answer == zadanie.poprawna_odp
+
+    old_status = assignment.status
+    assignment.status = 'zrobione' if is_correct else 'błędne'
+    record_status_change(assignment.user_id, zadanie, old_status, assignment.status)
+    db.session.commit()
+
+    return jsonify({
+        'correct': is_correct,
+        'correct_answer': zadanie.poprawna_odp
+    })
+
+
+@bp.route('/task/<int:zadanie_id>/draft', methods=['POST'])
+@login_required
+@role_required('student')
+def save_draft(zadanie_id):
+    data = request.get_json(silent=True) or {}
+    content = data.get('answer')
+
+    if not isinstance(content, str):
+        return jsonify({'error': 'Brak odpowiedzi'}), 400
+
+    if len(content) > MAX_DRAFT_LENGTH:
+        return jsonify({'error': 'Odpowiedź jest za długa'}), 413
+
+    if not get_draft_buffer().is_allowed(session['user_id'], zadanie_id):
+        return jsonify({'error': 'Brak dostępu do zadania'}), 403
+
+    # zapis trafia do bufora workera, do bazy idzie paczką co kilka sekund
+    if not get_draft_buffer().put(session['user_id'], zadanie_id, content):
+        return jsonify({'error': 'Zadanie jest już oddane'}), 409
+
+    return jsonify({'status': 'ok'}), 202
+
+
+@bp.route('/task/<int:zadanie_id>/answer', methods=['POST'])
+@login_required
+@role_required('student')
+def submit_open_task(zadanie_id):
+    data = request.get_json(silent=True) or {}
+    answer = data.get('answer')
+
+    if not answer:
+        return jsonify({'error': 'Brak odpowiedzi'}), 400
+
+    assignment = ZadanieUser.query.filter_by(
+        user_id=session['user_id'],
+        zadanie_id=zadanie_id
+    ).first_or_404()
+
+    if assignment.status in ('zrobione', 'błędne'):
+        return jsonify({'error': 'Zadanie jest już ocenione'}), 409
+
+    zadanie = Zadanie.query.get_or_404(zadanie_id)
+    save_final_answer(session['user_id'], zadanie, answer)
+
+    return jsonify({'status': 'oddane'})
+
+
+def save_final_answer(user_id, zadanie, answer):
+    zu = (
+        db.session.query(ZadanieUser)
+        .filter(
+            ZadanieUser.user_id == user_id,
+            ZadanieUser.zadanie_id == zadanie.id
+        )
+        .first()
+    )
+
+    old_status = zu.status if zu else None
+
+    if not zu:
+        zu = ZadanieUser(
+            user_id=user_id,
+            zadanie_id=zadanie.id,
+            status="oddane",
+            odpowiedz_usera=answer
+        )
+        db.session.add(zu)
+    else:
+        zu.odpowiedz_usera = answer
+        zu.status = "oddane"
+
+    record_status_change(user_id, zadanie, old_status, zu.status)
+    # oddana odpowiedź zastępuje szkic (w tej samej transakcji)
+    get_draft_buffer().discard(user_id, zadanie.id)
+    db.session.commit()
+
+    return zu
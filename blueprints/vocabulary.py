@@ -0,0 +1,78 @@
+from collections import defaultdict
+
+from flask import Blueprint, request, jsonify, render_template, session
+
+from models import VocabularyItem
+from db_routing import read_only
+from media_cache import get_media_cache
+from blueprints.common import login_required, role_required
+import srs
+
+bp = Blueprint('vocabulary', __name__)
+
+
+# =====================================================
+# ======================= SŁÓWKA ======================
+# =====================================================
+
+@bp.route("/vocabulary")
+@login_required
+@read_only
+def vocabulary_all():
+    words = (
+        VocabularyItem.query
+        .order_by(VocabularyItem.word_en.asc())
+        .all()
+    )
+
+    grouped = defaultdict(list)
+
+    for w in words:
+        first_letter = w.word_en[0].upper()
+        grouped[first_letter].append(w)
+
+    media = get_media_cache().local_urls(
+        url for w in words for url in (w.image_url, w.audio_url)
+    )
+
+    return render_template(
+        "vocabulary_all.html",
+        grouped=grouped,
+        media=media
+    )
+
+
+@bp.route("/vocabulary/review")
+@login_required
+@role_required("student")
+def vocabulary_review():
+    return render_template(
+        "vocabulary_review.html",
+        quality_labels=srs.QUALITY_LABELS
+    )
+
+
+@bp.route("/vocabulary/review/next")
+@login_required
+@role_required("student")
+def vocabulary_review_next():
+    limit = max(1, min(request.args.get("limit", 20, type=int), srs.MAX_BATCH))
+    return jsonify(srs.get_due_cards(session["user_id"], limit))
+
+
+@bp.route("/vocabulary/review", methods=["POST"])
+@login_required
+@role_required("student")
+def vocabulary_review_submit():
+    data = request.get_json(silent=True) or {}
+    answers = data.get("answers")
+
+    if not isinstance(answers, list):
+        return jsonify({"error": "Brak odpowiedzi"}), 400
+
+    try:
+        saved = srs.record_reviews(session["user_id"], answers)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Niepoprawne dane: {e}"}), 400
+
+    return jsonify({"status": "ok", "saved": saved})
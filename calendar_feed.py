@@ -0,0 +1,201 @@
+import hashlib
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from models import db, utcnow, User, Lesson, LessonStudent, CalendarFeedKey
+
+FEED_PAST_DAYS = 90
+FEED_SALT = "lesson-calendar"
+
+# kolumny potrzebne do wydarzenia – bez ładowania obiektów ORM
+FEED_COLUMNS = (
+    Lesson.id,
+    Lesson.date,
+    Lesson.time_from,
+    Lesson.time_to,
+    Lesson.topic,
+    Lesson.teacher_comment,
+    Lesson.created_at,
+)
+
+
+# =======================
+# TOKEN KANAŁU
+# =======================
+# aplikacje kalendarza nie wysyłają ciasteczek sesji – użytkownika wskazuje podpisany token;
+# w tokenie jest też wersja linku, więc wyciekły link można unieważnić (rotate_feed)
+def _serializer():
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt=FEED_SALT)
+
+
+def _version_column():
+    return db.func.coalesce(CalendarFeedKey.version, 0)
+
+
+def feed_version(user_id):
+    return (
+        db.session.query(_version_column())
+        .select_from(User)
+        .outerjoin(CalendarFeedKey, CalendarFeedKey.user_id == User.id)
+        .filter(User.id == user_id)
+        .scalar()
+    ) or 0
+
+
+def feed_token(user_id, version):
+    return _serializer().dumps([user_id, version])
+
+
+def user_from_token(token):
+    try:
+        payload = _serializer().loads(token)
+    except BadSignature:
+        return None
+
+    # linki sprzed wersjonowania: samo id = wersja 0
+    if isinstance(payload, int):
+        payload = [payload, 0]
+    try:
+        user_id, version = payload
+    except (TypeError, ValueError):
+        return None
+
+    # użytkownik i aktualna wersja jednym zapytaniem
+    row = (
+        db.session.query(User, _version_column())
+        .outerjoin(CalendarFeedKey, CalendarFeedKey.user_id == User.id)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None or row[1] != version:
+        return None
+    return row[0]
+
+
+def rotate_feed(user_id):
+    # tylko modyfikuje sesję – commit robi wywołujący widok
+    dialect = db.engine.dialect.name
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        key = db.session.get(CalendarFeedKey, user_id)
+        if key is None:
+            key = CalendarFeedKey(user_id=user_id, version=0)
+            db.session.add(key)
+        key.version += 1
+        key.rotated_at = utcnow()
+        return
+
+    stmt = insert(CalendarFeedKey).values(user_id=user_id, version=1, rotated_at=utcnow())
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[CalendarFeedKey.user_id],
+        set_={
+            "version": CalendarFeedKey.version + 1,
+            "rotated_at": stmt.excluded.rotated_at,
+        }
+    ))
+
+
+# =======================
+# ZAPYTANIA
+# =======================
+def feed_rows(user):
+    # ostatnie FEED_PAST_DAYS dni i wszystkie przyszłe lekcje
+    # nauczyciel – indeks (teacher_id, date); uczeń – indeks lesson_students(student_id)
+    if user.role == "teacher":
+        query = db.session.query(*FEED_COLUMNS).filter(Lesson.teacher_id == user.id)
+    else:
+        query = (
+            db.session.query(*FEED_COLUMNS)
+            .join(LessonStudent, LessonStudent.lesson_id == Lesson.id)
+            .filter(LessonStudent.student_id == user.id)
+        )
+
+    return (
+        query.filter(Lesson.date >= date.today() - timedelta(days=FEED_PAST_DAYS))
+        .order_by(Lesson.date, Lesson.time_from, Lesson.id)
+        .all()
+    )
+
+
+def feed_etag(rows):
+    # skrót z samych danych lekcji – przy 304 nie renderujemy ani nie wysyłamy kanału
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(repr(tuple(row)).encode())
+    return digest.hexdigest()
+
+
+# =======================
+# iCALENDAR (RFC 5545)
+# =======================
+def _escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    # linie dłuższe niż 75 oktetów zawijamy (kontynuacja zaczyna się spacją)
+    data = line.encode()
+    if len(data) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    while data:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(data))
+        # nie tniemy w środku znaku UTF-8
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode())
+        data = data[cut:]
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _event(row, host):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:lesson-{row.id}@{host}",
+        f"DTSTAMP:{(row.created_at or datetime(2000, 1, 1)).strftime('%Y%m%dT%H%M%SZ')}",
+    ]
+
+    if row.time_from:
+        start = datetime.combine(row.date, row.time_from)
+        end = datetime.combine(row.date, row.time_to) if row.time_to else start + timedelta(minutes=45)
+        # czas lokalny szkoły ("floating") – bez strefy
+        lines.append(f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}")
+        lines.append(f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}")
+    else:
+        lines.append(f"DTSTART;VALUE=DATE:{row.date.strftime('%Y%m%d')}")
+        lines.append(f"DTEND;VALUE=DATE:{(row.date + timedelta(days=1)).strftime('%Y%m%d')}")
+
+    lines.append(f"SUMMARY:{_escape(row.topic)}")
+    if row.teacher_comment:
+        lines.append(f"DESCRIPTION:{_escape(row.teacher_comment)}")
+    lines.append("END:VEVENT")
+
+    return "".join(_fold(line) for line in lines)
+
+
+def render_feed(rows, host):
+    # generator – kanał wysyłany po jednym wydarzeniu, bez budowania całości w pamięci
+    yield (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//matura//lekcje//PL\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "X-WR-CALNAME:Lekcje\r\n"
+    )
+    for row in rows:
+        yield _event(row, host)
+    yield "END:VCALENDAR\r\n"
@@ -0,0 +1,97 @@
+import click
+
+from models import db
+from stats import rebuild_stats
+
+
+# =======================
+# KOMENDY CLI
+# =======================
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db_command():
+        # schemat tworzymy jawnie – import aplikacji nie dotyka bazy
+        db.create_all()
+
+        # create_all pomija istniejące tabele – indeksy dodane później tworzymy osobno
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
+
+        print("✅ Utworzono tabele")
+
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats_command():
+        import analytics
+
+        count = rebuild_stats()
+        analytics.invalidate()
+        print(f"✅ Przebudowano statystyki ({count} wierszy)")
+
+    @app.cli.command('seed-data')
+    @click.option('--scale', type=click.Choice(['small', 'medium', 'large']), default='small')
+    @click.option('--seed', type=int, default=0, help="Ten sam seed = te same dane")
+    @click.option('--teachers', type=int)
+    @click.option('--students', type=int)
+    @click.option('--tasks', type=int)
+    @click.option('--tasks-per-student', type=int)
+    @click.option('--lessons-per-teacher', type=int)
+    @click.option('--materials-per-teacher', type=int)
+    @click.option('--notifications-per-student', type=int)
+    @click.option('--password', default='haslo123', help="Hasło wszystkich kont")
+    def seed_data_command(scale, seed, password, **overrides):
+        import seed_data
+
+        params = dict(seed_data.SCALES[scale])
+        params.update({k: v for k, v in overrides.items() if v is not None})
+
+        db.create_all()
+        result = seed_data.generate(seed=seed, password=password, **params)
+
+        total = sum(result["counts"].values())
+        print(f"✅ Wygenerowano {total:,} wierszy (seed {seed})")
+
+    @app.cli.command('fetch-media')
+    @click.option('--retry-failed', is_flag=True, help="Ponów też adresy oznaczone jako nieudane")
+    def fetch_media_command(retry_failed):
+        from media_cache import get_media_cache
+        from models import MediaAsset
+
+        # adresy ze słówek dodanych przed cache'em + wszystko, co czeka w kolejce
+        cache = get_media_cache()
+        added = cache.enqueue_vocabulary()
+        if retry_failed:
+            added += cache.retry_failed()
+        db.session.commit()
+
+        fetched = 0
+        while True:
+            count = cache.process_pending()
+            if not count:
+                break
+            fetched += count
+
+        counts = dict(
+            db.session.query(MediaAsset.status, db.func.count())
+            .group_by(MediaAsset.status)
+        )
+        print(
+            f"✅ Nowe adresy: {added}, próby pobrania: {fetched} "
+            f"(gotowe {counts.get('ready', 0)}, w kolejce {counts.get('pending', 0)}, "
+            f"nieudane {counts.get('failed', 0)})"
+        )
+
+    @app.cli.command('run-jobs')
+    @click.option('--workers', type=int, help="Liczba wątków (domyślnie JOBS_WORKERS)")
+    def run_jobs_command(workers):
+        # osobny proces zadań w tle, np. przy JOBS_ENABLED=0 dla workerów WWW
+        from jobs import get_job_runner
+
+        runner = get_job_runner()
+        if workers:
+            runner.workers = workers
+
+        threads = runner.start(force=True)
+        print(f"✅ Zadania w tle: {len(threads)} wątków, Ctrl+C kończy")
+        for thread in threads:
+            thread.join()
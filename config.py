@@ -2,6 +2,66 @@ import os
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
+# =======================
+# PROFILE SILNIKA BAZY
+# =======================
+# wybór: DB_PROFILE=<nazwa>; wyniki porównania: benchmarks/db_profiles.py
+ENGINE_PROFILES = {
+    # ustawienia domyślne SQLAlchemy (jak dotychczas)
+    "default": {
+        "engine_options": {},
+        "sqlite_pragmas": {},
+    },
+
+    # SQLite: WAL – czytelnicy nie czekają na commit piszącego
+    "sqlite-wal": {
+        "engine_options": {
+            "pool_size": 10,
+            "max_overflow": 0,
+            "connect_args": {"timeout": 5},
+        },
+        "sqlite_pragmas": {
+            "journal_mode": "WAL",
+            "busy_timeout": 5000,
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,
+            "cache_size": -64 * 1024,  # w KiB (ujemne) → 64 MB
+            "temp_store": "MEMORY",
+        },
+    },
+
+    # Postgres: mały serwer (2–4 workery gunicorna)
+    "postgres-small": {
+        "engine_options": {
+            "pool_size": 5,
+            "max_overflow": 5,
+            "pool_timeout": 10,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        },
+        "sqlite_pragmas": {},
+    },
+
+    # Postgres: więcej workerów/wątków, baza za PgBouncerem lub z dużym max_connections
+    "postgres-large": {
+        "engine_options": {
+            "pool_size": 20,
+            "max_overflow": 10,
+            "pool_timeout": 10,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        },
+        "sqlite_pragmas": {},
+    },
+}
+
+DB_PROFILE = os.environ.get("DB_PROFILE", "default")
+
+if DB_PROFILE not in ENGINE_PROFILES:
+    raise RuntimeError(
+        f"Nieznany DB_PROFILE={DB_PROFILE!r}, dostępne: {', '.join(ENGINE_PROFILES)}"
+    )
+
 
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key")
@@ -13,7 +73,81 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # replika tylko do odczytu (widoki oznaczone @read_only)
+    SQLALCHEMY_BINDS = (
+        {"replica": os.environ["REPLICA_DATABASE_URL"]}
+        if os.environ.get("REPLICA_DATABASE_URL") else {}
+    )
+    # ile sekund po zapisie użytkownik czyta z primary (read-your-writes)
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+
+    SQLALCHEMY_ENGINE_OPTIONS = ENGINE_PROFILES[DB_PROFILE]["engine_options"]
+    SQLITE_PRAGMAS = ENGINE_PROFILES[DB_PROFILE]["sqlite_pragmas"]
+
     UPLOAD_FOLDER = "static/uploads/zadania"
     AVATAR_FOLDER = "static/avatars"
 
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB
+
+    EXAM_MINUTES = int(os.environ.get("EXAM_MINUTES", 180))
+
+    # autozapis szkiców: jak często worker zapisuje bufor do bazy (sekundy)
+    AUTOSAVE_FLUSH_INTERVAL = float(os.environ.get("AUTOSAVE_FLUSH_INTERVAL", 2))
+
+    # cache workera dla zbiorów lekcji użytkownika i zadań lekcji (sekundy, 0 – tylko w obrębie żądania)
+    LESSON_ACCESS_CACHE_TTL = float(os.environ.get("LESSON_ACCESS_CACHE_TTL", 300))
+
+    # kompresja odpowiedzi (gzip / br / zstd wg Accept-Encoding)
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 500))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get("COMPRESS_BR_LEVEL", 4))
+    COMPRESS_ZSTD_LEVEL = int(os.environ.get("COMPRESS_ZSTD_LEVEL", 3))
+
+    # profilowanie SQL per żądanie (nagłówek Server-Timing, log wolnych żądań);
+    # domyślnie wyłączone – nagłówek zdradza każdemu klientowi czasy i liczbę zapytań
+    SQL_PROFILING = os.environ.get("SQL_PROFILING", "0") == "1"
+    SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", 500))
+    # plik logu wolnych żądań; bez niego wpisy idą do loggera aplikacji
+    SLOW_REQUEST_LOG = os.environ.get("SLOW_REQUEST_LOG")
+    # jaka część żądań zbiera stos wywołań przy każdym zapytaniu (0–1)
+    SLOW_REQUEST_STACK_SAMPLE = float(os.environ.get("SLOW_REQUEST_STACK_SAMPLE", 0))
+    # pasek z listą zapytań na stronach HTML – tylko dla admina
+    SQL_TOOLBAR = os.environ.get("SQL_TOOLBAR", "0") == "1"
+
+    # /metrics w formacie Prometheusa, tylko z "Authorization: Bearer <METRICS_TOKEN>";
+    # bez ustawionego tokenu metryki są zbierane, ale endpoint nie istnieje (404)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+    # lokalne kopie obrazków i audio słówek (pobierane w tle, serwowane z /media/<sha256>)
+    MEDIA_CACHE_FOLDER = os.environ.get("MEDIA_CACHE_FOLDER", os.path.join(BASE_DIR, "media_cache"))
+    # 0 – bez wątku w workerze; pobieranie tylko przez `flask fetch-media`
+    MEDIA_FETCH_ENABLED = os.environ.get("MEDIA_FETCH_ENABLED", "1") == "1"
+    MEDIA_FETCH_CONCURRENCY = int(os.environ.get("MEDIA_FETCH_CONCURRENCY", 4))
+    MEDIA_FETCH_TIMEOUT = float(os.environ.get("MEDIA_FETCH_TIMEOUT", 10))
+    # nieudane pobranie: ponowienie po MEDIA_RETRY_SECONDS * 2^(próba-1), najwyżej MEDIA_FETCH_ATTEMPTS prób
+    MEDIA_FETCH_ATTEMPTS = int(os.environ.get("MEDIA_FETCH_ATTEMPTS", 5))
+    MEDIA_RETRY_SECONDS = float(os.environ.get("MEDIA_RETRY_SECONDS", 60))
+    # jak często wątek sprawdza kolejkę bez wybudzenia (ponowienia po błędach)
+    MEDIA_FETCH_INTERVAL = float(os.environ.get("MEDIA_FETCH_INTERVAL", 60))
+    MEDIA_MAX_BYTES = int(os.environ.get("MEDIA_MAX_BYTES", 10 * 1024 * 1024))
+    # dłuższy bok obrazka po przeskalowaniu (wymaga Pillow)
+    MEDIA_IMAGE_MAX_SIZE = int(os.environ.get("MEDIA_IMAGE_MAX_SIZE", 800))
+    # adresy z sieci lokalnej / loopback – tylko do testów z lokalnym serwerem
+    MEDIA_ALLOW_PRIVATE_HOSTS = os.environ.get("MEDIA_ALLOW_PRIVATE_HOSTS", "0") == "1"
+
+    # zadania w tle: kolejka w tabeli jobs, wątki w każdym workerze gunicorna (post_fork)
+    # 0 – workery WWW nie uruchamiają wątków: przydział z panelu idzie od razu w żądaniu,
+    # resztę kolejki (czystka) obsługuje osobny proces `flask run-jobs`
+    JOBS_ENABLED = os.environ.get("JOBS_ENABLED", "1") == "1"
+    JOBS_WORKERS = int(os.environ.get("JOBS_WORKERS", 1))  # wątki na proces
+    # jak często wątek sprawdza kolejkę bez wybudzenia (zadania z innych workerów, ponowienia)
+    JOBS_POLL_INTERVAL = float(os.environ.get("JOBS_POLL_INTERVAL", 5))
+    # po tym czasie zadanie "running" martwego workera przejmuje inny
+    JOBS_LEASE_SECONDS = float(os.environ.get("JOBS_LEASE_SECONDS", 600))
+    # ponowienie po JOBS_RETRY_SECONDS * 2^(próba-1), najwyżej JOBS_MAX_ATTEMPTS prób
+    JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", 5))
+    JOBS_RETRY_SECONDS = float(os.environ.get("JOBS_RETRY_SECONDS", 30))
+    # zakończone zadania usuwa codzienna czystka
+    JOBS_KEEP_DAYS = int(os.environ.get("JOBS_KEEP_DAYS", 7))
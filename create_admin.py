@@ -1,6 +1,8 @@
-from app import app
+from app import create_app
 from models import db, User
 
+app = create_app()
+
 with app.app_context():
     if User.query.filter_by(login="admin").first():
         print("Admin już istnieje")
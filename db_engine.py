@@ -0,0 +1,26 @@
+from sqlalchemy import event
+
+from models import db
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def listen_sqlite_pragmas(engine, pragmas):
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    # PRAGMA działają per połączenie – ustawiamy je przy każdym nowym
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+
+def init_engine(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            listen_sqlite_pragmas(engine, app.config.get("SQLITE_PRAGMAS"))
@@ -0,0 +1,99 @@
+import sqlite3
+import time
+
+from flask import g, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = "replica"
+STICKY_KEY = "_db_primary_until"
+
+
+# =======================
+# SESJA Z ROUTINGIEM
+# =======================
+class RoutingSession(FlaskSQLAlchemySession):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+
+        is_write = self._flushing or isinstance(clause, UpdateBase)
+
+        if not is_write and _replica_allowed():
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+
+        if is_write:
+            self.info["wrote"] = True
+
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def _replica_allowed():
+    return has_request_context() and g.get("db_read_only", False)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _stick_to_primary(db_session):
+    # read-your-writes: po zapisie kolejne odczyty tego użytkownika idą na primary,
+    # dopóki replika nie nadrobi opóźnienia
+    if db_session.info.pop("wrote", False) and has_request_context():
+        seconds = g.get("db_sticky_seconds", 0)
+        if seconds:
+            flask_session[STICKY_KEY] = time.time() + seconds
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_writes(db_session):
+    db_session.info.pop("wrote", None)
+
+
+# =======================
+# WIDOKI TYLKO DO ODCZYTU
+# =======================
+def read_only(f):
+    # flaga przechodzi przez @wraps pozostałych dekoratorów (kopiują __dict__)
+    f._db_read_only = True
+    return f
+
+
+def init_routing(app):
+    sticky_seconds = app.config.get("REPLICA_STICKY_SECONDS", 5)
+
+    @app.before_request
+    def choose_database():
+        g.db_sticky_seconds = sticky_seconds
+
+        view = app.view_functions.get(request.endpoint)
+        if not getattr(view, "_db_read_only", False):
+            return
+        if request.method not in ("GET", "HEAD"):
+            return
+        if flask_session.get(STICKY_KEY, 0) > time.time():
+            return
+
+        g.db_read_only = True
+
+    @app.cli.command("sync-replica")
+    def sync_replica_command():
+        # lokalna "replikacja" dwóch plików SQLite – do testów routingu
+        primary = app.config["SQLALCHEMY_DATABASE_URI"]
+        replica = app.config.get("SQLALCHEMY_BINDS", {}).get(REPLICA_BIND)
+
+        if not replica:
+            print("Brak REPLICA_DATABASE_URL")
+            return
+        if not (primary.startswith("sqlite:///") and replica.startswith("sqlite:///")):
+            print("sync-replica obsługuje tylko dwie bazy SQLite")
+            return
+
+        src = sqlite3.connect(primary[len("sqlite:///"):])
+        dst = sqlite3.connect(replica[len("sqlite:///"):])
+        with dst:
+            src.backup(dst)
+        src.close()
+        dst.close()
+
+        print("✅ Replika zsynchronizowana")
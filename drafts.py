@@ -0,0 +1,214 @@
+import atexit
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import and_, delete, select, tuple_
+
+from models import db, utcnow, TaskDraft, ZadanieUser, LessonStudent, LessonTask
+
+MAX_DRAFT_LENGTH = 100_000
+MAX_ALLOWED_CACHE = 100_000
+
+
+# =======================
+# UPSERT (zależny od bazy)
+# =======================
+def _upsert_drafts(rows):
+    dialect = db.engine.dialect.name
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        for row in rows:
+            db.session.merge(TaskDraft(**row))
+        return
+
+    stmt = insert(TaskDraft).values(rows)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[TaskDraft.user_id, TaskDraft.zadanie_id],
+        set_={
+            "content": stmt.excluded.content,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    ))
+
+
+def _drop_submitted(rows):
+    # upsert jest warunkowy: w tej samej transakcji usuwamy szkice zadań już
+    # oddanych (także w innym workerze) – odpowiedź nie może wrócić jako szkic
+    db.session.execute(
+        delete(TaskDraft)
+        .where(
+            tuple_(TaskDraft.user_id, TaskDraft.zadanie_id).in_(
+                [(row["user_id"], row["zadanie_id"]) for row in rows]
+            ),
+            select(ZadanieUser.user_id).where(
+                ZadanieUser.user_id == TaskDraft.user_id,
+                ZadanieUser.zadanie_id == TaskDraft.zadanie_id,
+                ZadanieUser.status != "do zrobienia"
+            ).exists()
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+# =======================
+# BUFOR W WORKERZE
+# =======================
+class DraftBuffer:
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = {}      # (user_id, zadanie_id) → (content, updated_at)
+        self._inflight = {}     # paczka właśnie zapisywana przez flush()
+        self._allowed = set()   # sprawdzone już prawa (user_id, zadanie_id)
+        self._submitted = set()  # oddane w tym workerze – spóźniony autozapis ich nie wskrzesza
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # wątek startujemy leniwie, już w procesie workera (po forku)
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="draft-flusher",
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception("Nie udało się zapisać szkiców")
+
+    def put(self, user_id, zadanie_id, content):
+        self._ensure_thread()
+        with self._lock:
+            if (user_id, zadanie_id) in self._submitted:
+                return False
+            self._pending[(user_id, zadanie_id)] = (content, utcnow())
+        return True
+
+    def get(self, user_id, zadanie_id):
+        with self._lock:
+            pending = self._pending.get((user_id, zadanie_id))
+        if pending is not None:
+            return pending[0]
+
+        draft = db.session.get(TaskDraft, (user_id, zadanie_id))
+        return draft.content if draft else None
+
+    def discard(self, user_id, zadanie_id):
+        # odpowiedź oddana – szkic z bufora nie może już nadpisać stanu
+        key = (user_id, zadanie_id)
+        with self._lock:
+            self._pending.pop(key, None)
+            self._inflight.pop(key, None)
+            if len(self._submitted) > MAX_ALLOWED_CACHE:
+                self._submitted.clear()
+            self._submitted.add(key)
+        TaskDraft.query.filter_by(user_id=user_id, zadanie_id=zadanie_id).delete()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._inflight = batch
+
+        try:
+            if not batch:
+                return 0
+
+            # discard() w trakcie zapisu usuwa klucz także z tej paczki
+            with self._lock:
+                rows = [
+                    {
+                        "user_id": user_id,
+                        "zadanie_id": zadanie_id,
+                        "content": content,
+                        "updated_at": updated_at,
+                    }
+                    for (user_id, zadanie_id), (content, updated_at) in batch.items()
+                ]
+            # discard() mógł zabrać ostatni klucz – values([]) to INSERT bez kolumn klucza
+            if not rows:
+                return 0
+
+            with self.app.app_context():
+                try:
+                    _upsert_drafts(rows)
+                    _drop_submitted(rows)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    # nie gubimy szkiców – wracają do bufora, chyba że są już nowsze albo oddane
+                    with self._lock:
+                        for key, value in batch.items():
+                            if key not in self._submitted:
+                                self._pending.setdefault(key, value)
+                    raise
+        finally:
+            with self._lock:
+                self._inflight = {}
+
+        return len(rows)
+
+    def is_allowed(self, user_id, zadanie_id):
+        key = (user_id, zadanie_id)
+        if key in self._allowed:
+            return True
+
+        # przypisane bezpośrednio albo przez lekcję
+        assigned = db.session.query(
+            db.session.query(ZadanieUser)
+            .filter(
+                ZadanieUser.user_id == user_id,
+                ZadanieUser.zadanie_id == zadanie_id
+            ).exists()
+        ).scalar() or db.session.query(
+            db.session.query(LessonTask)
+            .join(LessonStudent, and_(
+                LessonStudent.lesson_id == LessonTask.lesson_id,
+                LessonStudent.student_id == user_id
+            ))
+            .filter(LessonTask.zadanie_id == zadanie_id)
+            .exists()
+        ).scalar()
+
+        if assigned:
+            if len(self._allowed) > MAX_ALLOWED_CACHE:
+                self._allowed.clear()
+            self._allowed.add(key)
+        return assigned
+
+
+def init_autosave(app):
+    buffer = DraftBuffer(app, app.config.get("AUTOSAVE_FLUSH_INTERVAL", 2.0))
+    app.extensions["draft_buffer"] = buffer
+
+    # zamknięcie workera (SIGTERM → sys.exit) – zapisujemy resztę bufora
+    def flush_on_exit():
+        try:
+            buffer.flush()
+        except Exception:
+            app.logger.exception("Nie udało się zapisać szkiców przy zamykaniu")
+
+    atexit.register(flush_on_exit)
+    return buffer
+
+
+def get_draft_buffer():
+    return current_app.extensions["draft_buffer"]
@@ -0,0 +1,179 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from models import db, utcnow, Zadanie, ZadanieZalacznik, ZadanieUser, ExamSession, ExamAnswer
+from stats import record_status_changes
+
+# uczeń ma chwilę na dosłanie odpowiedzi po automatycznym zakończeniu czasu
+SUBMIT_GRACE = timedelta(seconds=60)
+
+FINAL_STATUSES = ('zrobione', 'błędne')
+
+
+# =======================
+# ARKUSZE
+# =======================
+def available_sheets():
+    return (
+        db.session.query(
+            Zadanie.przedmiot,
+            Zadanie.rok_arkusza,
+            Zadanie.rodzaj_arkusza,
+            db.func.count(Zadanie.id)
+        )
+        .filter(Zadanie.rodzaj_arkusza != 'out')
+        .group_by(Zadanie.przedmiot, Zadanie.rok_arkusza, Zadanie.rodzaj_arkusza)
+        .order_by(Zadanie.przedmiot, Zadanie.rok_arkusza.desc())
+        .all()
+    )
+
+
+def sheet_exists(przedmiot, rok_arkusza, rodzaj_arkusza):
+    # te same arkusze co w available_sheets – bez zadań nie ma czego rozwiązywać
+    return db.session.query(
+        db.session.query(Zadanie.id)
+        .filter(
+            Zadanie.przedmiot == przedmiot,
+            Zadanie.rok_arkusza == rok_arkusza,
+            Zadanie.rodzaj_arkusza == rodzaj_arkusza,
+            Zadanie.rodzaj_arkusza != 'out'
+        )
+        .exists()
+    ).scalar()
+
+
+def load_sheet(przedmiot, rok_arkusza, rodzaj_arkusza):
+    # zadania + załączniki jednym zapytaniem
+    rows = (
+        db.session.query(Zadanie, ZadanieZalacznik)
+        .outerjoin(ZadanieZalacznik, ZadanieZalacznik.zadanie_id == Zadanie.id)
+        .filter(
+            Zadanie.przedmiot == przedmiot,
+            Zadanie.rok_arkusza == rok_arkusza,
+            Zadanie.rodzaj_arkusza == rodzaj_arkusza
+        )
+        .order_by(Zadanie.numer_zadania, Zadanie.id)
+        .all()
+    )
+
+    zadania = []
+    attachments = defaultdict(list)
+    for z, zal in rows:
+        if not zadania or zadania[-1].id != z.id:
+            zadania.append(z)
+        if zal is not None:
+            attachments[z.id].append(zal)
+
+    return zadania, attachments
+
+
+# =======================
+# SESJA
+# =======================
+def start_exam(student_id, przedmiot, rok_arkusza, rodzaj_arkusza, minutes):
+    now = utcnow()
+    exam = ExamSession(
+        student_id=student_id,
+        przedmiot=przedmiot,
+        rok_arkusza=rok_arkusza,
+        rodzaj_arkusza=rodzaj_arkusza,
+        started_at=now,
+        deadline=now + timedelta(minutes=minutes)
+    )
+    db.session.add(exam)
+    db.session.commit()
+    return exam
+
+
+def is_expired(exam):
+    deadline = exam.deadline.replace(tzinfo=None) + SUBMIT_GRACE
+    return utcnow().replace(tzinfo=None) > deadline
+
+
+# =======================
+# OCENIANIE (jedna transakcja)
+# =======================
+def grade_exam(exam, answers):
+    # answers: zadanie_id → odpowiedź (puste pomijamy); False – arkusz już oddany
+    now = utcnow()
+
+    # najpierw zajmujemy arkusz: z dwóch równoległych wysłań ocenia jedno,
+    # drugie czeka na blokadę wiersza i dostaje rowcount 0
+    claimed = db.session.execute(
+        update(ExamSession)
+        .where(ExamSession.id == exam.id, ExamSession.submitted_at.is_(None))
+        .values(submitted_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        db.session.rollback()
+        return False
+
+    zadania, _ = load_sheet(exam.przedmiot, exam.rok_arkusza, exam.rodzaj_arkusza)
+    task_ids = [z.id for z in zadania]
+
+    existing = {
+        zu.zadanie_id: zu
+        for zu in ZadanieUser.query.filter(
+            ZadanieUser.user_id == exam.student_id,
+            ZadanieUser.zadanie_id.in_(task_ids)
+        )
+    }
+
+    exam_answers = []
+    new_assignments = []
+    changes = []
+    score = 0
+    max_score = 0
+
+    for z in zadania:
+        answer = (answers.get(z.id) or '').strip() or None
+
+        if z.typ_zadania == 'zamkniete':
+            max_score += 1
+            is_correct = answer is not None and answer == z.poprawna_odp
+            score += int(is_correct)
+            new_status = 'zrobione' if is_correct else 'błędne'
+        else:
+            is_correct = None
+            new_status = 'oddane'
+
+        exam_answers.append({
+            'exam_id': exam.id,
+            'zadanie_id': z.id,
+            'answer': answer,
+            'is_correct': is_correct
+        })
+
+        if answer is None:
+            continue
+
+        # zadania już ocenione poza egzaminem zostają bez zmian
+        zu = existing.get(z.id)
+        if zu is None:
+            new_assignments.append({
+                'user_id': exam.student_id,
+                'zadanie_id': z.id,
+                'status': new_status,
+                'odpowiedz_usera': answer
+            })
+            changes.append((z, None, new_status))
+        elif zu.status not in FINAL_STATUSES:
+            changes.append((z, zu.status, new_status))
+            zu.status = new_status
+            zu.odpowiedz_usera = answer
+
+    if exam_answers:
+        db.session.execute(ExamAnswer.__table__.insert(), exam_answers)
+    if new_assignments:
+        db.session.execute(ZadanieUser.__table__.insert(), new_assignments)
+    record_status_changes(exam.student_id, changes)
+
+    exam.score = score
+    exam.max_score = max_score
+    exam.submitted_at = now
+
+    db.session.commit()
+    return True
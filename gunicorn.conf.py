@@ -0,0 +1,109 @@
+import gc
+import glob
+import multiprocessing
+import os
+import tempfile
+
+# =======================
+# PROFIL PRODUKCYJNY GUNICORNA
+# =======================
+# gunicorn wczytuje ten plik automatycznie z katalogu roboczego:
+#   gunicorn
+# zmiany bez edycji pliku: zmienne GUNICORN_* poniżej albo GUNICORN_CMD_ARGS
+
+CPU_COUNT = multiprocessing.cpu_count()
+
+# metryki Prometheusa: każdy worker pisze do własnych plików w tym katalogu,
+# /metrics sumuje je przy odczycie; musi istnieć przed importem aplikacji (preload)
+PROMETHEUS_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "matura-prometheus")
+)
+os.makedirs(PROMETHEUS_DIR, exist_ok=True)
+
+wsgi_app = "app:create_app()"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# gthread – domyślnie; gevent / eventlet – dla długo trzymanych połączeń
+# (SSE, long-poll), gdzie wątek na połączenie szybko się kończy
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+ASYNC_WORKERS = worker_class in ("gevent", "eventlet")
+
+if ASYNC_WORKERS:
+    # patchujemy w masterze, zanim preload zaimportuje aplikację
+    if worker_class == "gevent":
+        from gevent import monkey
+        monkey.patch_all()
+    else:
+        import eventlet
+        eventlet.monkey_patch()
+
+    workers = int(os.environ.get("GUNICORN_WORKERS", CPU_COUNT))
+    worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+else:
+    workers = int(os.environ.get("GUNICORN_WORKERS", CPU_COUNT + 1))
+    threads = int(os.environ.get("GUNICORN_THREADS", min(8, 2 * CPU_COUNT + 2)))
+
+# aplikacja ładowana raz w masterze – workery dziedziczą ją przez fork (copy-on-write)
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+GC_FREEZE = os.environ.get("GUNICORN_GC_FREEZE", "1") == "1"
+
+# restart workera co ~1000 żądań; jitter, żeby nie restartowały się wszystkie naraz
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+# =======================
+# HOOKI
+# =======================
+def on_starting(server):
+    # pliki z poprzedniego uruchomienia zawyżałyby liczniki; czyścimy raz, w masterze –
+    # nie przy imporcie tego pliku, który gunicorn wczytuje ponownie przy HUP
+    # (skasowałby pliki działających workerów); workery zakładają własne pliki po forku
+    # katalog podaje operator (może to być dowolny istniejący katalog) – usuwamy
+    # tylko pliki metryk prometheus_client, nie całe drzewo
+    for path in glob.glob(os.path.join(PROMETHEUS_DIR, "*.db")):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    os.makedirs(PROMETHEUS_DIR, exist_ok=True)
+
+
+def when_ready(server):
+    # przy preload aplikacja jest już zaimportowana; zamrażamy obiekty, żeby
+    # GC w workerach nie dotykał ich nagłówków (i nie kopiował stron pamięci)
+    if preload_app and GC_FREEZE:
+        gc.collect()
+        gc.freeze()
+        server.log.info("gc.freeze(): %d obiektów", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    from jobs import get_job_runner
+    from models import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        # połączenia z puli mastera nie mogą być współdzielone między procesami
+        if preload_app:
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+        # wątki zadań w tle – w każdym workerze, już po forku (JOBS_ENABLED=0 – wyłączone)
+        get_job_runner().start()
+
+
+def child_exit(server, worker):
+    # gauge'e "live" martwego workera nie mogą zostać w sumie
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,272 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import and_, or_, update
+
+from models import db, utcnow, Job
+from lesson_assignments import assign_tasks_to_students
+
+# rodzaj → funkcja; wywoływana w kontekście aplikacji z argumentami z payload
+HANDLERS = {}
+
+CANDIDATES = 10
+MAX_RETRY_DELAY = timedelta(hours=6)
+RETENTION_EVERY = timedelta(days=1)
+
+
+def job(kind):
+    def decorator(f):
+        HANDLERS[kind] = f
+        return f
+    return decorator
+
+
+def enqueue(kind, created_by=None, run_at=None, **payload):
+    # tylko modyfikuje sesję – wywołujący robi commit, potem get_job_runner().wake()
+    if kind not in HANDLERS:
+        raise LookupError(f"Nieznany rodzaj zadania: {kind}")
+
+    row = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        created_by=created_by,
+        max_attempts=current_app.config["JOBS_MAX_ATTEMPTS"],
+        run_at=run_at or utcnow()
+    )
+    db.session.add(row)
+    db.session.flush()
+    return row
+
+
+def _ready(now):
+    return or_(
+        and_(Job.status == "queued", Job.run_at <= now),
+        # dzierżawa wygasła – worker padł albo został zrestartowany w trakcie
+        and_(Job.status == "running", Job.locked_until < now),
+    )
+
+
+# =======================
+# WĄTKI W WORKERZE
+# =======================
+class JobRunner:
+    def __init__(self, app):
+        self.app = app
+        config = app.config
+        self.enabled = config["JOBS_ENABLED"]
+        self.workers = config["JOBS_WORKERS"]
+        self.poll_interval = config["JOBS_POLL_INTERVAL"]
+        self.lease = timedelta(seconds=config["JOBS_LEASE_SECONDS"])
+        self.retry_delay = timedelta(seconds=config["JOBS_RETRY_SECONDS"])
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._threads = []
+        self._pid = None
+
+    def start(self, force=False):
+        # gunicorn: post_fork (gunicorn.conf.py); flask run – leniwie przy pierwszym wake()
+        if not (self.enabled or force):
+            return self._threads
+        if self._threads and self._pid == os.getpid():
+            return self._threads
+
+        with self._lock:
+            if self._threads and self._pid == os.getpid():
+                return self._threads
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, args=(i == 0,), name=f"job-runner-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+        return self._threads
+
+    def wake(self):
+        self.start()
+        self._wake.set()
+
+    def _run(self, schedule):
+        # czystkę planuje jeden wątek procesu; między workerami pilnuje tego _retention
+        if schedule:
+            with self.app.app_context():
+                try:
+                    schedule_retention()
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Nie udało się zaplanować czystki zadań w tle")
+
+        while True:
+            try:
+                with self.app.app_context():
+                    while self.run_next():
+                        pass
+            except Exception:
+                self.app.logger.exception("Błąd kolejki zadań w tle")
+
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    # ----- jedno zadanie -----
+    def _claim(self):
+        now = utcnow()
+        candidates = [
+            job_id for job_id, in
+            db.session.query(Job.id)
+            .filter(_ready(now))
+            .order_by(Job.run_at)
+            .limit(CANDIDATES)
+        ]
+
+        # warunek w UPDATE – z kilku wątków / workerów wiersz bierze jeden
+        for job_id in candidates:
+            claimed = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, _ready(now))
+                .values(
+                    status="running",
+                    attempts=Job.attempts + 1,
+                    locked_until=now + self.lease,
+                    started_at=now
+                )
+                .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+                # bez porównań w Pythonie z obiektami sesji (daty z SQLite bez strefy)
+                .execution_options(synchronize_session=False)
+            ).first()
+            db.session.commit()
+            if claimed is not None:
+                return claimed
+        return None
+
+    def run_next(self):
+        claimed = self._claim()
+        if claimed is None:
+            return False
+
+        handler = HANDLERS.get(claimed.kind)
+        try:
+            if handler is None:
+                raise LookupError(f"Nieznany rodzaj zadania: {claimed.kind}")
+            with self._heartbeat(claimed):
+                result = handler(**json.loads(claimed.payload))
+            values = {
+                "status": "done",
+                "result": json.dumps(result),
+                "last_error": None,
+            }
+        except Exception as e:
+            db.session.rollback()
+            self.app.logger.exception("Zadanie w tle %s (%s) nie powiodło się", claimed.id, claimed.kind)
+
+            values = {"last_error": f"{type(e).__name__}: {e}"}
+            if handler is None or claimed.attempts >= claimed.max_attempts:
+                values["status"] = "failed"
+            else:
+                delay = min(self.retry_delay * 2 ** (claimed.attempts - 1), MAX_RETRY_DELAY)
+                values.update(status="queued", run_at=utcnow() + delay)
+
+        if values["status"] in ("done", "failed"):
+            values["finished_at"] = utcnow()
+
+        # wynik handlera i status w jednej transakcji; jeśli dzierżawę przejął
+        # już inny worker (attempts się zmieniło), wycofujemy całość
+        updated = db.session.execute(
+            update(Job)
+            .where(Job.id == claimed.id, Job.attempts == claimed.attempts)
+            .values(locked_until=None, **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated:
+            db.session.commit()
+        else:
+            db.session.rollback()
+        return True
+
+    def retry(self, job_id):
+        return db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "failed")
+            .values(status="queued", attempts=0, run_at=utcnow(), finished_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    @contextmanager
+    def _heartbeat(self, claimed):
+        # dłuższy handler przedłuża dzierżawę co 1/3 jej czasu – inny worker go nie przejmie;
+        # osobne połączenie, bo transakcja handlera commituje się dopiero z wynikiem
+        engine = db.engine
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease.total_seconds() / 3):
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(
+                            update(Job)
+                            .where(Job.id == claimed.id, Job.attempts == claimed.attempts, Job.status == "running")
+                            .values(locked_until=utcnow() + self.lease)
+                        )
+                except Exception:
+                    self.app.logger.exception("Nie udało się przedłużyć dzierżawy zadania %s", claimed.id)
+
+        thread = threading.Thread(target=beat, name=f"job-heartbeat-{claimed.id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+
+def init_jobs(app):
+    runner = JobRunner(app)
+    app.extensions["job_runner"] = runner
+    return runner
+
+
+def get_job_runner():
+    return current_app.extensions["job_runner"]
+
+
+# =======================
+# RODZAJE ZADAŃ
+# =======================
+@job("assign_tasks")
+def _assign_tasks(student_ids, zadanie_id=None, dzial=None):
+    return {"assigned": assign_tasks_to_students(student_ids, zadanie_id=zadanie_id, dzial=dzial)}
+
+
+def _retention_scheduled(statuses):
+    return db.session.query(
+        db.session.query(Job)
+        .filter(Job.kind == "retention", Job.status.in_(statuses))
+        .exists()
+    ).scalar()
+
+
+def schedule_retention():
+    # jedna zaplanowana czystka naraz – restart workerów nie mnoży łańcucha
+    if not _retention_scheduled(("queued", "running")):
+        enqueue("retention", run_at=utcnow() + RETENTION_EVERY)
+
+
+@job("retention")
+def _retention():
+    cutoff = utcnow() - timedelta(days=current_app.config["JOBS_KEEP_DAYS"])
+    deleted = (
+        Job.query
+        .filter(Job.status.in_(("done", "failed")), Job.finished_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+
+    # bieżące zadanie jest "running" – następne, chyba że równoległy łańcuch już je zaplanował
+    if not _retention_scheduled(("queued",)):
+        enqueue("retention", run_at=utcnow() + RETENTION_EVERY)
+    return {"deleted": deleted}
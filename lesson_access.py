@@ -0,0 +1,128 @@
+import threading
+import time
+from functools import wraps
+
+from flask import abort, current_app, g, session
+
+from models import db, Lesson, LessonStudent, LessonTask
+
+MAX_CACHED_SETS = 50_000
+
+
+# =======================
+# CZŁONKOSTWO W LEKCJACH
+# =======================
+class LessonMembership:
+    # zbiory id lekcji użytkownika i id zadań lekcji – raz na żądanie (g),
+    # opcjonalnie w cache workera; sprawdzenie uprawnień to lookup w zbiorze
+    def __init__(self, ttl):
+        self.ttl = ttl          # 0 → tylko w obrębie żądania
+        self._lock = threading.Lock()
+        self._cache = {}        # klucz → (czas wczytania, frozenset)
+
+    def _memo(self):
+        return g.setdefault("lesson_membership", {})
+
+    def _get(self, key, load, refresh=False):
+        # zwraca (zbiór, czy świeżo z bazy w tym żądaniu)
+        memo = self._memo()
+        if not refresh and key in memo:
+            return memo[key]
+
+        value = None
+        if self.ttl and not refresh:
+            with self._lock:
+                cached = self._cache.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                value = cached[1]
+
+        fresh = value is None
+        if fresh:
+            value = frozenset(load())
+            if self.ttl:
+                with self._lock:
+                    if len(self._cache) >= MAX_CACHED_SETS:
+                        self._cache.clear()
+                    self._cache[key] = (time.monotonic(), value)
+
+        memo[key] = (value, fresh)
+        return memo[key]
+
+    def _contains(self, key, load, item):
+        value, fresh = self._get(key, load)
+        if item in value:
+            return True
+        if fresh:
+            return False
+        # odmowa na podstawie cache – zbiór mógł się zmienić w innym workerze
+        # (nowa lekcja, nowe zadania), więc przed 403 sprawdzamy bazę
+        value, _ = self._get(key, load, refresh=True)
+        return item in value
+
+    def is_member(self, user_id, role, lesson_id):
+        # nauczyciel – lekcje, które prowadzi; uczeń – lekcje, do których jest przypisany
+        return self._contains(("lessons", user_id), lambda: self._load_lessons(user_id, role), lesson_id)
+
+    def has_task(self, lesson_id, zadanie_id):
+        return self._contains(("tasks", lesson_id), lambda: self._load_tasks(lesson_id), zadanie_id)
+
+    @staticmethod
+    def _load_lessons(user_id, role):
+        if role == "teacher":
+            query = db.session.query(Lesson.id).filter(Lesson.teacher_id == user_id)
+        else:
+            query = db.session.query(LessonStudent.lesson_id).filter(LessonStudent.student_id == user_id)
+        return (lesson_id for lesson_id, in query)
+
+    @staticmethod
+    def _load_tasks(lesson_id):
+        query = db.session.query(LessonTask.zadanie_id).filter(LessonTask.lesson_id == lesson_id)
+        return (zadanie_id for zadanie_id, in query)
+
+    # =======================
+    # UNIEWAŻNIANIE
+    # =======================
+    def _invalidate(self, keys):
+        memo = g.get("lesson_membership")
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
+                if memo is not None:
+                    memo.pop(key, None)
+
+    def invalidate_users(self, *user_ids):
+        self._invalidate([("lessons", user_id) for user_id in user_ids])
+
+    def invalidate_lesson(self, lesson_id):
+        self._invalidate([("tasks", lesson_id)])
+
+
+def init_lesson_access(app):
+    membership = LessonMembership(app.config.get("LESSON_ACCESS_CACHE_TTL", 0))
+    app.extensions["lesson_membership"] = membership
+    return membership
+
+
+def get_lesson_membership():
+    return current_app.extensions["lesson_membership"]
+
+
+# =======================
+# DEKORATOR
+# =======================
+def lesson_member_required(f):
+    # lesson_id (i opcjonalnie zadanie_id) z URL-a; po login_required
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        membership = get_lesson_membership()
+        lesson_id = kwargs["lesson_id"]
+
+        if not membership.is_member(session["user_id"], session.get("user_role"), lesson_id):
+            abort(403)
+
+        if "zadanie_id" in kwargs and not membership.has_task(lesson_id, kwargs["zadanie_id"]):
+            abort(404)
+
+        return f(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,98 @@
+from sqlalchemy import and_, insert, literal, select, true
+
+from models import db, User, Zadanie, ZadanieUser, LessonStudent, LessonTask
+from stats import record_assignments
+
+
+# =======================
+# ZADANIA LEKCJI → ZADANIA UCZNIÓW
+# =======================
+# Tylko modyfikuje sesję – commit robi wywołujący widok (razem z LessonTask / LessonStudent).
+
+def lesson_task_pairs(lesson_ids):
+    # lesson_ids: lista albo SELECT id; wynik: (user_id, zadanie_id, status) bez istniejących wierszy
+    return (
+        select(LessonStudent.student_id, LessonTask.zadanie_id, literal("do zrobienia"))
+        .join(LessonTask, LessonTask.lesson_id == LessonStudent.lesson_id)
+        .where(LessonStudent.lesson_id.in_(lesson_ids))
+        .where(~select(ZadanieUser.user_id).where(and_(
+            ZadanieUser.user_id == LessonStudent.student_id,
+            ZadanieUser.zadanie_id == LessonTask.zadanie_id
+        )).exists())
+        # to samo zadanie w dwóch lekcjach ucznia – jeden wiersz
+        .distinct()
+    )
+
+
+def propagate_lesson_tasks(lesson_ids, student_ids=None, zadanie_ids=None):
+    # każdy uczeń lekcji dostaje każde jej zadanie jako "do zrobienia";
+    # jeden INSERT ... SELECT, istniejące wiersze (już rozwiązane też) pomijamy
+    pairs = lesson_task_pairs(lesson_ids)
+    if student_ids is not None:
+        pairs = pairs.where(LessonStudent.student_id.in_(student_ids))
+    if zadanie_ids is not None:
+        pairs = pairs.where(LessonTask.zadanie_id.in_(zadanie_ids))
+
+    return _insert_assignments(pairs)
+
+
+# =======================
+# PRZYDZIAŁ Z PANELU NAUCZYCIELA (zadanie w tle)
+# =======================
+def assign_tasks_to_students(student_ids, zadanie_id=None, dzial=None):
+    # uczniowie × wybrane zadania (jedno / dział / wszystkie) – bez zapytania na parę
+    pairs = (
+        select(User.id, Zadanie.id, literal("do zrobienia"))
+        .join(Zadanie, true())
+        .where(User.id.in_(student_ids))
+        .where(~select(ZadanieUser.user_id).where(and_(
+            ZadanieUser.user_id == User.id,
+            ZadanieUser.zadanie_id == Zadanie.id
+        )).exists())
+    )
+    if zadanie_id is not None:
+        pairs = pairs.where(Zadanie.id == zadanie_id)
+    if dzial is not None:
+        pairs = pairs.where(Zadanie.dzial == dzial)
+
+    return _insert_assignments(pairs)
+
+
+def _insert_statement():
+    # NOT EXISTS w SELECT nie widzi wierszy równoległej transakcji (zadanie w tle,
+    # przydział inline, dwie edycje serii) – konflikt klucza po prostu pomijamy
+    dialect = db.engine.dialect.name
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(ZadanieUser)
+
+    return dialect_insert(ZadanieUser).on_conflict_do_nothing(
+        index_elements=[ZadanieUser.user_id, ZadanieUser.zadanie_id]
+    )
+
+
+def _insert_assignments(pairs):
+    # pairs: SELECT (user_id, zadanie_id, status) bez istniejących wierszy;
+    # RETURNING zwraca tylko faktycznie wstawione – statystyki liczą się bez duplikatów
+    inserted = db.session.execute(
+        _insert_statement()
+        .from_select(["user_id", "zadanie_id", "status"], pairs)
+        .returning(ZadanieUser.user_id, ZadanieUser.zadanie_id)
+    ).all()
+
+    if not inserted:
+        return 0
+
+    # statystyki "przypisane" per dział – w tej samej transakcji
+    dzialy = dict(
+        (zid, (przedmiot, dzial)) for zid, przedmiot, dzial in
+        db.session.query(Zadanie.id, Zadanie.przedmiot, Zadanie.dzial)
+        .filter(Zadanie.id.in_({zid for _, zid in inserted}))
+    )
+    record_assignments((uid, *dzialy[zid]) for uid, zid in inserted)
+
+    return len(inserted)
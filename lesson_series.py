@@ -0,0 +1,106 @@
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, update
+
+from models import db, Lesson, LessonStudent, LessonSeries, LessonSeriesLesson
+
+MAX_OCCURRENCES = 60        # rok szkolny co tydzień to ~40 lekcji
+INTERVALS = {"weekly": 1, "biweekly": 2}
+
+
+# =======================
+# TERMINY
+# =======================
+def parse_skip_dates(text):
+    # "2025-11-01, 2025-12-24" albo po jednej w linii
+    return {
+        datetime.strptime(part, "%Y-%m-%d").date()
+        for part in re.split(r"[\s,;]+", text or "")
+        if part
+    }
+
+
+def occurrence_dates(first, until, interval_weeks, skip=()):
+    if until < first:
+        raise ValueError("Data końca serii jest wcześniejsza niż początek")
+
+    step = timedelta(weeks=interval_weeks)
+    slots = (until - first) // step + 1
+    if slots > MAX_OCCURRENCES:
+        raise ValueError(f"Seria może mieć najwyżej {MAX_OCCURRENCES} lekcji")
+
+    dates = (first + i * step for i in range(slots))
+    return [d for d in dates if d not in skip]
+
+
+# =======================
+# TWORZENIE
+# =======================
+def create_series(teacher_id, interval_weeks, dates, student_ids, **fields):
+    # fields: topic, time_from, time_to, teacher_comment – wspólne dla wszystkich terminów
+    # kilka wielowierszowych INSERT-ów w transakcji sesji (commit po stronie widoku)
+    series = LessonSeries(teacher_id=teacher_id, interval_weeks=interval_weeks)
+    db.session.add(series)
+    db.session.flush()
+
+    # bez sort_by_parameter_order: SQLite wtedy wstawia wiersz po wierszu;
+    # kolejność nie jest potrzebna – daty w serii są unikalne
+    lesson_ids = [
+        lesson_id for lesson_id, _ in sorted(
+            db.session.execute(
+                insert(Lesson).returning(Lesson.id, Lesson.date),
+                [{"teacher_id": teacher_id, "date": d, **fields} for d in dates]
+            ),
+            key=lambda row: row[1]
+        )
+    ]
+
+    db.session.execute(insert(LessonSeriesLesson), [
+        {"series_id": series.id, "lesson_id": lesson_id}
+        for lesson_id in lesson_ids
+    ])
+    if student_ids:
+        db.session.execute(insert(LessonStudent), [
+            {"lesson_id": lesson_id, "student_id": student_id}
+            for lesson_id in lesson_ids
+            for student_id in student_ids
+        ])
+
+    return series, lesson_ids
+
+
+# =======================
+# EDYCJA "TA I NASTĘPNE"
+# =======================
+def _shifted_date(days):
+    # przesunięcie daty w UPDATE – składnia zależy od bazy
+    if db.engine.dialect.name == "sqlite":
+        return db.func.date(Lesson.date, f"{days:+d} days")
+    return db.cast(Lesson.date + timedelta(days=days), db.Date)
+
+
+def update_following(lesson, new_date, **fields):
+    # lesson – wystąpienie, od którego zaczyna się zmiana (jeszcze ze starą datą)
+    following = (
+        db.session.query(LessonSeriesLesson.lesson_id)
+        .join(Lesson, Lesson.id == LessonSeriesLesson.lesson_id)
+        .filter(
+            LessonSeriesLesson.series_id == lesson.series_link.series_id,
+            Lesson.date >= lesson.date
+        )
+    )
+    lesson_ids = [lesson_id for lesson_id, in following]
+
+    values = dict(fields)
+    shift = (new_date - lesson.date).days
+    if shift:
+        values["date"] = _shifted_date(shift)
+
+    db.session.execute(
+        update(Lesson)
+        .where(Lesson.id.in_(lesson_ids))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return lesson_ids
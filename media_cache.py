@@ -0,0 +1,401 @@
+import hashlib
+import http.client
+import ipaddress
+import os
+import socket
+import tempfile
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from flask import current_app, url_for
+from sqlalchemy import insert, update
+
+from models import db, utcnow, MediaAsset, VocabularyItem
+
+# Pillow jest opcjonalny – bez niego obrazki zapisujemy bez przeskalowania
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# dozwolone typy → rozszerzenie pliku; svg celowo poza listą (skrypty z naszej domeny)
+MEDIA_TYPES = {
+    "image": {
+        "image/jpeg": ".jpg",
+        "image/png": ".png",
+        "image/gif": ".gif",
+        "image/webp": ".webp",
+    },
+    "audio": {
+        "audio/mpeg": ".mp3",
+        "audio/ogg": ".ogg",
+        "audio/wav": ".wav",
+        "audio/x-wav": ".wav",
+        "audio/mp4": ".m4a",
+        "audio/webm": ".webm",
+    },
+}
+
+BATCH = 50
+# adresów w jednym IN (...) – SQLite ma limit parametrów zapytania
+IN_CHUNK = 500
+# tyle może trwać pobieranie, zanim wiersz przejmie inny worker
+LEASE = timedelta(minutes=5)
+MAX_RETRY_DELAY = timedelta(days=1)
+USER_AGENT = "matura-media-cache/1.0"
+
+
+class FetchError(Exception):
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        # permanent – ponowienie nic nie zmieni (404, zły typ, za duży plik)
+        self.permanent = permanent
+
+
+def url_hash(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _chunks(items, size=IN_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# =======================
+# POBIERANIE
+# =======================
+def _check_address(address):
+    address = ipaddress.ip_address(address)
+    if not address.is_global:
+        raise FetchError(f"Adres spoza internetu: {address}", permanent=True)
+
+
+def _check_host(url, allow_private):
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise FetchError("Nieobsługiwany adres", permanent=True)
+    if allow_private:
+        return
+
+    # serwer nie może posłużyć do zaglądania do sieci wewnętrznej; to tylko wczesne
+    # odrzucenie – rozstrzyga sprawdzenie połączonego gniazda (_create_global_connection)
+    for *_, sockaddr in socket.getaddrinfo(parts.hostname, parts.port or 443, type=socket.SOCK_STREAM):
+        _check_address(sockaddr[0])
+
+
+def _create_global_connection(*args, **kwargs):
+    # urllib rozwiązuje nazwę drugi raz – rekord z krótkim TTL mógłby przejść
+    # _check_host i wskazać 127.0.0.1 (DNS rebinding); sprawdzamy adres gniazda,
+    # z którym faktycznie się połączyliśmy, zanim pójdzie TLS i żądanie
+    sock = socket.create_connection(*args, **kwargs)
+    try:
+        _check_address(sock.getpeername()[0])
+    except FetchError:
+        sock.close()
+        raise
+    return sock
+
+
+class _GlobalHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_global_connection
+
+
+class _GlobalHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_global_connection
+
+
+class _GlobalHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_GlobalHTTPConnection, req)
+
+
+class _GlobalHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_GlobalHTTPSConnection, req, context=self._context)
+
+
+class _CheckedRedirects(urllib.request.HTTPRedirectHandler):
+    def __init__(self, allow_private):
+        self.allow_private = allow_private
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        _check_host(newurl, self.allow_private)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def _download(url, timeout, max_bytes, allow_private):
+    _check_host(url, allow_private)
+
+    handlers = [_CheckedRedirects(allow_private)]
+    if not allow_private:
+        # każde połączenie, także po przekierowaniu, bezpośrednio i ze sprawdzeniem
+        # adresu (przez proxy sprawdzilibyśmy adres proxy, nie celu)
+        handlers += [urllib.request.ProxyHandler({}), _GlobalHTTPHandler(), _GlobalHTTPSHandler()]
+    opener = urllib.request.build_opener(*handlers)
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    try:
+        with opener.open(request, timeout=timeout) as response:
+            content_type = response.headers.get_content_type()
+            data = response.read(max_bytes + 1)
+    except urllib.error.HTTPError as e:
+        # 4xx poza 408/429 się nie poprawi; 5xx i limity – ponawiamy
+        raise FetchError(f"HTTP {e.code}", permanent=400 <= e.code < 500 and e.code not in (408, 429))
+
+    if len(data) > max_bytes:
+        raise FetchError(f"Plik większy niż {max_bytes} B", permanent=True)
+    return content_type, data
+
+
+def _resize_image(data, max_side):
+    try:
+        with Image.open(BytesIO(data)) as img:
+            # animacje zostają w oryginale
+            if getattr(img, "is_animated", False):
+                return None
+
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((max_side, max_side))
+
+            out = BytesIO()
+            if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+                img.save(out, "PNG", optimize=True)
+                return "image/png", out.getvalue()
+            img.convert("RGB").save(out, "JPEG", quality=85, optimize=True, progressive=True)
+            return "image/jpeg", out.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise FetchError(f"Uszkodzony obraz: {e}", permanent=True)
+
+
+def _normalise(kind, content_type, data, max_side):
+    if content_type not in MEDIA_TYPES[kind]:
+        raise FetchError(f"Niedozwolony typ: {content_type}", permanent=True)
+
+    if kind == "image" and Image is not None:
+        resized = _resize_image(data, max_side)
+        if resized is not None:
+            content_type, data = resized
+
+    return content_type, data
+
+
+def _store(folder, data, ext):
+    # nazwa = skrót treści: ten sam plik spod dwóch adresów zapisujemy raz
+    digest = hashlib.sha256(data).hexdigest()
+    filename = digest + ext
+    path = os.path.join(folder, filename)
+
+    if not os.path.exists(path):
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    return filename
+
+
+# =======================
+# KOLEJKA W BAZIE + WĄTEK WORKERA
+# =======================
+class MediaCache:
+    def __init__(self, app):
+        self.app = app
+        config = app.config
+        self.folder = config["MEDIA_CACHE_FOLDER"]
+        self.enabled = config["MEDIA_FETCH_ENABLED"]
+        self.concurrency = config["MEDIA_FETCH_CONCURRENCY"]
+        self.timeout = config["MEDIA_FETCH_TIMEOUT"]
+        self.max_attempts = config["MEDIA_FETCH_ATTEMPTS"]
+        self.retry_delay = timedelta(seconds=config["MEDIA_RETRY_SECONDS"])
+        self.interval = config["MEDIA_FETCH_INTERVAL"]
+        self.max_bytes = config["MEDIA_MAX_BYTES"]
+        self.image_max_size = config["MEDIA_IMAGE_MAX_SIZE"]
+        self.allow_private = config["MEDIA_ALLOW_PRIVATE_HOSTS"]
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # jak w autozapisie: wątek startuje leniwie, już w procesie workera (po forku)
+        if not self.enabled:
+            return
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="media-fetcher",
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    while self.process_pending():
+                        pass
+            except Exception:
+                self.app.logger.exception("Nie udało się pobrać mediów słówek")
+
+    def wake(self):
+        # po commicie nowych adresów – wątek nie czeka na kolejny interwał
+        self._ensure_thread()
+        self._wake.set()
+
+    # ----- rejestracja adresów -----
+    def enqueue(self, items):
+        # items: (url, kind); tylko modyfikuje sesję – commit robi wywołujący
+        rows = {url_hash(url): (url, kind) for url, kind in items if url}
+        if not rows:
+            return 0
+
+        known = {
+            h
+            for chunk in _chunks(rows)
+            for h, in db.session.query(MediaAsset.url_hash).filter(MediaAsset.url_hash.in_(chunk))
+        }
+        new = [
+            {"url_hash": h, "source_url": url, "kind": kind, "next_attempt_at": utcnow()}
+            for h, (url, kind) in rows.items() if h not in known
+        ]
+        if new:
+            db.session.execute(self._insert_ignoring_duplicates(), new)
+        return len(new)
+
+    def _insert_ignoring_duplicates(self):
+        # ten sam adres dodany równolegle w innym żądaniu nie może wywrócić commitu
+        dialect = db.engine.dialect.name
+
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return insert(MediaAsset)
+
+        return dialect_insert(MediaAsset).on_conflict_do_nothing(index_elements=[MediaAsset.url_hash])
+
+    def enqueue_vocabulary(self):
+        # wszystkie adresy ze słówek (uzupełnienie po wdrożeniu / po imporcie)
+        items = db.session.query(VocabularyItem.image_url, VocabularyItem.audio_url)
+        return self.enqueue(
+            (url, kind)
+            for image_url, audio_url in items
+            for url, kind in ((image_url, "image"), (audio_url, "audio"))
+        )
+
+    # ----- przetwarzanie -----
+    def process_pending(self):
+        now = utcnow()
+        candidates = [
+            asset_id for asset_id, in
+            db.session.query(MediaAsset.id)
+            .filter(MediaAsset.status == "pending", MediaAsset.next_attempt_at <= now)
+            .order_by(MediaAsset.next_attempt_at)
+            .limit(BATCH)
+        ]
+        if not candidates:
+            return 0
+
+        # dzierżawa: warunek w UPDATE – z kilku workerów wiersz bierze jeden
+        claimed = db.session.execute(
+            update(MediaAsset)
+            .where(
+                MediaAsset.id.in_(candidates),
+                MediaAsset.status == "pending",
+                MediaAsset.next_attempt_at <= now
+            )
+            .values(next_attempt_at=now + LEASE, attempts=MediaAsset.attempts + 1)
+            .returning(MediaAsset.id, MediaAsset.source_url, MediaAsset.kind, MediaAsset.attempts)
+        ).all()
+        db.session.commit()
+
+        # sieć i dysk poza transakcją, najwyżej `concurrency` pobrań naraz
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(self._fetch, claimed))
+
+        for asset, result in zip(claimed, results):
+            db.session.execute(
+                update(MediaAsset)
+                .where(MediaAsset.id == asset.id)
+                .values(**result)
+            )
+        db.session.commit()
+
+        return len(claimed)
+
+    def _fetch(self, asset):
+        try:
+            content_type, data = _download(asset.source_url, self.timeout, self.max_bytes, self.allow_private)
+            content_type, data = _normalise(asset.kind, content_type, data, self.image_max_size)
+            filename = _store(self.folder, data, MEDIA_TYPES[asset.kind][content_type])
+        except Exception as e:
+            permanent = isinstance(e, FetchError) and e.permanent
+            if permanent or asset.attempts >= self.max_attempts:
+                return {"status": "failed", "last_error": str(e)[:255]}
+            delay = min(self.retry_delay * 2 ** (asset.attempts - 1), MAX_RETRY_DELAY)
+            return {"next_attempt_at": utcnow() + delay, "last_error": str(e)[:255]}
+
+        return {
+            "status": "ready",
+            "filename": filename,
+            "content_type": content_type,
+            "size": len(data),
+            "fetched_at": utcnow(),
+            "last_error": None,
+        }
+
+    def retry_failed(self):
+        return db.session.execute(
+            update(MediaAsset)
+            .where(MediaAsset.status == "failed")
+            .values(status="pending", attempts=0, next_attempt_at=utcnow())
+        ).rowcount
+
+    # ----- adresy do wyświetlenia -----
+    def local_urls(self, urls):
+        # {adres źródłowy: adres lokalnej kopii} – jedno zapytanie na IN_CHUNK adresów, tylko gotowe pliki
+        hashes = {url_hash(url): url for url in urls if url}
+        if not hashes:
+            return {}
+
+        # ponowienia po restarcie workera ruszają przy pierwszej stronie z mediami
+        self._ensure_thread()
+
+        return {
+            hashes[h]: url_for("media.media_file", filename=filename)
+            for chunk in _chunks(hashes)
+            for h, filename in (
+                db.session.query(MediaAsset.url_hash, MediaAsset.filename)
+                .filter(MediaAsset.url_hash.in_(chunk), MediaAsset.status == "ready")
+            )
+        }
+
+
+def init_media_cache(app):
+    cache = MediaCache(app)
+    app.extensions["media_cache"] = cache
+    return cache
+
+
+def get_media_cache():
+    return current_app.extensions["media_cache"]
@@ -0,0 +1,142 @@
+import hmac
+import os
+import time
+
+from flask import Response, abort, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+# pod gunicornem PROMETHEUS_MULTIPROC_DIR ustawia gunicorn.conf.py – każdy worker
+# zapisuje wartości do własnych plików mmap, /metrics sumuje je przy odczycie
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CHECKOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+HASH_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2)
+
+
+# =======================
+# METRYKI
+# =======================
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Czas obsługi żądania",
+    ["endpoint", "method"],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS = Counter(
+    "http_requests_total",
+    "Liczba żądań",
+    ["endpoint", "method", "status"]
+)
+REQUEST_ERRORS = Counter(
+    "http_request_errors_total",
+    "Liczba odpowiedzi 5xx",
+    ["endpoint"]
+)
+DB_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Czas pobrania połączenia z puli",
+    ["bind"],
+    buckets=CHECKOUT_BUCKETS
+)
+DB_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Połączenia pobrane z puli",
+    ["bind"],
+    multiprocess_mode="livesum"
+)
+PASSWORD_HASH = Histogram(
+    "password_hash_seconds",
+    "Czas liczenia / sprawdzania hasha hasła",
+    ["operation"],
+    buckets=HASH_BUCKETS
+)
+
+
+# =======================
+# PULA POŁĄCZEŃ
+# =======================
+def _instrument_engine(engine, bind):
+    checkout = DB_CHECKOUT.labels(bind)
+    in_use = DB_IN_USE.labels(bind)
+
+    # każde Connection pobiera połączenie przez engine.raw_connection();
+    # owijamy silnik, a nie pulę – dispose() po forku tworzy nową pulę
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            checkout.observe(time.perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
+
+    event.listen(engine, "checkout", lambda *args: in_use.inc())
+    event.listen(engine, "checkin", lambda *args: in_use.dec())
+
+
+def _registry():
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+# =======================
+# INTEGRACJA Z FLASKIEM
+# =======================
+def init_metrics(app):
+    from models import db  # models importuje PASSWORD_HASH z tego modułu
+
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            _instrument_engine(engine, bind or "default")
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+
+        # nazwa endpointu, nie URL – stała liczba serii
+        endpoint = request.endpoint or "<unmatched>"
+        REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - start)
+        REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        if response.status_code >= 500:
+            REQUEST_ERRORS.labels(endpoint).inc()
+
+        return response
+
+    # bez tokenu /metrics nie istnieje (404) – czasy endpointów, pula i kolejka
+    # zadań nie mogą być widoczne dla anonimowego klienta
+    token = app.config.get("METRICS_TOKEN")
+    if not token:
+        return
+
+    def metrics_view():
+        authorization = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+            abort(401)
+        return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timezone
+from db_routing import RoutingSession
+from metrics import PASSWORD_HASH
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 def utcnow():
@@ -29,10 +31,12 @@ class User(db.Model):
     )
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        with PASSWORD_HASH.labels("set").time():
+            self.password_hash = generate_password_hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        with PASSWORD_HASH.labels("check").time():
+            return check_password_hash(self.password_hash, password)
 
 
 # =======================
@@ -126,6 +130,68 @@ class ZadanieUser(db.Model):
     odpowiedz_usera = db.Column(db.Text)
 
 
+# =======================
+# STATYSTYKI UCZNIA (per dział)
+# =======================
+class StudentDzialStats(db.Model):
+    __tablename__ = 'student_dzial_stats'
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey('users.id'),
+        primary_key=True
+    )
+    przedmiot = db.Column(db.String(30), primary_key=True)
+    dzial = db.Column(db.String(100), primary_key=True)
+
+    assigned = db.Column(db.Integer, nullable=False, default=0)
+    done = db.Column(db.Integer, nullable=False, default=0)      # 'zrobione'
+    wrong = db.Column(db.Integer, nullable=False, default=0)     # 'błędne'
+    pending = db.Column(db.Integer, nullable=False, default=0)   # 'oddane'
+
+    last_activity = db.Column(db.DateTime)
+
+
+# =======================
+# TRUDNOŚĆ ZADAŃ (wyniki wszystkich uczniów)
+# =======================
+class TaskDifficulty(db.Model):
+    __tablename__ = 'task_difficulty'
+
+    zadanie_id = db.Column(
+        db.Integer,
+        db.ForeignKey('zadania.id'),
+        primary_key=True
+    )
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)  # 'zrobione' + 'błędne'
+    correct = db.Column(db.Integer, nullable=False, default=0)   # 'zrobione'
+
+    # workery doczytują tylko wiersze zmienione od ostatniego odświeżenia
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow, index=True)
+
+
+# =======================
+# SZKICE ODPOWIEDZI (autozapis)
+# =======================
+class TaskDraft(db.Model):
+    __tablename__ = 'task_drafts'
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey('users.id'),
+        primary_key=True
+    )
+    zadanie_id = db.Column(
+        db.Integer,
+        db.ForeignKey('zadania.id'),
+        primary_key=True
+    )
+
+    content = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+
 # =======================
 # ZAŁĄCZNIKI USERA DO ZADANIA
 # =======================
@@ -153,6 +219,11 @@ class ZadanieUserZalacznik(db.Model):
 class Lesson(db.Model):
     __tablename__ = "lessons"
 
+    __table_args__ = (
+        # kalendarz nauczyciela: lekcje z zakresu dat
+        db.Index("ix_lessons_teacher_date", "teacher_id", "date"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     # Kiedy jest lekcja
@@ -186,6 +257,11 @@ class Lesson(db.Model):
 class LessonStudent(db.Model):
     __tablename__ = "lesson_students"
 
+    __table_args__ = (
+        # klucz główny zaczyna się od lesson_id – lekcje ucznia potrzebują osobnego indeksu
+        db.Index("ix_lesson_students_student", "student_id"),
+    )
+
     lesson_id = db.Column(
         db.Integer,
         db.ForeignKey("lessons.id"),
@@ -266,6 +342,66 @@ class LessonNote(db.Model):
     student = db.relationship("User")
 
 
+class LessonSeries(db.Model):
+    __tablename__ = "lesson_series"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    teacher_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id"),
+        nullable=False
+    )
+
+    # 1 – co tydzień, 2 – co dwa tygodnie
+    interval_weeks = db.Column(db.Integer, nullable=False, default=1)
+
+    created_at = db.Column(db.DateTime, default=utcnow)
+
+    teacher = db.relationship("User")
+
+
+class LessonSeriesLesson(db.Model):
+    # osobna tabela zamiast kolumny w lessons – istniejące bazy dostaje ją flask init-db
+    __tablename__ = "lesson_series_lessons"
+
+    series_id = db.Column(
+        db.Integer,
+        db.ForeignKey("lesson_series.id"),
+        primary_key=True,
+        nullable=False
+    )
+
+    lesson_id = db.Column(
+        db.Integer,
+        db.ForeignKey("lessons.id"),
+        primary_key=True,
+        nullable=False,
+        unique=True
+    )
+
+    series = db.relationship("LessonSeries", backref="occurrences")
+    lesson = db.relationship(
+        "Lesson",
+        backref=db.backref("series_link", uselist=False)
+    )
+
+
+class CalendarFeedKey(db.Model):
+    # wersja linku do kalendarza (iCal); nowy link unieważnia poprzednie –
+    # osobna tabela zamiast kolumny w users, brak wiersza = wersja 0
+    __tablename__ = "calendar_feed_keys"
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id"),
+        primary_key=True
+    )
+
+    version = db.Column(db.Integer, nullable=False, default=0)
+    rotated_at = db.Column(db.DateTime, default=utcnow)
+
+
 class Notification(db.Model):
     __tablename__ = "notifications"
 
@@ -360,3 +496,162 @@ class VocabularyItem(db.Model):
         "Material",
         backref=db.backref("vocabulary_items", cascade="all, delete-orphan")
     )
+
+
+# =======================
+# LOKALNE KOPIE MEDIÓW SŁÓWEK
+# =======================
+class MediaAsset(db.Model):
+    __tablename__ = "media_assets"
+
+    __table_args__ = (
+        # kolejka pobierania: "pending" z terminem <= teraz
+        db.Index("ix_media_assets_pending", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # sha256 adresu – unikalny indeks niezależny od długości URL
+    url_hash = db.Column(db.String(64), nullable=False, unique=True)
+    source_url = db.Column(db.Text, nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # image / audio
+
+    # pending → ready / failed
+    status = db.Column(db.String(10), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    last_error = db.Column(db.String(255))
+
+    # <sha256 treści><rozszerzenie> w MEDIA_CACHE_FOLDER
+    filename = db.Column(db.String(80))
+    content_type = db.Column(db.String(50))
+    size = db.Column(db.Integer)
+    fetched_at = db.Column(db.DateTime)
+
+
+# =======================
+# POWTÓRKI SŁÓWEK (SRS)
+# =======================
+class VocabularyReview(db.Model):
+    __tablename__ = "vocabulary_reviews"
+
+    __table_args__ = (
+        # "następne N kart do powtórki" = zakres po tym indeksie
+        db.Index("ix_vocab_review_student_due", "student_id", "due_at"),
+    )
+
+    student_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id"),
+        primary_key=True
+    )
+
+    item_id = db.Column(
+        db.Integer,
+        db.ForeignKey("vocabulary_items.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    # stan algorytmu SM-2
+    ease = db.Column(db.Float, nullable=False, default=2.5)
+    interval_days = db.Column(db.Integer, nullable=False, default=0)
+    repetitions = db.Column(db.Integer, nullable=False, default=0)
+    lapses = db.Column(db.Integer, nullable=False, default=0)
+
+    due_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    last_reviewed_at = db.Column(db.DateTime)
+
+    item = db.relationship("VocabularyItem")
+
+
+# =======================
+# TRYB EGZAMINU (cały arkusz)
+# =======================
+class ExamSession(db.Model):
+    __tablename__ = "exam_sessions"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    student_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id"),
+        nullable=False,
+        index=True
+    )
+
+    # arkusz
+    przedmiot = db.Column(db.String(30), nullable=False)
+    rok_arkusza = db.Column(db.Integer, nullable=False)
+    rodzaj_arkusza = db.Column(db.String(50), nullable=False)
+
+    started_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    deadline = db.Column(db.DateTime, nullable=False)
+    submitted_at = db.Column(db.DateTime)
+
+    # punkty tylko za zadania zamknięte – otwarte sprawdza nauczyciel
+    score = db.Column(db.Integer)
+    max_score = db.Column(db.Integer)
+
+    student = db.relationship("User")
+
+
+class ExamAnswer(db.Model):
+    __tablename__ = "exam_answers"
+
+    exam_id = db.Column(
+        db.Integer,
+        db.ForeignKey("exam_sessions.id"),
+        primary_key=True
+    )
+
+    zadanie_id = db.Column(
+        db.Integer,
+        db.ForeignKey("zadania.id"),
+        primary_key=True
+    )
+
+    answer = db.Column(db.Text)
+    is_correct = db.Column(db.Boolean)  # None = zadanie otwarte
+
+    exam = db.relationship(
+        "ExamSession",
+        backref=db.backref("answers", lazy=True)
+    )
+
+
+# =======================
+# ZADANIA W TLE (kolejka w bazie)
+# =======================
+class Job(db.Model):
+    __tablename__ = "jobs"
+
+    __table_args__ = (
+        # kolejka: "queued" z terminem <= teraz albo "running" z wygasłą dzierżawą
+        db.Index("ix_jobs_status_run_at", "status", "run_at"),
+        # "moje ostatnie zadania" w panelu nauczyciela
+        db.Index("ix_jobs_created_by", "created_by", "created_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")  # JSON – argumenty handlera
+
+    # queued → running → done / failed (błąd z ponowieniem wraca do queued)
+    status = db.Column(db.String(10), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+
+    run_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    # worker, który padł w trakcie, po tym czasie oddaje zadanie innym
+    locked_until = db.Column(db.DateTime)
+
+    created_by = db.Column(db.Integer, db.ForeignKey("users.id"))
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    last_error = db.Column(db.Text)
+    result = db.Column(db.Text)  # JSON
+
+    author = db.relationship("User")
@@ -0,0 +1,159 @@
+import threading
+import time
+
+from models import db, utcnow, Zadanie, ZadanieUser, StudentDzialStats, TaskDifficulty
+
+REFRESH_INTERVAL = 5       # sekundy między doczytaniem zmian
+FULL_RELOAD_INTERVAL = 3600
+RECENCY_DAYS = 14          # po tylu dniach przerwy dział jest "w pełni zaległy"
+
+WEIGHT_WEAKNESS = 0.5
+WEIGHT_FIT = 0.3
+WEIGHT_RECENCY = 0.2
+
+
+# =======================
+# MODEL W PAMIĘCI WORKERA
+# =======================
+class TaskModel:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tasks = {}        # zadanie_id → (przedmiot, dzial)
+        self.difficulty = {}   # zadanie_id → (attempts, correct)
+        self._max_task_id = 0
+        self._difficulty_seen = None
+        self._refreshed = None
+        self._full_reload = None
+
+    def _fresh(self, now):
+        return self._refreshed is not None and now - self._refreshed < REFRESH_INTERVAL
+
+    def refresh(self):
+        now = time.monotonic()
+        if self._fresh(now):
+            return
+
+        with self._lock:
+            if self._fresh(now):
+                return
+
+            if self._full_reload is None or now - self._full_reload > FULL_RELOAD_INTERVAL:
+                self._load_all()
+                self._full_reload = now
+            else:
+                self._load_changes()
+
+            self._refreshed = now
+
+    def _load_all(self):
+        # pełne przeładowanie łapie też edycje i usunięcia zadań;
+        # budujemy nowe słowniki i podmieniamy je na końcu
+        tasks, difficulty = {}, {}
+        self._max_task_id = 0
+        self._difficulty_seen = None
+        self._load_changes(tasks, difficulty)
+        self.tasks, self.difficulty = tasks, difficulty
+
+    def _load_changes(self, tasks=None, difficulty=None):
+        tasks = self.tasks if tasks is None else tasks
+        difficulty = self.difficulty if difficulty is None else difficulty
+
+        # nowe zadania – rosnące id
+        for tid, przedmiot, dzial in (
+                db.session.query(Zadanie.id, Zadanie.przedmiot, Zadanie.dzial)
+                .filter(Zadanie.id > self._max_task_id)
+        ):
+            tasks[tid] = (przedmiot, dzial)
+            self._max_task_id = max(self._max_task_id, tid)
+
+        # wyniki zmienione od ostatniego razu (indeks na updated_at)
+        query = db.session.query(
+            TaskDifficulty.zadanie_id,
+            TaskDifficulty.attempts,
+            TaskDifficulty.correct,
+            TaskDifficulty.updated_at
+        )
+        if self._difficulty_seen is not None:
+            query = query.filter(TaskDifficulty.updated_at >= self._difficulty_seen)
+
+        for tid, attempts, correct, updated_at in query:
+            difficulty[tid] = (attempts, correct)
+            if self._difficulty_seen is None or updated_at > self._difficulty_seen:
+                self._difficulty_seen = updated_at
+
+    def success_rate(self, zadanie_id):
+        # wygładzenie Laplace'a – zadanie bez prób ma 0.5
+        attempts, correct = self.difficulty.get(zadanie_id, (0, 0))
+        return (correct + 1) / (attempts + 2)
+
+
+_model = TaskModel()
+
+
+# =======================
+# REKOMENDACJA
+# =======================
+def _mastery(user_id):
+    # student_dzial_stats = wektor opanowania działów, aktualizowany przy każdym oddaniu
+    return {
+        (r.przedmiot, r.dzial): r
+        for r in StudentDzialStats.query.filter_by(user_id=user_id)
+    }
+
+
+def recommend(user_id, limit=5):
+    _model.refresh()
+
+    candidates = [
+        tid for (tid,) in
+        db.session.query(ZadanieUser.zadanie_id)
+        .filter(
+            ZadanieUser.user_id == user_id,
+            ZadanieUser.status == 'do zrobienia'
+        )
+    ]
+    if not candidates:
+        return []
+
+    mastery = _mastery(user_id)
+    now = utcnow().replace(tzinfo=None)
+
+    scored = []
+    for tid in candidates:
+        task = _model.tasks.get(tid)
+        if task is None:
+            continue
+
+        stats = mastery.get(task)
+        if stats is not None:
+            level = (stats.done + 1) / (stats.done + stats.wrong + 2)
+            if stats.last_activity:
+                days = (now - stats.last_activity.replace(tzinfo=None)).days
+                recency = min(days, RECENCY_DAYS) / RECENCY_DAYS
+            else:
+                recency = 1.0
+        else:
+            level, recency = 0.5, 1.0
+
+        # zadanie "na miarę" ucznia: przewidywana skuteczność bliska jego poziomowi
+        fit = 1 - abs(_model.success_rate(tid) - level)
+
+        score = (
+            WEIGHT_WEAKNESS * (1 - level)
+            + WEIGHT_FIT * fit
+            + WEIGHT_RECENCY * recency
+        )
+        scored.append((score, tid, task))
+
+    scored.sort(key=lambda x: (-x[0], x[1]))
+
+    return [
+        {
+            "zadanie_id": tid,
+            "przedmiot": przedmiot,
+            "dzial": dzial,
+            "success_rate": round(_model.success_rate(tid), 2),
+            "score": round(score, 3),
+        }
+        for score, tid, (przedmiot, dzial) in scored[:limit]
+    ]
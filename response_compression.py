@@ -0,0 +1,271 @@
+import zlib
+
+# brotli i zstandard są opcjonalne – bez nich zostaje sam gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIBLE_MIMETYPES = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+    "text/calendar",
+)
+
+
+# =======================
+# KODEKI
+# =======================
+class _GzipCompressor:
+    def __init__(self, level):
+        # wbits=31 → nagłówek gzip
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+def available_encodings():
+    # kolejność = preferencja serwera przy równym q
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def make_compressor(encoding, level):
+    if encoding == "gzip":
+        return _GzipCompressor(level)
+    if encoding == "br":
+        return _BrotliCompressor(level)
+    if encoding == "zstd":
+        return _ZstdCompressor(level)
+    raise ValueError(f"Nieobsługiwane kodowanie: {encoding}")
+
+
+def negotiate_encoding(accept_encoding, encodings):
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    best = None
+    best_q = 0.0
+    for encoding in encodings:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+
+    return best
+
+
+# =======================
+# MIDDLEWARE WSGI
+# =======================
+class CompressionMiddleware:
+    def __init__(self, wsgi_app, levels=None, min_size=500,
+                 mimetypes=COMPRESSIBLE_MIMETYPES):
+        self.wsgi_app = wsgi_app
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3}
+        self.levels.update(levels or {})
+        self.min_size = min_size
+        self.mimetypes = tuple(mimetypes)
+        self.encodings = available_encodings()
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") == "HEAD":
+            return self.wsgi_app(environ, start_response)
+
+        encoding = negotiate_encoding(
+            environ.get("HTTP_ACCEPT_ENCODING", ""),
+            self.encodings
+        )
+        if encoding is None:
+            return self.wsgi_app(environ, start_response)
+
+        state = {"compressor": None, "streaming": False}
+
+        def compressing_start_response(status, headers, exc_info=None):
+            if self._should_compress(status, headers):
+                length = _header(headers, "Content-Length")
+                state["streaming"] = length is None
+                state["compressor"] = make_compressor(
+                    encoding, self.levels[encoding]
+                )
+
+                headers = [
+                    (k, v) for k, v in headers
+                    if k.lower() not in ("content-length", "content-encoding")
+                ]
+                headers.append(("Content-Encoding", encoding))
+                headers = _weaken_etag(_add_vary(headers))
+            elif _header(headers, "Content-Encoding") is None:
+                headers = _add_vary(list(headers))
+                # 304 opisuje odpowiedź, która poszłaby skompresowana – ten sam ETag co przy 200
+                if status.startswith("304"):
+                    headers = _weaken_etag(headers)
+
+            write = start_response(status, headers, exc_info)
+            compressor = state["compressor"]
+            if compressor is None:
+                return write
+
+            # rzadko używane API write() – kompresujemy bez buforowania
+            def compressing_write(data):
+                write(compressor.compress(data) + compressor.flush())
+
+            return compressing_write
+
+        app_iter = self.wsgi_app(environ, compressing_start_response)
+        return _CompressedBody(app_iter, state)
+
+    def _should_compress(self, status, headers):
+        code = int(status.split(" ", 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+
+        if _header(headers, "Content-Encoding") is not None:
+            return False
+
+        content_type = (_header(headers, "Content-Type") or "").split(";")[0]
+        if content_type.strip().lower() not in self.mimetypes:
+            return False
+
+        length = _header(headers, "Content-Length")
+        if length is not None and int(length) < self.min_size:
+            return False
+
+        return True
+
+
+class _CompressedBody:
+    def __init__(self, app_iter, state):
+        self.app_iter = app_iter
+        self.state = state
+
+    def __iter__(self):
+        for chunk in self.app_iter:
+            compressor = self.state["compressor"]
+            if compressor is None:
+                yield chunk
+                continue
+
+            data = compressor.compress(chunk)
+            # przy streamingu klient ma dostać dane od razu
+            if self.state["streaming"]:
+                data += compressor.flush()
+            if data:
+                yield data
+
+        if self.state["compressor"] is not None:
+            yield self.state["compressor"].finish()
+
+    def close(self):
+        if hasattr(self.app_iter, "close"):
+            self.app_iter.close()
+
+
+def _header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _add_vary(headers):
+    vary = _header(headers, "Vary")
+    if vary is None:
+        headers.append(("Vary", "Accept-Encoding"))
+    elif "accept-encoding" not in vary.lower():
+        headers = [(k, v) for k, v in headers if k.lower() != "vary"]
+        headers.append(("Vary", f"{vary}, Accept-Encoding"))
+    return headers
+
+
+def _weaken_etag(headers):
+    # inne bajty niż w oryginale – silny ETag obiecywałby identyczną treść (RFC 9110 8.8.3);
+    # słaby nadal pasuje do If-None-Match, bo to porównanie jest słabe
+    etag = _header(headers, "ETag")
+    if etag is None or etag.startswith("W/"):
+        return headers
+    headers = [(k, v) for k, v in headers if k.lower() != "etag"]
+    headers.append(("ETag", "W/" + etag))
+    return headers
+
+
+def init_compression(app):
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        levels={
+            "gzip": app.config.get("COMPRESS_GZIP_LEVEL", 6),
+            "br": app.config.get("COMPRESS_BR_LEVEL", 4),
+            "zstd": app.config.get("COMPRESS_ZSTD_LEVEL", 3),
+        },
+        min_size=app.config.get("COMPRESS_MIN_SIZE", 500)
+    )
@@ -0,0 +1,343 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as dtime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from models import (
+    db, User, Zadanie, ZadanieUser, Lesson, LessonStudent, LessonTask, LessonNote,
+    Notification, Material, MaterialNote, VocabularyItem
+)
+from lesson_assignments import lesson_task_pairs
+from stats import rebuild_stats
+from subjects import DZIALY_PRZEDMIOTOW
+
+CHUNK = 20_000     # wierszy na jedno executemany
+START_DATE = date(2025, 9, 1)   # początek roku szkolnego – daty nie zależą od dnia uruchomienia
+
+SCALES = {
+    # (zadania_user w przybliżeniu = students × tasks_per_student)
+    "small": dict(
+        teachers=2, students=50, tasks=500, tasks_per_student=50,
+        lessons_per_teacher=20, materials_per_teacher=10, notifications_per_student=5
+    ),
+    "medium": dict(
+        teachers=10, students=1_000, tasks=5_000, tasks_per_student=200,
+        lessons_per_teacher=100, materials_per_teacher=20, notifications_per_student=10
+    ),
+    "large": dict(
+        teachers=50, students=20_000, tasks=20_000, tasks_per_student=500,
+        lessons_per_teacher=300, materials_per_teacher=40, notifications_per_student=20
+    ),
+}
+
+SUBJECT_WEIGHTS = {"matematyka": 0.6, "polski": 0.2, "angielski": 0.2}
+WORDS_PER_MATERIAL = 30
+
+
+# =======================
+# POMOCNICZE
+# =======================
+def _dzialy(przedmiot):
+    dzialy = DZIALY_PRZEDMIOTOW[przedmiot]
+    # angielski: kategorie arkusza są kluczami słownika
+    return list(dzialy) if isinstance(dzialy, dict) else dzialy
+
+
+def _insert(conn, table, rows):
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            conn.execute(table.insert(), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+        count += len(batch)
+    return count
+
+
+def _next_id(conn, model):
+    return (conn.execute(db.select(db.func.max(model.id))).scalar() or 0) + 1
+
+
+# tabele z jawnie nadawanymi id – po imporcie sekwencje Postgresa muszą je dogonić
+EXPLICIT_IDS = (User, Zadanie, Lesson, Material)
+
+
+@contextmanager
+def _bulk_connection():
+    with db.engine.connect() as conn:
+        synchronous = None
+        if conn.dialect.name == "sqlite":
+            # jednorazowy import – bez fsync po każdej paczce; połączenie wraca
+            # do puli, więc po commicie przywracamy poprzednie ustawienie
+            synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            conn.commit()
+        try:
+            with conn.begin():
+                yield conn
+
+                if conn.dialect.name == "postgresql":
+                    for model in EXPLICIT_IDS:
+                        table = model.__tablename__
+                        conn.exec_driver_sql(
+                            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                            f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table}"
+                        )
+        finally:
+            if synchronous is not None:
+                conn.exec_driver_sql(f"PRAGMA synchronous = {int(synchronous)}")
+                conn.commit()
+
+
+# =======================
+# GENERATORY WIERSZY
+# =======================
+def _users(first_id, teachers, students, password_hash):
+    for i in range(teachers):
+        yield {
+            "id": first_id + i,
+            "imie": f"Nauczyciel{i + 1}",
+            "nazwisko": "Testowy",
+            "login": f"nauczyciel{first_id + i}",
+            "password_hash": password_hash,
+            "role": "teacher",
+        }
+    for i in range(students):
+        uid = first_id + teachers + i
+        yield {
+            "id": uid,
+            "imie": f"Uczeń{i + 1}",
+            "nazwisko": "Testowy",
+            "login": f"uczen{uid}",
+            "password_hash": password_hash,
+            "role": "student",
+        }
+
+
+def _tasks(rnd, first_id, count, teacher_ids):
+    subjects = list(SUBJECT_WEIGHTS)
+    weights = list(SUBJECT_WEIGHTS.values())
+    dzialy = {p: _dzialy(p) for p in subjects}
+
+    for i in range(count):
+        przedmiot = rnd.choices(subjects, weights)[0]
+        closed = rnd.random() < 0.7
+        matura = rnd.random() < 0.8
+        yield {
+            "id": first_id + i,
+            "przedmiot": przedmiot,
+            "zakres": "podstawa" if rnd.random() < 0.7 else "rozszerzenie",
+            "rok_arkusza": rnd.randint(2010, 2025) if matura else 0,
+            "rodzaj_arkusza": "matura" if matura else "out",
+            "numer_zadania": rnd.randint(1, 35) if matura else 0,
+            "typ_zadania": "zamkniete" if closed else "otwarte",
+            "dzial": rnd.choice(dzialy[przedmiot]),
+            "tresc": f"Zadanie {first_id + i}: wyznacz wartość wyrażenia dla $x = {rnd.randint(1, 99)}$.",
+            "odp_a": "1" if closed else None,
+            "odp_b": "2" if closed else None,
+            "odp_c": "3" if closed else None,
+            "odp_d": "4" if closed else None,
+            "poprawna_odp": rnd.choice("ABCD") if closed else None,
+            "created_by": rnd.choice(teacher_ids),
+            "created_at": datetime.combine(START_DATE, dtime(8)) - timedelta(days=rnd.randint(0, 365)),
+        }
+
+
+def _assignments(rnd, student_ids, tasks, per_student):
+    # tasks: lista (id, zamknięte?, trudność 0–1)
+    per_student = min(per_student, len(tasks))
+
+    for sid in student_ids:
+        # uczniowie różnią się zaangażowaniem i poziomem
+        engagement = rnd.uniform(0.2, 0.9)
+        ability = rnd.betavariate(5, 3)
+
+        for tid, closed, difficulty in rnd.sample(tasks, per_student):
+            if rnd.random() > engagement:
+                yield {"user_id": sid, "zadanie_id": tid, "status": "do zrobienia", "odpowiedz_usera": None}
+            elif closed:
+                correct = rnd.random() < ability * (1 - difficulty) + 0.15
+                yield {
+                    "user_id": sid,
+                    "zadanie_id": tid,
+                    "status": "zrobione" if correct else "błędne",
+                    "odpowiedz_usera": rnd.choice("ABCD"),
+                }
+            else:
+                yield {"user_id": sid, "zadanie_id": tid, "status": "oddane", "odpowiedz_usera": "Rozwiązanie…"}
+
+
+def _lessons(rnd, first_id, teacher_ids, per_teacher):
+    lesson_id = first_id
+    for tid in teacher_ids:
+        for _ in range(per_teacher):
+            hour = rnd.randint(8, 19)
+            yield {
+                "id": lesson_id,
+                "date": START_DATE + timedelta(days=rnd.randint(0, 300)),
+                "time_from": dtime(hour),
+                "time_to": dtime(hour, 45),
+                "topic": f"Lekcja {lesson_id}",
+                "teacher_comment": "Powtórka przed sprawdzianem" if rnd.random() < 0.3 else None,
+                "teacher_id": tid,
+            }
+            lesson_id += 1
+
+
+def _materials(rnd, first_id, teacher_ids, per_teacher, vocab_categories):
+    material_id = first_id
+    for tid in teacher_ids:
+        for _ in range(per_teacher):
+            vocabulary = rnd.random() < 0.4
+            przedmiot = "angielski" if vocabulary else rnd.choice(["matematyka", "polski"])
+            yield {
+                "id": material_id,
+                "title": f"Materiał {material_id}",
+                "subject": przedmiot,
+                "zakres": "podstawa",
+                "dzial": "Vocabulary" if vocabulary else rnd.choice(_dzialy(przedmiot)),
+                "material_type": "VOCABULARY" if vocabulary else "NOTE",
+                "created_by": tid,
+                "category": rnd.choice(vocab_categories) if vocabulary else None,
+            }
+            material_id += 1
+
+
+def _notifications(rnd, student_ids, per_student):
+    start = datetime.combine(START_DATE, dtime(8))
+    for sid in student_ids:
+        for n in range(per_student):
+            yield {
+                "user_id": sid,
+                "content": f"Nowe zadanie do zrobienia ({n + 1})",
+                "created_at": start + timedelta(minutes=rnd.randint(0, 300 * 24 * 60)),
+                "is_read": rnd.random() < 0.7,
+            }
+
+
+# =======================
+# GENERATOR
+# =======================
+def generate(
+        seed=0,
+        teachers=2,
+        students=50,
+        tasks=500,
+        tasks_per_student=50,
+        lessons_per_teacher=20,
+        materials_per_teacher=10,
+        notifications_per_student=5,
+        password="haslo123",
+        progress=print
+):
+    rnd = random.Random(seed)
+    # jeden hash dla wszystkich kont – liczenie milionów hashy trwałoby godzinami
+    password_hash = generate_password_hash(password)
+    counts = {}
+
+    def step(name, fn):
+        start = time.perf_counter()
+        counts[name] = fn()
+        elapsed = time.perf_counter() - start
+        progress(f"{name:<18}{counts[name]:>12,} wierszy {elapsed:8.1f} s")
+
+    with _bulk_connection() as conn:
+        first_user = _next_id(conn, User)
+        teacher_ids = list(range(first_user, first_user + teachers))
+        student_ids = list(range(first_user + teachers, first_user + teachers + students))
+        step("users", lambda: _insert(
+            conn, User.__table__, _users(first_user, teachers, students, password_hash)
+        ))
+
+        first_task = _next_id(conn, Zadanie)
+        task_rows = []
+
+        def tasks_with_meta():
+            for row in _tasks(rnd, first_task, tasks, teacher_ids):
+                task_rows.append((row["id"], row["typ_zadania"] == "zamkniete", rnd.random()))
+                yield row
+
+        step("zadania", lambda: _insert(conn, Zadanie.__table__, tasks_with_meta()))
+        step("zadania_user", lambda: _insert(
+            conn, ZadanieUser.__table__, _assignments(rnd, student_ids, task_rows, tasks_per_student)
+        ))
+
+        first_lesson = _next_id(conn, Lesson)
+        lesson_ids = []
+
+        def lessons():
+            for row in _lessons(rnd, first_lesson, teacher_ids, lessons_per_teacher):
+                lesson_ids.append(row["id"])
+                yield row
+
+        step("lessons", lambda: _insert(conn, Lesson.__table__, lessons()))
+
+        members = {}
+
+        def lesson_students():
+            for lid in lesson_ids:
+                members[lid] = rnd.sample(student_ids, min(rnd.randint(1, 8), len(student_ids)))
+                for sid in members[lid]:
+                    yield {"lesson_id": lid, "student_id": sid}
+
+        step("lesson_students", lambda: _insert(conn, LessonStudent.__table__, lesson_students()))
+        step("lesson_tasks", lambda: _insert(conn, LessonTask.__table__, (
+            {"lesson_id": lid, "zadanie_id": tid}
+            for lid in lesson_ids
+            for tid, _, _ in rnd.sample(task_rows, min(rnd.randint(3, 8), len(task_rows)))
+        )))
+        # zadania lekcji trafiają do uczniów lekcji – jak przy zapisie lekcji w panelu
+        step("lesson_task_users", lambda: conn.execute(
+            db.insert(ZadanieUser).from_select(
+                ["user_id", "zadanie_id", "status"],
+                lesson_task_pairs(db.select(Lesson.id).where(Lesson.id >= first_lesson))
+            )
+        ).rowcount)
+        step("lesson_notes", lambda: _insert(conn, LessonNote.__table__, (
+            {"lesson_id": lid, "student_id": sid, "note": f"Notatka z lekcji {lid}"}
+            for lid in lesson_ids
+            for sid in members[lid]
+            if rnd.random() < 0.3
+        )))
+
+        vocab_categories = DZIALY_PRZEDMIOTOW["angielski"]["Vocabulary"]
+        first_material = _next_id(conn, Material)
+        material_rows = list(_materials(
+            rnd, first_material, teacher_ids, materials_per_teacher, vocab_categories
+        ))
+        step("materials", lambda: _insert(conn, Material.__table__, (
+            {k: v for k, v in row.items() if k != "category"} for row in material_rows
+        )))
+        step("material_notes", lambda: _insert(conn, MaterialNote.__table__, (
+            {"material_id": row["id"], "content": f"Notatka do materiału {row['id']}"}
+            for row in material_rows if row["material_type"] == "NOTE"
+        )))
+        step("vocabulary_items", lambda: _insert(conn, VocabularyItem.__table__, (
+            {
+                "material_id": row["id"],
+                "word_en": f"word{row['id']}_{w}",
+                "word_pl": f"słowo{row['id']}_{w}",
+                "category": row["category"],
+            }
+            for row in material_rows if row["material_type"] == "VOCABULARY"
+            for w in range(WORDS_PER_MATERIAL)
+        )))
+        step("notifications", lambda: _insert(
+            conn, Notification.__table__, _notifications(rnd, student_ids, notifications_per_student)
+        ))
+
+    # statystyki i trudność zadań liczone z wygenerowanych statusów
+    step("student_dzial_stats", rebuild_stats)
+
+    return {
+        "teacher_ids": teacher_ids,
+        "student_ids": student_ids,
+        "lesson_ids": lesson_ids,
+        "counts": counts,
+    }
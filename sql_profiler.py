@@ -0,0 +1,180 @@
+import logging
+import os
+import random
+import time
+import traceback
+from collections import Counter
+
+from flask import g, has_request_context, request, session, render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WORST_STATEMENTS = 5      # ile najwolniejszych zapytań trafia do logu
+STACK_DEPTH = 6           # ramki kodu aplikacji przy zapytaniu
+MAX_TOOLBAR_STATEMENTS = 200
+
+slow_log = logging.getLogger("slow_requests")
+
+
+# =======================
+# PROFIL ŻĄDANIA
+# =======================
+class RequestProfile:
+    def __init__(self, collect_stacks):
+        self.started = time.perf_counter()
+        self.collect_stacks = collect_stacks
+        self.statements = []   # (sql, ms, stos lub None)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def db_ms(self):
+        return sum(ms for _, ms, _ in self.statements)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def worst(self, limit=WORST_STATEMENTS):
+        return sorted(self.statements, key=lambda s: -s[1])[:limit]
+
+    def repeated(self):
+        # ten sam tekst zapytania wiele razy w jednym żądaniu = pętla N+1
+        counts = Counter(sql for sql, _, _ in self.statements)
+        return [(sql, n) for sql, n in counts.most_common() if n > 1]
+
+
+def _app_stack():
+    frames = [
+        f for f in traceback.extract_stack()[:-3]
+        if f.filename.startswith(PROJECT_DIR)
+        and "site-packages" not in f.filename
+        and not f.filename.endswith("sql_profiler.py")
+    ]
+    return [
+        f"{os.path.relpath(f.filename, PROJECT_DIR)}:{f.lineno} {f.name}"
+        for f in frames[-STACK_DEPTH:]
+    ]
+
+
+def _current_profile():
+    if not has_request_context():
+        return None
+    return g.get("sql_profile")
+
+
+# =======================
+# ZDARZENIA SQLALCHEMY (wszystkie silniki, także replika)
+# =======================
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    starts = conn.info.get("query_start")
+    if profile is None or not starts:
+        return
+
+    ms = (time.perf_counter() - starts.pop()) * 1000
+    stack = _app_stack() if profile.collect_stacks else None
+    profile.statements.append((statement, ms, stack))
+
+
+# =======================
+# INTEGRACJA Z FLASKIEM
+# =======================
+def _server_timing(profile, total_ms):
+    return (
+        f'db;dur={profile.db_ms:.1f};desc="{profile.count} SQL", '
+        f"app;dur={max(total_ms - profile.db_ms, 0):.1f}, "
+        f"total;dur={total_ms:.1f}"
+    )
+
+
+def _log_slow_request(logger, profile, total_ms, response):
+    # wzorzec trasy zamiast adresu – sekrety w ścieżce / query string (token kalendarza) nie trafiają do logu
+    route = request.url_rule.rule if request.url_rule else request.path
+    lines = [
+        f"{request.method} {route} → {response.status_code} "
+        f"{total_ms:.0f} ms, SQL: {profile.count} zapytań / {profile.db_ms:.0f} ms"
+    ]
+
+    for sql, ms, stack in profile.worst():
+        lines.append(f"  {ms:8.1f} ms  {' '.join(sql.split())[:300]}")
+        for frame in stack or ():
+            lines.append(f"               ↳ {frame}")
+
+    for sql, n in profile.repeated()[:WORST_STATEMENTS]:
+        lines.append(f"  {n:>5} ×     {' '.join(sql.split())[:300]}")
+
+    logger.warning("\n".join(lines))
+
+
+def _inject_toolbar(response, profile, total_ms):
+    html = render_template(
+        "sql_toolbar.html",
+        profile=profile,
+        total_ms=total_ms,
+        statements=profile.statements[:MAX_TOOLBAR_STATEMENTS],
+        repeated=dict(profile.repeated())
+    )
+
+    body = response.get_data(as_text=True)
+    pos = body.rfind("</body>")
+    if pos == -1:
+        return
+    response.set_data(body[:pos] + html + body[pos:])
+
+
+def init_profiling(app):
+    if not app.config.get("SQL_PROFILING", False):
+        return
+
+    slow_ms = app.config.get("SLOW_REQUEST_MS", 500)
+    stack_sample = app.config.get("SLOW_REQUEST_STACK_SAMPLE", 0)
+    toolbar = app.config.get("SQL_TOOLBAR", False)
+
+    # osobny plik albo zwykły log aplikacji
+    logger = app.logger
+    log_file = app.config.get("SLOW_REQUEST_LOG")
+    if log_file:
+        logger = slow_log
+        if not logger.handlers:
+            handler = logging.FileHandler(log_file)
+            handler.setFormatter(logging.Formatter("%(asctime)s [%(process)d] %(message)s"))
+            logger.addHandler(handler)
+            logger.propagate = False
+
+    @app.before_request
+    def start_profile():
+        collect_stacks = stack_sample > 0 and random.random() < stack_sample
+        g.sql_profile = RequestProfile(collect_stacks)
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop("sql_profile", None)
+        if profile is None:
+            return response
+
+        total_ms = profile.elapsed_ms()
+        response.headers["Server-Timing"] = _server_timing(profile, total_ms)
+
+        if total_ms >= slow_ms:
+            _log_slow_request(logger, profile, total_ms, response)
+
+        if (
+            toolbar
+            and session.get("user_role") == "admin"
+            and response.mimetype == "text/html"
+            and not response.is_streamed
+        ):
+            _inject_toolbar(response, profile, total_ms)
+
+        return response
@@ -0,0 +1,176 @@
+from datetime import timedelta
+
+from models import db, utcnow, VocabularyItem, VocabularyReview
+from media_cache import get_media_cache
+
+MIN_EASE = 1.3
+MAX_BATCH = 200
+
+# oceny z przycisków fiszki (skala SM-2: 0–5)
+QUALITY_LABELS = {
+    1: "Nie pamiętam",
+    3: "Trudne",
+    4: "Dobrze",
+    5: "Łatwo",
+}
+
+
+# =======================
+# ALGORYTM SM-2
+# =======================
+def sm2(review, quality, now):
+    if quality < 3:
+        review.repetitions = 0
+        review.interval_days = 1
+        review.lapses = (review.lapses or 0) + 1
+    else:
+        if review.repetitions == 0:
+            review.interval_days = 1
+        elif review.repetitions == 1:
+            review.interval_days = 6
+        else:
+            review.interval_days = round(review.interval_days * review.ease)
+        review.repetitions += 1
+
+    review.ease = max(
+        MIN_EASE,
+        review.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    )
+    review.due_at = now + timedelta(days=review.interval_days)
+    review.last_reviewed_at = now
+
+
+# =======================
+# KOLEJKA
+# =======================
+def _card(item, review=None):
+    return {
+        "id": item.id,
+        "word_en": item.word_en,
+        "word_pl": item.word_pl,
+        "image_url": item.image_url,
+        "audio_url": item.audio_url,
+        "category": item.category,
+        "new": review is None,
+    }
+
+
+def get_due_cards(student_id, limit):
+    now = utcnow()
+
+    # zaległe powtórki – zakres po indeksie (student_id, due_at)
+    due = (
+        db.session.query(VocabularyReview, VocabularyItem)
+        .join(VocabularyItem, VocabularyItem.id == VocabularyReview.item_id)
+        .filter(
+            VocabularyReview.student_id == student_id,
+            VocabularyReview.due_at <= now
+        )
+        .order_by(VocabularyReview.due_at)
+        .limit(limit)
+        .all()
+    )
+    cards = [_card(item, review) for review, item in due]
+
+    # resztę uzupełniamy słówkami, których uczeń jeszcze nie widział
+    if len(cards) < limit:
+        seen = (
+            db.session.query(VocabularyReview.item_id)
+            .filter(VocabularyReview.student_id == student_id)
+        )
+        new_items = (
+            VocabularyItem.query
+            .filter(VocabularyItem.id.not_in(seen))
+            .order_by(VocabularyItem.id)
+            .limit(limit - len(cards))
+            .all()
+        )
+        cards.extend(_card(item) for item in new_items)
+
+    # obrazki i audio z lokalnych kopii, jeśli już pobrane
+    local = get_media_cache().local_urls(
+        url for card in cards for url in (card["image_url"], card["audio_url"])
+    )
+    for card in cards:
+        card["image_url"] = local.get(card["image_url"], card["image_url"])
+        card["audio_url"] = local.get(card["audio_url"], card["audio_url"])
+
+    return cards
+
+
+# =======================
+# ZAPIS SESJI (jedna transakcja)
+# =======================
+def _create_missing_cards(student_id, item_ids, now):
+    # nowe karty: INSERT ... ON CONFLICT DO NOTHING – bez SELECT-a przed zapisem,
+    # więc dwa równoległe wysłania z tą samą nową kartą nie zderzą się na kluczu
+    rows = [
+        {
+            "student_id": student_id, "item_id": item_id, "ease": 2.5,
+            "interval_days": 0, "repetitions": 0, "lapses": 0, "due_at": now,
+        }
+        for item_id in item_ids
+    ]
+    dialect = db.engine.dialect.name
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        existing = {
+            item_id for (item_id,) in
+            db.session.query(VocabularyReview.item_id).filter(
+                VocabularyReview.student_id == student_id,
+                VocabularyReview.item_id.in_(item_ids)
+            )
+        }
+        db.session.add_all(VocabularyReview(**row) for row in rows if row["item_id"] not in existing)
+        db.session.flush()
+        return
+
+    table = VocabularyReview.__table__
+    db.session.execute(
+        insert(table).on_conflict_do_nothing(index_elements=[table.c.student_id, table.c.item_id]),
+        rows
+    )
+
+
+def record_reviews(student_id, answers):
+    now = utcnow()
+
+    qualities = {}
+    for a in answers[:MAX_BATCH]:
+        item_id = int(a["item_id"])
+        quality = int(a["quality"])
+        if not 0 <= quality <= 5:
+            raise ValueError("Ocena musi być z zakresu 0–5")
+        qualities[item_id] = quality
+
+    if not qualities:
+        return 0
+
+    valid_ids = {
+        item_id for (item_id,) in
+        db.session.query(VocabularyItem.id).filter(VocabularyItem.id.in_(qualities))
+    }
+    if not valid_ids:
+        return 0
+
+    _create_missing_cards(student_id, valid_ids, now)
+
+    # FOR UPDATE (Postgres) – nakładające się wysłania tej samej sesji liczą SM-2 po kolei
+    reviews = (
+        VocabularyReview.query
+        .filter(
+            VocabularyReview.student_id == student_id,
+            VocabularyReview.item_id.in_(valid_ids)
+        )
+        .with_for_update()
+    )
+    for review in reviews:
+        sm2(review, qualities[review.item_id], now)
+
+    db.session.commit()
+
+    return len(valid_ids)
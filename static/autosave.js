@@ -0,0 +1,53 @@
+// AUTOZAPIS SZKICU ODPOWIEDZI (zadania otwarte)
+(() => {
+    const textarea = document.querySelector("textarea[data-draft-url]");
+    if (!textarea) return;
+
+    const url = textarea.dataset.draftUrl;
+    const status = document.getElementById("draft-status");
+    const DEBOUNCE_MS = 1500;
+
+    let timer = null;
+    let lastSent = textarea.value;
+
+    function setStatus(text) {
+        if (status) status.textContent = text;
+    }
+
+    async function send() {
+        timer = null;
+        const value = textarea.value;
+        if (value === lastSent) return;
+
+        try {
+            const res = await fetch(url, {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ answer: value }),
+                keepalive: true
+            });
+            if (res.ok) {
+                lastSent = value;
+                setStatus("Szkic zapisany");
+            } else {
+                setStatus("Nie udało się zapisać szkicu");
+            }
+        } catch (e) {
+            setStatus("Brak połączenia – szkic zapiszemy później");
+        }
+    }
+
+    // jedno żądanie po przerwie w pisaniu, a nie na każdy klawisz
+    textarea.addEventListener("input", () => {
+        setStatus("…");
+        clearTimeout(timer);
+        timer = setTimeout(send, DEBOUNCE_MS);
+    });
+
+    document.addEventListener("visibilitychange", () => {
+        if (document.visibilityState === "hidden" && timer) {
+            clearTimeout(timer);
+            send();
+        }
+    });
+})();
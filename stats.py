@@ -0,0 +1,268 @@
+from collections import Counter, defaultdict
+
+from sqlalchemy import bindparam, case, func, insert, literal
+
+from models import db, utcnow, StudentDzialStats, TaskDifficulty, Zadanie, ZadanieUser
+
+# status w zadania_user → licznik w student_dzial_stats
+STATUS_COLUMNS = {
+    'zrobione': 'done',
+    'błędne': 'wrong',
+    'oddane': 'pending',
+}
+
+GRADED = ('zrobione', 'błędne')
+
+
+# =======================
+# AKTUALIZACJA PRZYROSTOWA
+# =======================
+# Funkcje tylko modyfikują sesję – commit robi wywołujący widok,
+# więc statystyki zapisują się w tej samej transakcji co ZadanieUser.
+
+COUNTERS = ('assigned', 'done', 'wrong', 'pending')
+
+
+def _dialect_insert():
+    # INSERT ... ON CONFLICT (Postgres / SQLite); None – inne bazy, ścieżka ORM
+    dialect = db.engine.dialect.name
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def _upsert_stats(rows):
+    # rows: słowniki z kluczem (user_id, przedmiot, dzial), przyrostami COUNTERS
+    # i opcjonalnie last_activity; INSERT ... ON CONFLICT – bez SELECT-a przed
+    # zapisem, więc dwa workery nie wstawią tego samego wiersza naraz
+    dialect_insert = _dialect_insert()
+    if dialect_insert is None:
+        for row in rows:
+            _apply_orm(row)
+        return
+
+    table = StudentDzialStats.__table__
+    stmt = dialect_insert(table)
+    set_ = {column: table.c[column] + stmt.excluded[column] for column in COUNTERS}
+    if 'last_activity' in rows[0]:
+        set_['last_activity'] = stmt.excluded.last_activity
+
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.przedmiot, table.c.dzial],
+            set_=set_
+        ),
+        rows
+    )
+
+
+def _apply_orm(row):
+    existing = db.session.get(StudentDzialStats, (row['user_id'], row['przedmiot'], row['dzial']))
+
+    if existing is None:
+        db.session.add(StudentDzialStats(**row))
+        return
+
+    # UPDATE ... SET x = x + d
+    for column in COUNTERS:
+        if row[column]:
+            setattr(existing, column, getattr(StudentDzialStats, column) + row[column])
+    if 'last_activity' in row:
+        existing.last_activity = row['last_activity']
+
+
+def _apply(user_id, przedmiot, dzial, deltas, touch):
+    row = {'user_id': user_id, 'przedmiot': przedmiot, 'dzial': dzial}
+    row.update((column, deltas.get(column, 0)) for column in COUNTERS)
+    if touch:
+        row['last_activity'] = utcnow()
+
+    _upsert_stats([row])
+
+
+def record_status_change(user_id, zadanie, old_status, new_status):
+    record_status_changes(user_id, [(zadanie, old_status, new_status)])
+
+
+def record_status_changes(user_id, changes):
+    # changes: iterowalne (zadanie, old_status, new_status) – np. cały arkusz;
+    # zmiany sumujemy per dział, więc jeden wiersz statystyk = jeden UPDATE
+    deltas = defaultdict(lambda: defaultdict(int))
+    attempts = {}
+
+    for zadanie, old_status, new_status in changes:
+        d = deltas[(zadanie.przedmiot, zadanie.dzial)]
+        if old_status is None:
+            d['assigned'] += 1
+        if old_status in STATUS_COLUMNS:
+            d[STATUS_COLUMNS[old_status]] -= 1
+        if new_status in STATUS_COLUMNS:
+            d[STATUS_COLUMNS[new_status]] += 1
+
+        if old_status not in GRADED and new_status in GRADED:
+            attempts[zadanie.id] = new_status == 'zrobione'
+
+    for (przedmiot, dzial), d in deltas.items():
+        _apply(user_id, przedmiot, dzial, d, touch=True)
+
+    if attempts:
+        _record_attempts(attempts)
+
+
+def _record_attempts(attempts):
+    # attempts: zadanie_id → czy odpowiedź poprawna; upsert jak w _upsert_stats –
+    # dwaj uczniowie oceniani naraz z nowym zadaniem nie zderzają się na kluczu
+    now = utcnow()
+    rows = [
+        {'zadanie_id': zadanie_id, 'attempts': 1, 'correct': int(correct), 'updated_at': now}
+        for zadanie_id, correct in attempts.items()
+    ]
+
+    dialect_insert = _dialect_insert()
+    if dialect_insert is None:
+        for row in rows:
+            existing = db.session.get(TaskDifficulty, row['zadanie_id'])
+            if existing is None:
+                db.session.add(TaskDifficulty(**row))
+                continue
+            existing.attempts = TaskDifficulty.attempts + 1
+            existing.correct = TaskDifficulty.correct + row['correct']
+            existing.updated_at = now
+        return
+
+    table = TaskDifficulty.__table__
+    stmt = dialect_insert(table)
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.zadanie_id],
+            set_={
+                'attempts': table.c.attempts + stmt.excluded.attempts,
+                'correct': table.c.correct + stmt.excluded.correct,
+                'updated_at': stmt.excluded.updated_at,
+            }
+        ),
+        rows
+    )
+
+
+def record_assignments(rows):
+    # rows: iterowalne (user_id, przedmiot, dzial) nowo przypisanych zadań;
+    # przypisanie całej lekcji / działu dotyka wielu wierszy naraz – jeden upsert (executemany)
+    counts = Counter(rows)
+    if not counts:
+        return
+
+    _upsert_stats([
+        {
+            'user_id': user_id, 'przedmiot': przedmiot, 'dzial': dzial,
+            'assigned': count, 'done': 0, 'wrong': 0, 'pending': 0
+        }
+        for (user_id, przedmiot, dzial), count in counts.items()
+    ])
+
+
+# =======================
+# ODCZYT
+# =======================
+def get_student_stats(user_id):
+    rows = (
+        StudentDzialStats.query
+        .filter_by(user_id=user_id)
+        .order_by(StudentDzialStats.przedmiot, StudentDzialStats.dzial)
+        .all()
+    )
+
+    grouped = defaultdict(list)
+    for r in rows:
+        grouped[r.przedmiot].append(r)
+
+    return grouped
+
+
+# =======================
+# PRZEBUDOWA (CLI)
+# =======================
+def count_status(status):
+    return func.sum(case((ZadanieUser.status == status, 1), else_=0))
+
+
+def rebuild_stats():
+    # last_activity nie wynika z zadania_user – przenosimy je ze starych wierszy
+    last_activity = [
+        {'k_user_id': user_id, 'k_przedmiot': przedmiot, 'k_dzial': dzial, 'k_last_activity': ts}
+        for user_id, przedmiot, dzial, ts in
+        db.session.query(
+            StudentDzialStats.user_id,
+            StudentDzialStats.przedmiot,
+            StudentDzialStats.dzial,
+            StudentDzialStats.last_activity
+        )
+        .filter(StudentDzialStats.last_activity.isnot(None))
+    ]
+
+    db.session.query(StudentDzialStats).delete()
+
+    select = (
+        db.session.query(
+            ZadanieUser.user_id,
+            Zadanie.przedmiot,
+            Zadanie.dzial,
+            func.count(),
+            count_status('zrobione'),
+            count_status('błędne'),
+            count_status('oddane')
+        )
+        .join(Zadanie, Zadanie.id == ZadanieUser.zadanie_id)
+        .group_by(ZadanieUser.user_id, Zadanie.przedmiot, Zadanie.dzial)
+    ).statement
+
+    db.session.execute(
+        insert(StudentDzialStats).from_select(
+            [
+                'user_id', 'przedmiot', 'dzial',
+                'assigned', 'done', 'wrong', 'pending'
+            ],
+            select
+        )
+    )
+
+    if last_activity:
+        table = StudentDzialStats.__table__
+        db.session.execute(
+            table.update()
+            .where(
+                table.c.user_id == bindparam('k_user_id'),
+                table.c.przedmiot == bindparam('k_przedmiot'),
+                table.c.dzial == bindparam('k_dzial')
+            )
+            .values(last_activity=bindparam('k_last_activity')),
+            last_activity
+        )
+
+    db.session.query(TaskDifficulty).delete()
+
+    attempts = (
+        db.session.query(
+            ZadanieUser.zadanie_id,
+            func.count(),
+            count_status('zrobione'),
+            literal(utcnow(), type_=db.DateTime)
+        )
+        .filter(ZadanieUser.status.in_(GRADED))
+        .group_by(ZadanieUser.zadanie_id)
+    ).statement
+
+    db.session.execute(
+        insert(TaskDifficulty).from_select(
+            ['zadanie_id', 'attempts', 'correct', 'updated_at'],
+            attempts
+        )
+    )
+    db.session.commit()
+
+    return db.session.query(func.count()).select_from(StudentDzialStats).scalar()
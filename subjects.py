@@ -0,0 +1,47 @@
+DZIALY_PRZEDMIOTOW = {
+    'matematyka': [
+        "Liczby rzeczywiste i wyrażenia algebraiczne",
+        "Zbiory, wartość bezwzględna i nierówności",
+        "Funkcje",
+        "Funkcja liniowa",
+        "Funkcja kwadratowa",
+        "Wielomiany i wyrażenia wymierne",
+        "Funkcja wykładnicza i funkcja logarytmiczna",
+        "Trygonometria",
+        "Ciągi",
+        "Planimetria",
+        "Geometria analityczna",
+        "Stereometria",
+        "Rachunek prawdopodobieństwa",
+        "Statystyka"
+    ],
+    'polski': [
+        "Czytanie ze zrozumieniem",
+        "Lektury obowiązkowe",
+        "Środki stylistyczne",
+        "Epoki literackie",
+        "Wypowiedź argumentacyjna",
+        "Gramatyka i język"
+    ],
+    'angielski': {
+        "Reading": [],
+        "Listening": [],
+        "Use of English": [],
+        "Writing": [],
+        "Grammar": [],
+        "Vocabulary": [
+            "Personal details",
+            "Periods of life",
+            "General appearance",
+            "Clothes",
+            "Personality",
+            "Feelings and emotions",
+            "Abilites and interests"
+        ],
+        "Picture description": []
+    }
+}
+
+PRZEDMIOTY = list(DZIALY_PRZEDMIOTOW.keys())
+
+ZAKRESY = ['podstawa', 'rozszerzenie']